@@ -0,0 +1,44 @@
+"""Attribute read/write throughput of a `Document`, run it from the root of the
+repository:
+
+    python benchmarks/attribute_access.py
+"""
+import os
+import sys
+from typing import List
+
+sys.path.insert(0, os.getcwd())
+
+from benchmarks.common import Benchmark, report  # noqa: E402
+from examples.user import User  # noqa: E402
+
+# attribute accesses per call of each benchmark
+LOOP = 1000
+
+
+def loop(statement: str):
+    """Run `statement` LOOP times on a `user`, the loop is unrolled so it's
+    cost stays small compared to the access itself
+    """
+    user = User(name='john', email='john@doe.com', age=42)
+    code = compile('\n'.join([statement] * LOOP), statement, 'exec')
+    namespace = {'user': user}
+    return lambda: exec(code, namespace)
+
+
+def benchmarks(mongo: str = None) -> List[Benchmark]:
+    return [
+        Benchmark('attribute: read field', loop('user.name'), LOOP),
+        Benchmark('attribute: read default field', loop('user.created'),
+                  LOOP),
+        Benchmark('attribute: read method', loop('user.save'), LOOP),
+        Benchmark('attribute: read plain attribute', loop('user.collection'),
+                  LOOP),
+        Benchmark('attribute: write field', loop("user.name = 'jane'"), LOOP),
+        Benchmark('attribute: write plain attribute',
+                  loop("user.collection = 'user'"), LOOP),
+    ]
+
+
+if __name__ == '__main__':
+    report(benchmarks())
@@ -0,0 +1,133 @@
+"""Helpers shared by the benchmarks: the measure loop and an in-process
+stand-in of a pymongo collection, so the suite runs without a mongod (BSON
+and network are then not measured, only the work done by mongomodel).
+"""
+import os
+import sys
+import timeit
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from typing import Callable, List
+from unittest.mock import patch
+
+sys.path.insert(0, os.getcwd())
+
+from bson import ObjectId  # noqa: E402
+from pymongo.results import BulkWriteResult, InsertManyResult  # noqa: E402
+
+
+class Benchmark:
+    """`func` is timed, each call does `operations` times the measured thing
+    (documents, attribute reads...) and the result is given in `unit`/s.
+    `context` gives a context manager entered around the measure, it's setup
+    is not timed
+    """
+    def __init__(self, name: str, func: Callable, operations: int = 1,
+                 unit: str = 'ops', context: Callable = None):
+        self.name = name
+        self.func = func
+        self.operations = operations
+        self.unit = unit
+        self.context = context or nullcontext
+
+    def measure(self, repeat: int = 5) -> float:
+        """Best throughput (operations per second) of `repeat` runs, each run
+        lasting at least 0.2s
+        """
+        with self.context():
+            timer = timeit.Timer(self.func)
+            number, _ = timer.autorange()
+            duration = min(timer.repeat(repeat=repeat, number=number))
+        return self.operations * number / duration
+
+
+def report(benchmarks: List[Benchmark], repeat: int = 5) -> None:
+    for benchmark in benchmarks:
+        rate = benchmark.measure(repeat)
+        print(f'{benchmark.name:<40} {rate / 1e3:12.1f} k{benchmark.unit}/s')
+
+
+class FakeCursor:
+    """Minimal stand-in of a pymongo cursor over a list of dicts
+    """
+    def __init__(self, items, projection=None):
+        if projection:
+            keep = {key for key, value in projection.items() if value}
+            if projection.get('_id', True):
+                keep.add('_id')
+            items = [{k: v for k, v in item.items() if k in keep}
+                     for item in items]
+        self.items = items
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    def skip(self, n):
+        return FakeCursor(self.items[n:])
+
+    def limit(self, n):
+        return FakeCursor(self.items[:n])
+
+    def batch_size(self, n):
+        return self
+
+    def __iter__(self):
+        return iter(self.items)
+
+
+class FakeCollection:
+    """Stand-in of a pymongo collection, finds ignore the filter and writes
+    are acknowledged without storing anything
+    """
+    name = 'benchmark'
+
+    def __init__(self, items=()):
+        self.items = list(items)
+
+    def find(self, filter=None, projection=None, **kwargs):
+        return FakeCursor(self.items, projection)
+
+    def insert_many(self, documents, **kwargs):
+        return InsertManyResult(
+            [document.setdefault('_id', ObjectId())
+             for document in documents], True)
+
+    def bulk_write(self, requests, **kwargs):
+        return BulkWriteResult({'nInserted': len(requests)}, True)
+
+
+def make_users(amount: int) -> List[dict]:
+    """Raw documents of `examples.user.User`
+    """
+    return [{
+        '_id': ObjectId(),
+        'name': f'user {i}',
+        'email': f'user{i}@example.com',
+        'age': i % 90,
+        'created': datetime.now(),
+        'is_admin': False,
+    } for i in range(amount)]
+
+
+@contextmanager
+def collection(items=(), mongo: str = None):
+    """Serve `items` to all querysets: from the stand-in, or from a real
+    `mongo` database (uri) where they are inserted first
+    """
+    if not mongo:
+        with patch('mongomodel.queryset.QuerySet.get_collection',
+                   return_value=FakeCollection(items)):
+            yield
+        return
+    import mongomodel
+    mongomodel.database.connect(host=mongo, db='mongomodel_benchmarks')
+    with patch('mongomodel.queryset.QuerySet.get_collection_name',
+               return_value='benchmark'):
+        real = mongomodel.database.db['benchmark']
+        real.drop()
+        if items:
+            real.insert_many([dict(item) for item in items])
+        try:
+            yield
+        finally:
+            real.drop()
@@ -0,0 +1,68 @@
+"""Throughput of the per document work: construction, export, validation and
+hydration from a raw database response (decoded or lazy), run it from the
+root of the repository:
+
+    python benchmarks/documents.py
+"""
+import os
+import sys
+from typing import List
+
+import bson
+
+sys.path.insert(0, os.getcwd())
+
+from benchmarks.common import Benchmark, make_users, report  # noqa: E402
+from examples.user import User  # noqa: E402
+
+DOCUMENTS = 1000
+
+
+def benchmarks(mongo: str = None) -> List[Benchmark]:
+    items = make_users(DOCUMENTS)
+    kwargs = [{key: value for key, value in item.items() if key != '_id'}
+              for item in items]
+    # stored documents usually hold more than the fields read
+    raws = [bson.encode(dict(item, history=[
+        {'action': 'login', 'at': item['created']}] * 20)) for item in items]
+    users = [User.from_database(item) for item in items]
+    dirty = [User.from_database(item) for item in items]
+    for user in dirty:
+        user.age += 1
+
+    return [
+        Benchmark('document: construct',
+                  lambda: [User(**item) for item in kwargs], DOCUMENTS,
+                  'docs'),
+        Benchmark('document: from_database',
+                  lambda: [User.from_database(item) for item in items],
+                  DOCUMENTS, 'docs'),
+        # BSON to documents reading two fields, eager then lazy
+        Benchmark('document: decode + read 2 fields',
+                  lambda: [(user.name, user.age) for user in (
+                      User.from_database(bson.decode(raw)) for raw in raws)],
+                  DOCUMENTS, 'docs'),
+        Benchmark('document: from_raw + read 2 fields',
+                  lambda: [(user.name, user.age) for user in map(
+                      User.from_raw, raws)], DOCUMENTS, 'docs'),
+        Benchmark('document: to_dict',
+                  lambda: [user.to_dict() for user in users], DOCUMENTS,
+                  'docs'),
+        Benchmark('document: is_valid',
+                  lambda: [user.is_valid() for user in users], DOCUMENTS,
+                  'docs'),
+        # the field by field validation, used by documents with added fields
+        Benchmark('document: is_valid per field',
+                  lambda: [all(valid or not required
+                               for _, required, valid in user._validity())
+                           for user in users], DOCUMENTS, 'docs'),
+        Benchmark('document: validate_many',
+                  lambda: User.validate_many(users), DOCUMENTS, 'docs'),
+        Benchmark('document: get_update',
+                  lambda: [user.get_update() for user in dirty], DOCUMENTS,
+                  'docs'),
+    ]
+
+
+if __name__ == '__main__':
+    report(benchmarks())
@@ -0,0 +1,52 @@
+"""Throughput of the queryset chain methods: filter/exclude compilation
+(the shapes of the arguments are compiled once, see
+`QuerySet.compile_filter`) and update compilation, run it from the root of
+the repository:
+
+    python benchmarks/filters.py
+"""
+import os
+import sys
+from itertools import count
+from typing import List
+
+sys.path.insert(0, os.getcwd())
+
+from benchmarks.common import Benchmark, report  # noqa: E402
+from examples.user import User  # noqa: E402
+
+
+def benchmarks(mongo: str = None) -> List[Benchmark]:
+    objects = User.objects
+    ages = count()
+    return [
+        Benchmark('filter: equality',
+                  lambda: objects.filter(name='john'), unit='queries'),
+        Benchmark('filter: keywords',
+                  lambda: objects.filter(age__gte=18, age__lt=65,
+                                         name__in=['a', 'b']),
+                  unit='queries'),
+        Benchmark('filter: nested path',
+                  lambda: objects.filter(address__city__eq='Paris'),
+                  unit='queries'),
+        Benchmark('filter: exclude',
+                  lambda: objects.exclude(age__gt=30, is_admin=True),
+                  unit='queries'),
+        Benchmark('filter: chained',
+                  lambda: objects.filter(age__gte=18).filter(age__lt=65)
+                  .exclude(name='root').sort(['-age']).limit(10),
+                  unit='queries'),
+        # an endpoint sending the same query with other values
+        Benchmark('filter: same shape, new values',
+                  lambda: objects.filter(age__gte=next(ages), is_admin=False,
+                                         address__city='Paris'),
+                  unit='queries'),
+        Benchmark('filter: compile_update',
+                  lambda: objects.compile_update(
+                      set__name='x', inc__age=1, push__tags='a'),
+                  unit='queries'),
+    ]
+
+
+if __name__ == '__main__':
+    report(benchmarks())
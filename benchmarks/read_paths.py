@@ -0,0 +1,36 @@
+"""Throughput of the read paths of a `QuerySet`, over an in-process
+collection unless a mongod uri is given (see `benchmarks/run.py`), run it
+from the root of the repository:
+
+    python benchmarks/read_paths.py
+"""
+import os
+import sys
+from typing import List
+
+sys.path.insert(0, os.getcwd())
+
+from benchmarks.common import Benchmark, collection, make_users, \
+    report  # noqa: E402
+from examples.user import User  # noqa: E402
+
+DOCUMENTS = 10_000
+
+
+def benchmarks(mongo: str = None) -> List[Benchmark]:
+    items = make_users(DOCUMENTS)
+    objects = User.objects
+    return [Benchmark(name, func, DOCUMENTS, 'docs',
+                      lambda: collection(items, mongo)) for name, func in (
+        ('read: all()', lambda: objects.all()),
+        ('read: iterate', lambda: list(objects)),
+        ('read: as_dicts()', lambda: list(objects.as_dicts())),
+        ('read: values(name, email)',
+         lambda: list(objects.values('name', 'email'))),
+        ('read: values_list(name, flat, lazy)',
+         lambda: list(objects.values_list('name', flat=True, lazy=True))),
+    )]
+
+
+if __name__ == '__main__':
+    report(benchmarks(), repeat=3)
@@ -0,0 +1,76 @@
+"""Run the whole benchmark suite, from the root of the repository:
+
+    python benchmarks/run.py [--json results.json] [--compare baseline.json]
+                             [--filter read] [--mongo mongodb://localhost]
+
+results are printed and can be saved as JSON, comparing them to a previous
+JSON file prints the speedup of each benchmark. without `--mongo` the reads
+and writes use an in-process stand-in of the collection.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.getcwd())
+
+from benchmarks import attribute_access, documents, filters, \
+    read_paths, writes  # noqa: E402
+
+MODULES = (attribute_access, documents, filters, read_paths, writes)
+
+
+def run(name_filter: str = None, mongo: str = None, repeat: int = 5) -> dict:
+    results = {}
+    for module in MODULES:
+        for benchmark in module.benchmarks(mongo):
+            if name_filter and name_filter not in benchmark.name:
+                continue
+            rate = benchmark.measure(repeat)
+            results[benchmark.name] = {
+                'rate': rate, 'unit': f'{benchmark.unit}/s'}
+            print(f'{benchmark.name:<40} {rate / 1e3:12.1f} '
+                  f'k{benchmark.unit}/s', flush=True)
+    return results
+
+
+def compare(results: dict, baseline: dict) -> None:
+    print(f'\n{"benchmark":<40} {"baseline":>12} {"current":>12} '
+          f'{"speedup":>8}')
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        print(f'{name:<40} {before["rate"] / 1e3:12.1f} '
+              f'{result["rate"] / 1e3:12.1f} '
+              f'{result["rate"] / before["rate"]:7.2f}x')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--json', help='save the results in this file')
+    parser.add_argument('--compare', help='results file to compare with')
+    parser.add_argument('--filter', help='only run the matching benchmarks')
+    parser.add_argument('--mongo', help='uri of a mongod to read and write')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    results = run(args.filter, args.mongo, args.repeat)
+    if args.json:
+        with open(args.json, 'w') as fp:
+            json.dump({
+                'date': datetime.now().isoformat(),
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'mongo': bool(args.mongo),
+                'benchmarks': results,
+            }, fp, indent=2)
+    if args.compare:
+        with open(args.compare) as fp:
+            compare(results, json.load(fp)['benchmarks'])
+
+
+if __name__ == '__main__':
+    main()
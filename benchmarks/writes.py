@@ -0,0 +1,48 @@
+"""Throughput of the bulk write paths, over an in-process collection unless a
+mongod uri is given (see `benchmarks/run.py`), building the written documents
+is part of the measure, run it from the root of the repository:
+
+    python benchmarks/writes.py
+"""
+import os
+import sys
+from typing import List
+
+sys.path.insert(0, os.getcwd())
+
+from benchmarks.common import Benchmark, collection, make_users, \
+    report  # noqa: E402
+from examples.user import User  # noqa: E402
+
+DOCUMENTS = 1000
+
+
+def benchmarks(mongo: str = None) -> List[Benchmark]:
+    items = make_users(DOCUMENTS)
+    for item in items:
+        del item['_id']
+
+    def new_users():
+        return [User(**item) for item in items]
+
+    def stored_users():
+        users = [User.from_database(dict(item, _id=i))
+                 for i, item in enumerate(items)]
+        for user in users:
+            user.age += 1
+        return users
+
+    return [
+        Benchmark('write: insert_many', lambda: User.insert_many(new_users()),
+                  DOCUMENTS, 'docs', lambda: collection(mongo=mongo)),
+        Benchmark('write: bulk_save new',
+                  lambda: User.objects.bulk_save(new_users()),
+                  DOCUMENTS, 'docs', lambda: collection(mongo=mongo)),
+        Benchmark('write: bulk_save updates',
+                  lambda: User.objects.bulk_save(stored_users()),
+                  DOCUMENTS, 'docs', lambda: collection(mongo=mongo)),
+    ]
+
+
+if __name__ == '__main__':
+    report(benchmarks(), repeat=3)
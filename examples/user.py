@@ -13,4 +13,5 @@ class User(mongomodel.Document):
         return f'<User {self.name}> {self.email}'
 
     def pre_save(self, content, is_new):
-        self.created = content['created']
+        if 'created' in content:
+            self.created = content['created']
@@ -1,15 +1,25 @@
 # noqa: F401
+from typing import Dict
+
 import pymongo
 
+from . import metrics
+
+DEFAULT_ALIAS = 'default'
+
 
 class Database:
-    def __init__(self):
-        self.connect(host='localhost', connect=False)
+    def __init__(self, **kwargs):
+        kwargs.setdefault('host', 'localhost')
+        kwargs.setdefault('connect', False)
+        self.connect(**kwargs)
 
     def connect(self, **kwargs) -> 'Database':
         kwargs.setdefault('connect', True)
         db_name = kwargs.pop('db', 'test')
 
+        kwargs['event_listeners'] = [
+            *kwargs.get('event_listeners', ()), metrics.listener]
         self.client = pymongo.MongoClient(**kwargs)
         self.db: pymongo.database.Database = getattr(self.client, db_name)
         return self
@@ -19,12 +29,39 @@ class Database:
 
     def update_queryset(self, queryset):
         queryset._db = self
+        queryset._alias = None
 
     def new(self, **kwargs) -> 'Database':
-        return Database().connect()
+        kwargs.setdefault('connect', True)
+        return type(self)(**kwargs)
 
 
 database = Database()
+# named connections, a model picks one with it's `db_alias` attribute and a
+# queryset with `using(alias)`
+connections: Dict[str, Database] = {DEFAULT_ALIAS: database}
+
+
+def register_connection(alias: str, database: Database = None,
+                        **kwargs) -> Database:
+    """Name a connection, from a `Database` or the arguments of
+    `Database.connect`:
+    `register_connection('reports', host='mongodb://replica', db='shop')`
+    """
+    if database is None:
+        database = Database(**kwargs)
+    elif kwargs:
+        database.connect(**kwargs)
+    connections[alias] = database
+    return database
+
+
+def get_database(alias: str = DEFAULT_ALIAS) -> Database:
+    try:
+        return connections[alias]
+    except KeyError:
+        raise KeyError(f'no connection registered as {alias!r}') from None
+
 
 from .field import (
     Field,
@@ -37,4 +74,19 @@ from .field import (
     DateTimeField,
     BoolField
 )
-from .document import Document, QuerySet  # noqa: F401
+from .document import Document, CompactDocument, QuerySet  # noqa: F401
+from .queryset import AsyncQuerySet  # noqa: F401
+from .identity import IdentityMap, identity_map  # noqa: F401
+from .aggregation import (  # noqa: F401
+    Sum,
+    Avg,
+    Min,
+    Max,
+    Count,
+    First,
+    Last,
+    Push,
+    AddToSet
+)
+from .index import Index  # noqa: F401
+from .document import ensure_all_indexes  # noqa: F401
@@ -0,0 +1,93 @@
+from typing import Any
+
+
+def field_path(value: Any) -> Any:
+    """Turn a field name (`'a.b'`) into a field path (`'$a.b'`), expressions
+    (dicts, numbers or paths already starting with `$`) are left as they are
+    """
+    if isinstance(value, str) and not value.startswith('$'):
+        return f'${value}'
+    return value
+
+
+class Accumulator:
+    """A `$group` accumulator for `QuerySet.aggregate`, it's result is
+    stored under `alias` or `<field>__<name>` (`price__sum`) by default.
+    `field` is a field name or any aggregation expression
+    """
+    operator = None
+
+    def __init__(self, field: Any, alias: str = None):
+        self.field = field
+        self.alias = alias
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.field!r})'
+
+    @property
+    def name(self) -> str:
+        return self.__class__.__name__.lower()
+
+    def default_alias(self) -> str:
+        if not isinstance(self.field, str):
+            raise ValueError(f'an alias is required for {self!r}')
+        return f'{self.field.lstrip("$").replace(".", "_")}__{self.name}'
+
+    def get_alias(self) -> str:
+        return self.alias or self.default_alias()
+
+    def as_mongo_expression(self) -> dict:
+        return {self.operator: field_path(self.field)}
+
+
+class Sum(Accumulator):
+    operator = '$sum'
+
+
+class Avg(Accumulator):
+    operator = '$avg'
+
+
+class Min(Accumulator):
+    operator = '$min'
+
+
+class Max(Accumulator):
+    operator = '$max'
+
+
+class First(Accumulator):
+    operator = '$first'
+
+
+class Last(Accumulator):
+    operator = '$last'
+
+
+class Push(Accumulator):
+    operator = '$push'
+
+
+class AddToSet(Accumulator):
+    operator = '$addToSet'
+
+
+class Count(Accumulator):
+    """Amount of documents, or of documents where `field` is not null
+    """
+    operator = '$sum'
+
+    def __init__(self, field: Any = None, alias: str = None):
+        super().__init__(field, alias)
+
+    def default_alias(self) -> str:
+        if self.field is None:
+            return 'count'
+        return super().default_alias()
+
+    def as_mongo_expression(self) -> dict:
+        if self.field is None:
+            return {'$sum': 1}
+        return {'$sum': {'$cond': [
+            {'$eq': [{'$ifNull': [field_path(self.field), None]}, None]},
+            0, 1]}}
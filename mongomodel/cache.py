@@ -0,0 +1,108 @@
+import hashlib
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Tuple
+
+from bson import json_util
+
+# every backend ever created, so writes invalidate all of them
+_backends = weakref.WeakSet()
+_default = None
+
+
+class CacheBackend:
+    """Storage of the `QuerySet.cache` results, subclass it to use another
+    storage than the process memory, entries are tagged with their
+    collection so a write can invalidate all of them.
+    """
+    def __init__(self):
+        _backends.add(self)
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Returns (found, value) for the given key
+        """
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: float, collection: str) -> None:
+        raise NotImplementedError
+
+    def invalidate(self, collection: str) -> None:
+        """Drop all entries of the given collection
+        """
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class LRUCache(CacheBackend):
+    """In process backend keeping at most `maxsize` entries, the least
+    recently used ones are evicted first.
+    """
+    def __init__(self, maxsize: int = 1024):
+        super().__init__()
+        self.maxsize = maxsize
+        # key -> (expiration, collection, value)
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, entry[2]
+
+    def set(self, key: str, value: Any, ttl: float, collection: str) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, collection, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, collection: str) -> None:
+        with self._lock:
+            for key in [key for key, entry in self._entries.items()
+                        if entry[1] == collection]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def get_default_backend() -> CacheBackend:
+    global _default
+    if _default is None:
+        _default = LRUCache()
+    return _default
+
+
+def set_default_backend(backend: CacheBackend) -> None:
+    global _default
+    _default = backend
+
+
+def invalidate(collection: str) -> None:
+    """Drop the cached results of a collection from all backends, called
+    on each write made by this process
+    """
+    for backend in list(_backends):
+        backend.invalidate(collection)
+
+
+def make_key(*parts: Any) -> str:
+    """Canonical hash of the given parts (queries, sort...), dict keys order
+    does not matter
+    """
+    dump = json_util.dumps(parts, sort_keys=True)
+    return hashlib.sha1(dump.encode()).hexdigest()
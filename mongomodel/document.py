@@ -1,21 +1,55 @@
-from typing import List
+import weakref
+from typing import Dict, List, Tuple
+import bson
 from bson import ObjectId
 import pymongo
 
 from . import Field
-from .queryset import QuerySet
+from . import identity
+from .queryset import QuerySet, AsyncQuerySet
+from .index import Index, IndexReport, sync_indexes
+from .lazy import LazyValues, RawDocument
+from .schema import Schema
+
+
+# placeholder for values which can't be compared in a snapshot
+_MISSING = object()
 
 
 class DocumentMeta(type):
     """Meta class of `Document`, allow to automaticaly set a QuerySet in Objects
-    attribute.
+    attribute and compile the fields `Schema` of the class.
     """
+    # all the models, and the amount declared so far
+    models = weakref.WeakSet()
+    declared = 0
+    # all the models declaring indexes, for `ensure_all_indexes`
+    indexed_models = weakref.WeakSet()
+
     def __new__(cls, name, bases, optdict):
+        compact = any(getattr(base, '_compact', False) for base in bases)
+        if compact:
+            # keep subclasses of compact documents without any `__dict__`
+            optdict.setdefault('__slots__', ())
         instance = super().__new__(cls, name, bases, optdict)
+        schema = Schema.from_class(instance, compact=compact)
+        instance._schema = schema
+        instance._keys = schema.keys
+        instance._indexes = cls.collect_indexes(instance)
+        if instance._indexes:
+            cls.indexed_models.add(instance)
 
         manager_class = getattr(instance, 'manager_class', None)
         instance.objects = QuerySet(instance) if not manager_class \
             else manager_class(instance)
+        async_manager_class = getattr(instance, 'async_manager_class', None)
+        instance.aobjects = AsyncQuerySet(instance) \
+            if not async_manager_class else async_manager_class(instance)
+        if instance.db_alias:
+            instance.objects = instance.objects.using(instance.db_alias)
+            instance.aobjects = instance.aobjects.using(instance.db_alias)
+        cls.models.add(instance)
+        cls.declared += 1
 
         # declaration of thoses errors here to have proper errors per
         # documents kinds instead of global ones
@@ -34,19 +68,65 @@ class DocumentMeta(type):
 
         return instance
 
-
-class Document(metaclass=DocumentMeta):
-    _id: ObjectId = None
+    @staticmethod
+    def collect_indexes(klass: type) -> Tuple[Index, ...]:
+        """Indexes declared in the `indexes` attribute of `klass` and all it's
+        parents, a redeclared name replace the inherited index
+        """
+        indexes = {}
+        for base in reversed(klass.__mro__):
+            for declaration in vars(base).get('indexes', ()):
+                index = Index.from_declaration(declaration)
+                indexes[index.name] = index
+        return tuple(indexes.values())
+
+
+class BaseDocument(metaclass=DocumentMeta):
+    """Common implementation of `Document` and `CompactDocument`, the state
+    of an instance is kept in slots:
+    - `_id`
+    - `_values`: values of the declared fields, see `Schema.keys`
+    - `_bound`: per instance fields (stateful or added ones) or None
+    - `_fields`: names of the fields when they differ from the schema
+    - `_synced`: snapshot of the fields as they are in the database, None
+      until the document is loaded or saved
+    - `_deferred`: names of the fields not loaded from the database or None
+    """
+    __slots__ = ('_id', '_values', '_bound', '_fields', '_synced',
+                 '_deferred')
+    _id: ObjectId
     collection: str = None
-    fields: List[str] = []
+    # name of the connection of this model, see `register_connection`
+    db_alias: str = None
     objects: QuerySet = None
+    aobjects: AsyncQuerySet = None
+    _schema: Schema = None
+    _indexes: Tuple[Index, ...] = ()
+    _compact = False
+
+    def __new__(cls, *args, **kwargs):
+        """Setup the per instance state: only the values of the declared
+        fields, plus a copy of the stateful ones, the fields themselves are
+        described once by the class `_schema`.
+        the state exists before `__init__` so subclasses can add fields prior
+        to calling `super().__init__()`
+        """
+        instance = super().__new__(cls)
+        schema = cls._schema
+        object.__setattr__(instance, '_id', None)
+        object.__setattr__(instance, '_values', schema.new_values())
+        object.__setattr__(instance, '_bound', {
+            name: schema.fields[name].copy() for name in schema.stateful
+        } if schema.stateful else None)
+        object.__setattr__(instance, '_fields', None)
+        object.__setattr__(instance, '_synced', None)
+        object.__setattr__(instance, '_deferred', None)
+        return instance
 
     def __init__(self, collection=None, **kwargs):
         self._id = kwargs.pop('_id', None)
-        self.fields_discover()
-        if collection:
+        if collection and collection != self.collection:
             self.collection = collection
-        self._copy_fields()
         for key, value in kwargs.items():
             setattr(self, key, value)
 
@@ -58,68 +138,242 @@ class Document(metaclass=DocumentMeta):
     def __repr__(self):
         return f'<{self.__class__.__name__}: {self}>'
 
-    def _copy_fields(self) -> None:
-        """Fields needs to be differents object from the main class declaration
-        to prevent instance_a to taint on instance_b
+    @property
+    def fields(self) -> List[str]:
+        """Names of all fields of this document, the declared ones first then
+        the ones added on this instance with `add_field`
         """
-        for field_name in self.fields:
-            field = object.__getattribute__(self, field_name)
-            object.__setattr__(self, field_name, field.copy())
-
-    def fields_discover(self):
-        # discover class fields
-        self.fields = list(filter(
-            lambda x: isinstance(object.__getattribute__(self, x), Field),
-            dir(self)
-        ))
+        return list(self._field_names())
 
-    def __getattribute__(self, name):
-        attribute = super().__getattribute__(name)
-        if isinstance(attribute, Field):
-            return attribute.get()
-        return attribute
+    def _field_names(self) -> Tuple[str, ...]:
+        names = self._fields
+        return self._schema.names if names is None else names
 
-    def __setattr__(self, name, value):
+    def add_field(self, name: str, field: Field) -> None:
+        """Add a field on this instance only, this is the hook used when
+        assigning a `Field` to an attribute: `user.extra = Field(...)`
+        the class schema and the other instances are left untouched.
+        """
+        if name in self._schema:
+            raise AttributeError(
+                f'{name} is already a field of {type(self).__name__}')
+        bound = self._bound
+        if bound is None:
+            bound = {}
+            object.__setattr__(self, '_bound', bound)
+        bound[name] = field
+        names = self._field_names()
+        if name not in names:
+            object.__setattr__(self, '_fields', names + (name,))
+
+    def remove_field(self, name: str) -> None:
+        """Remove a field from this instance only, this is the hook used by
+        `del user.name`, a removed declared field goes back to it's initial
+        value and is no longer part of `fields` nor `to_dict()`
+        """
+        names = self._field_names()
+        if name not in names:
+            raise AttributeError(name)
+        object.__setattr__(self, '_fields',
+                           tuple(x for x in names if x != name))
+        schema = self._schema
+        if name in schema.initial:
+            self._values[schema.keys[name]] = schema.initial[name]
+        elif name in schema:
+            self._bound[name] = schema[name].copy()
+        else:
+            del self._bound[name]
+
+    def __getattr__(self, name):
+        # declared fields are descriptors, this is only reached for fields
+        # added with `add_field`
         try:
-            attribute = self.raw_attr(name)
+            bound = object.__getattribute__(self, '_bound')
         except AttributeError:
-            attribute = None
-        # updaging a current field
-        if attribute and isinstance(attribute, Field):
-            attribute.set_value(value)
+            raise AttributeError(name)
+        if bound and name in bound:
+            return bound[name].get()
+        values = object.__getattribute__(self, '_values')
+        if type(values) is LazyValues:
+            # extra keys of a lazily loaded document
+            value = values.document.decode(name, _MISSING)
+            if value is not _MISSING:
+                object.__setattr__(self, name, value)
+                return value
+        raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        if isinstance(value, Field):
+            self.add_field(name, value)
             return
-        super().__setattr__(name, value)
-        if isinstance(value, Field) and name not in self.fields:
-            self.fields.append(name)
+        bound = self._bound
+        if bound and name in bound:
+            bound[name].set_value(value)
+            return
+        object.__setattr__(self, name, value)
 
     def __delattr__(self, name):
-        if name in self.fields:
-            self.fields.remove(name)
-        super().__delattr__(name)
+        bound = self._bound
+        if bound and name in bound and name not in self._schema:
+            self.remove_field(name)
+            return
+        object.__delattr__(self, name)
+
+    def mark_clean(self) -> None:
+        """Consider the current state of the document as the one stored in the
+        database, called after each load or save
+        """
+        bound = self._bound
+        object.__setattr__(self, '_synced', (
+            self._values.copy(),
+            self._field_names(),
+            {name: field.value for name, field in bound.items()}
+            if bound else None
+        ))
+        identity_map = identity.current()
+        if identity_map is not None:
+            identity_map.add(self)
+
+    def mark_dirty(self, *names: str) -> None:
+        """Flag the given fields as changed, changes are detected on
+        assignment only so use it after an in place update:
+        `user.tags.append('x'); user.mark_dirty('tags')`
+        """
+        synced = self._synced
+        if synced is None:
+            return
+        values, synced_names, bound_values = synced
+        values = values.copy()
+        bound_values = dict(bound_values or {})
+        keys = self._schema.keys
+        for name in names:
+            if name in bound_values:
+                bound_values[name] = _MISSING
+            elif name in keys:
+                values[keys[name]] = _MISSING
+        object.__setattr__(self, '_synced',
+                           (values, synced_names, bound_values))
+
+    def _changes(self) -> Tuple[List[str], List[str]]:
+        """Returns the names of the fields changed since the last sync with
+        the database and the ones removed from the document
+        """
+        names = self._field_names()
+        synced = self._synced
+        if synced is None:
+            return list(names), []
+        synced_values, synced_names, synced_bound = synced
+        keys = self._schema.keys
+        values = self._values
+        lazy = type(values) is LazyValues
+        bound = self._bound or {}
+        changed = []
+        for name in names:
+            if name not in synced_names:
+                changed.append(name)
+                continue
+            if name in bound:
+                old = synced_bound.get(name, _MISSING) \
+                    if synced_bound else _MISSING
+                new = bound[name].value
+            elif lazy and name not in values and name not in synced_values:
+                # never decoded nor assigned
+                continue
+            else:
+                old = synced_values[keys[name]]
+                new = values[keys[name]]
+            if old is not new and (old is _MISSING or old != new):
+                changed.append(name)
+        removed = [name for name in synced_names if name not in names]
+        return changed, removed
+
+    @property
+    def deferred_fields(self) -> frozenset:
+        """Names of the fields which were not loaded from the database (see
+        `QuerySet.only` and `QuerySet.defer`), they are neither validated nor
+        written by `save` unless they are assigned.
+        """
+        return self._deferred or frozenset()
+
+    @property
+    def changed_fields(self) -> List[str]:
+        """Names of the fields changed or removed since the document was
+        loaded or saved, all fields for a document never synced
+        """
+        changed, removed = self._changes()
+        return changed + removed
+
+    @property
+    def is_dirty(self) -> bool:
+        changed, removed = self._changes()
+        return bool(changed or removed)
 
     def pre_save(self, content: dict, is_new=False) -> None:
         """Called just before calling the database to send the document
-        content is all fields formated and ready for the database, including
-        default values
+        content is the fields about to be written, formated and ready for the
+        database, including default values: all of them for a new document,
+        only the changed ones otherwise, it can be updated in place.
         """
         pass
 
     def save(self, session=None):
         """Update or insert the current document to the database if needed
-        then return the response from the database
+        then return the response from the database.
+        an update only `$set` the changed fields and `$unset` the ones removed
+        or cleared to None, nothing is sent if the document is not dirty
+        and None is returned.
         """
-        if not self.is_valid():
-            raise self.DocumentInvalid(self.invalid_fields())
+        # validated once: the invalid fields tell the validity too
+        invalid = self.invalid_fields()
+        if invalid and self._any_required(invalid):
+            raise self.DocumentInvalid(invalid)
         collection = self.objects.get_collection()
-        document_content = self.to_dict()
-        self.pre_save(document_content, self._id is None)
         if not self._id:
+            document_content = self.to_dict()
+            self.pre_save(document_content, True)
             response = collection.insert_one(document_content, session=session)
             self._id = response.inserted_id
+            self.mark_clean()
+            self.objects.invalidate_cache()
             return response
-        return collection.update_one({'_id': self._id},
-                                     {'$set': document_content},
-                                     session=session)
+
+        update = self.get_update()
+        if update is None:
+            return None
+        response = collection.update_one({'_id': self._id}, update,
+                                         session=session)
+        self.mark_clean()
+        self.objects.invalidate_cache()
+        return response
+
+    def get_update(self) -> dict:
+        """Returns the update operation (`$set` / `$unset`) to send for this
+        already stored document, `pre_save` included, or None if the document
+        did not change.
+        """
+        changed, unset = self._changes()
+        if not changed and not unset:
+            return None
+        document_content = {}
+        for name in changed:
+            value = getattr(self, name)
+            if value is None:
+                unset.append(name)
+            else:
+                document_content[name] = value
+        self.pre_save(document_content, False)
+        update = {}
+        if document_content:
+            update['$set'] = document_content
+        unset = {name: '' for name in unset if name not in document_content}
+        if unset:
+            update['$unset'] = unset
+        return update or None
+
+    async def asave(self, session=None):
+        """Awaitable version of `save`
+        """
+        return await self.aobjects.run(self.save, session=session)
 
     def commit(self, **kwargs) -> 'Document':
         """Perform a `.save()` but return self insead of the database response
@@ -127,6 +381,10 @@ class Document(metaclass=DocumentMeta):
         self.save(**kwargs)
         return self
 
+    async def acommit(self, **kwargs) -> 'Document':
+        await self.asave(**kwargs)
+        return self
+
     def delete(self, session=None) -> pymongo.collection.DeleteResult:
         """Remove the current document from the database if already present
         the _id is used to know if the document is in db.
@@ -135,9 +393,19 @@ class Document(metaclass=DocumentMeta):
             return
         response = self.objects.get_collection().delete_one(
             {'_id': self._id}, session=session)
+        self.objects.invalidate_cache()
+        identity_map = identity.current()
+        if identity_map is not None:
+            identity_map.discard(*identity_map.key(self))
         self._id = None
+        object.__setattr__(self, '_synced', None)
         return response
 
+    async def adelete(self, session=None) -> pymongo.collection.DeleteResult:
+        """Awaitable version of `delete`
+        """
+        return await self.aobjects.run(self.delete, session=session)
+
     def refresh(self, session=None) -> 'Document':
         """Reload the current id from the database, if no id is available a
         ValueError will be raised.
@@ -147,57 +415,187 @@ class Document(metaclass=DocumentMeta):
 
         response = self.objects \
             .get_collection().find_one({'_id': self._id}, session=session)
-        self.update(**response)
+        return self._reload(response)
+
+    def _reload(self, data: dict) -> 'Document':
+        self.update(**data)
+        object.__setattr__(self, '_deferred', None)
+        self.mark_clean()
         return self
 
+    async def arefresh(self, session=None) -> 'Document':
+        """Awaitable version of `refresh`
+        """
+        return await self.aobjects.run(self.refresh, session=session)
+
     def to_dict(self) -> dict:
-        return dict({k: getattr(self, k) for k in self.fields})
+        return dict({k: getattr(self, k) for k in self._field_names()})
 
     def raw_attr(self, name):
-        """Allow retrive of a raw field attribute instead of it's value
+        """Allow retrive of a raw field attribute instead of it's value,
+        declared fields are shared by the whole class so a detached copy
+        holding the value of this document is returned for them.
+        """
+        bound = self._bound
+        if bound and name in bound:
+            return bound[name]
+        schema = self._schema
+        if name in schema.initial:
+            field = schema[name].copy()
+            field.set_value(self._values[schema.keys[name]])
+            return field
+        return getattr(self, name)
+
+    def _validity(self):
+        """Yield (name, required, valid) for each field of the document
         """
-        return super().__getattribute__(name)
+        fields = self._schema.fields
+        keys = self._schema.keys
+        values = self._values
+        bound = self._bound or {}
+        names = self._field_names()
+        if self._deferred:
+            changed, _ = self._changes()
+            names = [name for name in names
+                     if name not in self._deferred or name in changed]
+        for name in names:
+            field = bound.get(name)
+            if field is not None:
+                yield name, field.required, field.is_valid()
+            else:
+                field = fields[name]
+                yield (name, field.required,
+                       field.is_valid_value(values[keys[name]]))
 
     def is_valid(self, raises=False) -> bool:
-        for field_name in self.fields:
-            field = object.__getattribute__(self, field_name)
-            if not field.is_valid() and field.required:
-                if raises:
-                    raise self.DocumentInvalid(self._id)
-                return False
-        return True
+        if self._fields is None and not self._deferred:
+            # only the declared fields: the compiled validator of the class
+            invalid = self._schema.validator(self._values, self._bound)
+            valid = not self._any_required(invalid)
+        else:
+            valid = all(valid or not required
+                        for _, required, valid in self._validity())
+        if not valid and raises:
+            raise self.DocumentInvalid(self._id)
+        return valid
+
+    def _any_required(self, names: List[str]) -> bool:
+        """Tell if one of the fields `names` is required
+        """
+        bound = self._bound or {}
+        fields = self._schema.fields
+        return any((bound[name] if name in bound else fields[name]).required
+                   for name in names)
 
     def invalid_fields(self) -> List[str]:
         """Return a list of all invalid fields for this document.
         in case of a valid document then an empty list will be returned.
         """
-        invalids = []
-        for field_name in self.fields:
-            field = self.raw_attr(field_name)
-            if not field.is_valid():
-                invalids.append(field_name)
-        return invalids
+        if self._fields is None and not self._deferred:
+            return self._schema.validator(self._values, self._bound)
+        return [name for name, _, valid in self._validity() if not valid]
+
+    @classmethod
+    def validate_many(cls, documents: List['Document']
+                      ) -> Tuple[List['Document'], List['Document']]:
+        """Split `documents` in (valid, invalid) ones, like `insert_many`
+        and `bulk_save` do before writing anything
+        """
+        valid = []
+        invalid = []
+        for document in documents:
+            (valid if document.is_valid() else invalid).append(document)
+        return valid, invalid
 
     @classmethod
     def from_id(cls, document_id: ObjectId, collection=None) -> 'Document':
+        document = cls._from_identity_map(document_id)
+        if document is not None:
+            return document
         collection = collection if collection else cls.collection
         resource = cls.objects.get_collection().find_one({'_id': document_id})
         if not resource:
             raise cls.DoesNotExist(document_id)
         document = cls(**resource, collection=collection)
+        document.mark_clean()
         return document
 
+    @classmethod
+    async def afrom_id(cls, document_id: ObjectId,
+                       collection=None) -> 'Document':
+        return await cls.aobjects.run(cls.from_id, document_id, collection)
+
+    @classmethod
+    def from_database(cls, data: dict, deferred: frozenset = None
+                      ) -> 'Document':
+        """Build a document from a raw database response, `deferred` are the
+        names of the fields left out by the projection
+        the instance of the active identity map is returned if there is one.
+        """
+        document = cls._from_identity_map(data.get('_id'))
+        if document is not None:
+            return document
+        document = cls(**data)
+        if deferred:
+            object.__setattr__(document, '_deferred', deferred)
+        document.mark_clean()
+        return document
+
+    @classmethod
+    def from_raw(cls, data, deferred: frozenset = None,
+                 codec_options=None) -> 'Document':
+        """Build a document from a raw BSON response (bytes or a
+        `RawBSONDocument`) without decoding it: each field is decoded on it's
+        first access, see `QuerySet.lazy`.
+        `__init__` is not called, compact documents are decoded at once.
+        """
+        raw = getattr(data, 'raw', data)
+        if cls._compact:
+            return cls.from_database(bson.decode(raw, codec_options),
+                                     deferred)
+        document_raw = RawDocument(raw, codec_options)
+        document_id = document_raw.decode('_id')
+        document = cls._from_identity_map(document_id)
+        if document is not None:
+            return document
+        document = cls.__new__(cls)
+        schema = cls._schema
+        object.__setattr__(document, '_id', document_id)
+        object.__setattr__(document, '_values',
+                           LazyValues(document_raw, schema.initial))
+        for name in schema.stateful:
+            value = document_raw.decode(name, _MISSING)
+            if value is not _MISSING:
+                setattr(document, name, value)
+        if deferred:
+            object.__setattr__(document, '_deferred', deferred)
+        document.mark_clean()
+        return document
+
+    @classmethod
+    def _from_identity_map(cls, document_id) -> 'Document':
+        identity_map = identity.current()
+        if identity_map is None or document_id is None:
+            return None
+        document = identity_map.get(cls.objects.get_namespace(),
+                                    document_id)
+        return document if isinstance(document, cls) else None
+
     def copy(self) -> 'Document':
         """Returns a new instance of the current class, also make a copy of
-        each fields in the document
+        each fields added on the document
         """
-        fields = {name: object.__getattribute__(self, name).copy()
-                  for name in self.fields}
-        doc = type(self)(collection=self.collection, **fields)
+        doc = type(self)(collection=self.collection)
+        bound = self._bound
+        object.__setattr__(doc, '_values', self._values.copy())
+        object.__setattr__(doc, '_bound', {
+            name: field.copy() for name, field in bound.items()
+        } if bound else None)
+        object.__setattr__(doc, '_fields', self._fields)
         return doc
 
     def clear(self) -> 'Document':
-        for field in self.fields:
+        for field in self._field_names():
             setattr(self, field, None)
         return self
 
@@ -207,7 +605,7 @@ class Document(metaclass=DocumentMeta):
         return self
 
     def __iter__(self):
-        for field_name in self.fields:
+        for field_name in self._field_names():
             yield field_name, getattr(self, field_name)
 
     @classmethod
@@ -217,17 +615,67 @@ class Document(metaclass=DocumentMeta):
         invalid ones but will not insert them, instead this function return the
         list of inserted items, it will also populate then with an ._id
         """
-        insert_list = [doc for doc in documents if doc.is_valid()]
+        insert_list, _ = cls.validate_many(documents)
 
         result = cls.objects.get_collection().insert_many(
             [doc.to_dict() for doc in insert_list],
             session=session
         )
+        cls.objects.invalidate_cache()
 
         for doc, objectid in zip(insert_list, result.inserted_ids):
             doc._id = objectid
+            doc.mark_clean()
         return insert_list
 
+    @classmethod
+    async def ainsert_many(cls, documents: List['Document'],
+                           session=None) -> List['Document']:
+        return await cls.aobjects.run(cls.insert_many, documents,
+                                      session=session)
+
+    @classmethod
+    def refresh_many(cls, documents: List['Document'], chunk_size: int = 1000,
+                     raise_missing=True) -> List['Document']:
+        """Reload many documents with one `$in` query per `chunk_size`
+        documents, the documents which are not in the database anymore are
+        returned, or a `DoesNotExist` with their ids is raised (once all the
+        others have been reloaded) if `raise_missing`.
+        """
+        if any(not document._id for document in documents):
+            raise ValueError('id')
+        by_id = {}
+        for document in documents:
+            by_id.setdefault(document._id, []).append(document)
+        for data in cls.objects.raw_in_bulk(list(by_id), chunk_size):
+            for document in by_id.pop(data['_id']):
+                document._reload(data)
+        missing = [document for same_id in by_id.values()
+                   for document in same_id]
+        if missing and raise_missing:
+            raise cls.DoesNotExist(list(by_id))
+        return missing
+
+    @classmethod
+    async def arefresh_many(cls, documents: List['Document'],
+                            chunk_size: int = 1000,
+                            raise_missing=True) -> List['Document']:
+        return await cls.aobjects.run(cls.refresh_many, documents, chunk_size,
+                                      raise_missing)
+
+    @classmethod
+    def ensure_indexes(cls, dry_run=False) -> IndexReport:
+        """Create the declared `indexes` missing from the collection, with
+        `dry_run` nothing is created and the report only tells the
+        differences
+        """
+        return sync_indexes(cls.objects.get_collection(), cls._indexes,
+                            dry_run=dry_run)
+
+    @classmethod
+    async def aensure_indexes(cls, dry_run=False) -> IndexReport:
+        return await cls.aobjects.run(cls.ensure_indexes, dry_run)
+
     @classmethod
     def delete_many(cls, documents: List['Document'],
                     session=None) -> List['Document']:
@@ -236,6 +684,85 @@ class Document(metaclass=DocumentMeta):
             {'_id': {'$in': list(doclist.keys())}},
             session=session
         )
+        cls.objects.invalidate_cache()
+        identity_map = identity.current()
         for doc in doclist.values():
+            if identity_map is not None:
+                identity_map.discard(*identity_map.key(doc))
             doc._id = None
+            object.__setattr__(doc, '_synced', None)
         return documents
+
+
+class Document(BaseDocument):
+    """A mongodb document, declare the fields of a model as class attributes.
+    """
+
+
+class CompactDocument(BaseDocument):
+    """Memory efficient flavour of `Document` for large result sets: the
+    instances have no `__dict__` and keep their values in a list laid out by
+    the class schema, fields are shared at the class level.
+
+    attributes which are not fields (like extra keys coming from the
+    database) are kept in a dict created on demand, the attributes of the
+    class (`collection`...) can't be overriden per instance.
+    """
+    __slots__ = ('_extra',)
+    _compact = True
+
+    def __new__(cls, *args, **kwargs):
+        instance = super().__new__(cls, *args, **kwargs)
+        object.__setattr__(instance, '_extra', None)
+        return instance
+
+    def __getattr__(self, name):
+        try:
+            extra = object.__getattribute__(self, '_extra')
+        except AttributeError:
+            raise AttributeError(name)
+        if extra and name in extra:
+            return extra[name]
+        return super().__getattr__(name)
+
+    def __setattr__(self, name, value):
+        try:
+            super().__setattr__(name, value)
+        except AttributeError:
+            if isinstance(value, Field) or hasattr(type(self), name):
+                raise
+            if self._extra is None:
+                object.__setattr__(self, '_extra', {})
+            self._extra[name] = value
+
+    def __delattr__(self, name):
+        extra = self._extra
+        if extra and name in extra:
+            del extra[name]
+            return
+        super().__delattr__(name)
+
+
+def ensure_all_indexes(dry_run=False
+                       ) -> Dict[Tuple[str, str], IndexReport]:
+    """`ensure_indexes` for all the models declaring indexes, the models
+    sharing a collection are merged, returns the report of each collection
+    by `(alias, collection name)` (the alias is None for a `Database` given
+    to a queryset)
+    """
+    collections = {}
+    # subclasses last so their declarations win
+    models = sorted(DocumentMeta.indexed_models,
+                    key=lambda model: len(model.__mro__))
+    for model in models:
+        objects = model.objects
+        collection = objects.get_collection()
+        _, _, indexes = collections.setdefault(
+            (id(objects.get_database()), collection.name),
+            (objects.get_db_alias(), collection, {}))
+        indexes.update({index.name: index for index in model._indexes})
+    return {
+        (alias, collection.name): sync_indexes(
+            collection, list(indexes.values()), dry_run=dry_run)
+        for alias, collection, indexes in collections.values()
+    }
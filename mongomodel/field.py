@@ -2,17 +2,63 @@ import re
 from datetime import datetime
 
 
+EMAIL_REGEX = re.compile(r'^[\w\.]+@[\w.]+\.[a-z]{2,3}$')
+
+
 class Field:
     """A field is a basic description of a database document part,
     a default field is allways considered as valid.
+
+    Fields declared on a `Document` class are data descriptors shared by all
+    it's instances, so the validation and default logic lives in the value
+    based methods `resolve` and `validate`, the value holding ones (`get`,
+    `check`...) are kept for standalone fields.
     """
     value = None
+    # attribute name of the field once declared on a `Document` class, the
+    # key of it's value in the documents (the name, or the index in the
+    # values of a compact document) is given by their class `_keys`: the
+    # field can be shared by several classes (see `Schema.keys`)
+    name: str = None
+    # fields overriding the value holding api keep their state on themselves,
+    # documents then hold a per instance copy of them (slower)
+    stateful = False
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if any(name in cls.__dict__
+               for name in ('get', 'set_value', 'check', 'is_valid')):
+            cls.stateful = True
 
     def __init__(self, value=None, required=True, default=None):
         self.required = required
         self.default = default
         self.set_value(value)
 
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        if self.stateful:
+            return instance._bound[self.name].get()
+        if instance._compact:
+            return self.resolve(
+                instance._values[instance._keys[self.name]])
+        return self.resolve(instance._values[self.name])
+
+    def __set__(self, instance, value):
+        if self.stateful:
+            instance._bound[self.name].set_value(value)
+        elif instance._compact:
+            instance._values[instance._keys[self.name]] = value
+        else:
+            instance._values[self.name] = value
+
+    def __delete__(self, instance):
+        instance.remove_field(self.name)
+
     def set_value(self, value):
         self.value = value
 
@@ -23,16 +69,49 @@ class Field:
         except (ValueError, TypeError):
             return False
 
+    def is_valid_value(self, value) -> bool:
+        """Same as `is_valid` but for the given value instead of the current
+        one
+        """
+        try:
+            self.validate(self.resolve(value))
+            return True
+        except (ValueError, TypeError):
+            return False
+
     def check(self):
+        self.validate(self.get())
+
+    def validate(self, value) -> None:
+        """Raise a ValueError or a TypeError if the value (with the default
+        already applied) can't be stored in this field
+        """
         pass
 
+    def compile_validation(self, value: str, ref) -> str:
+        """Python expression, true when the variable `value` (the default
+        already applied) is invalid, inlined in the validator compiled for
+        each `Document` class, `ref(obj)` returns the name to use for `obj`
+        in the expression.
+        an empty expression means any value is valid and None that
+        `validate` can't be inlined (it is then called)
+        """
+        if type(self).validate is not Field.validate:
+            return None
+        return ''
+
+    def resolve(self, value):
+        """Returns the given value or the default if the value is None
+        """
+        if value is None and self.default is not None:
+            return self.default()
+        return value
+
     def get(self):
         """Returns the current value of the field, depending of a default or
         the real value if available.
         """
-        if self.value is None and self.default is not None:
-            return self.default()
-        return self.value
+        return self.resolve(self.value)
 
     def copy(self, **kwargs):
         field = type(self)(value=self.value, required=self.required,
@@ -51,28 +130,47 @@ class StringField(Field):
         instance.value = f'{self.value}' if self.value is not None else None
         return instance
 
-    def check(self):
-        value = self.get()
+    def validate(self, value) -> None:
         if not isinstance(value, str):
             raise TypeError(value, type(value))
         if self.maxlen and len(value) > self.maxlen:
             raise ValueError(value)
 
+    def compile_validation(self, value: str, ref) -> str:
+        if type(self).validate is not StringField.validate:
+            return None
+        return self._string_validation(value)
+
+    def _string_validation(self, value: str) -> str:
+        expression = f'not isinstance({value}, str)'
+        if self.maxlen:
+            expression += f' or len({value}) > {self.maxlen!r}'
+        return expression
+
 
 class EmailField(StringField):
-    def check(self) -> None:
-        super().check()
-        value = self.get()
-        if not re.match(r'^[\w\.]+@[\w.]+\.[a-z]{2,3}$', value):
+    def validate(self, value) -> None:
+        super().validate(value)
+        if not EMAIL_REGEX.match(value):
             raise ValueError(value)
 
+    def compile_validation(self, value: str, ref) -> str:
+        if type(self).validate is not EmailField.validate:
+            return None
+        return (f'{self._string_validation(value)} or '
+                f'not {ref(EMAIL_REGEX.match)}({value})')
+
 
 class IntegerField(Field):
-    def check(self) -> None:
-        value = self.get()
+    def validate(self, value) -> None:
         if not isinstance(value, int) or type(value) is bool:
             raise ValueError(value)
 
+    def compile_validation(self, value: str, ref) -> str:
+        if type(self).validate is not IntegerField.validate:
+            return None
+        return f'not isinstance({value}, int) or type({value}) is bool'
+
 
 class TypeField(Field):
     """Just enforce an object type, it can be scallar or not, just be carefull
@@ -84,14 +182,20 @@ class TypeField(Field):
         super().__init__(*args, **kwargs)
         self.type = required_type
 
-    def check(self) -> None:
-        value = self.get()
+    def validate(self, value) -> None:
         if self.type is None:
             if value is not None:
                 raise ValueError(value)
         elif not isinstance(value, self.type):
             raise ValueError(value)
 
+    def compile_validation(self, value: str, ref) -> str:
+        if type(self).validate is not TypeField.validate:
+            return None
+        if self.type is None:
+            return f'{value} is not None'
+        return f'not isinstance({value}, {ref(self.type)})'
+
     def copy(self):
         return super().copy(required_type=self.type)
 
@@ -120,12 +224,17 @@ class RegexField(StringField):
         self.regex = re.compile(regex)
         self.rule = regex
 
-    def check(self) -> None:
-        super().check()
-        value = self.get()
+    def validate(self, value) -> None:
+        super().validate(value)
         if not self.regex.match(value):
             raise ValueError(value)
 
+    def compile_validation(self, value: str, ref) -> str:
+        if type(self).validate is not RegexField.validate:
+            return None
+        return (f'{self._string_validation(value)} or '
+                f'not {ref(self.regex.match)}({value})')
+
     def copy(self):
         instance = super().copy()
         instance.rule = f'{self.rule}'
@@ -0,0 +1,105 @@
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Optional, Tuple
+
+_current: ContextVar = ContextVar('mongomodel_identity_map', default=None)
+
+
+def current() -> Optional['IdentityMap']:
+    """Returns the identity map active in the current context, if any
+    """
+    return _current.get()
+
+
+class IdentityMap:
+    """Cache of the documents loaded during a unit of work (a request, a
+    task...) so the same `(collection, _id)` always gives the same instance:
+
+    >>> with IdentityMap(maxsize=1000):
+    ...     a = User.from_id(user_id)
+    ...     b = User.objects.get(_id=user_id)  # no database call
+    ...     a is b
+    True
+
+    it is filled by `from_id`, `get`, `find` and the iteration, kept up to
+    date by `save`, `delete` and `refresh`, a document already in the map is
+    returned as it is (call `refresh` to reload it).
+    the least recently used documents are evicted above `maxsize` documents.
+    the map is bound to the current context (thread or asyncio task).
+    the collections of the other connections than the default one are named
+    `alias/collection` (see `QuerySet.get_namespace`), the documents read
+    with `using` from an other connection than the one of their model are
+    left out of the map.
+    """
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._documents: OrderedDict = OrderedDict()
+        self._tokens = []
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__}: {len(self)}/{self.maxsize}>'
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def __contains__(self, key: Tuple[str, Any]) -> bool:
+        return key in self._documents
+
+    def __enter__(self) -> 'IdentityMap':
+        self._tokens.append(_current.set(self))
+        return self
+
+    def __exit__(self, *exc):
+        _current.reset(self._tokens.pop())
+
+    @staticmethod
+    def key(document) -> Tuple[str, Any]:
+        return (document.objects.get_namespace(), document._id)
+
+    def get(self, collection: str, document_id: Any):
+        """Returns the document stored for the given collection and id or
+        None
+        """
+        key = (collection, document_id)
+        document = self._documents.get(key)
+        if document is not None:
+            self._documents.move_to_end(key)
+        return document
+
+    def add(self, document) -> None:
+        if document._id is None:
+            return
+        key = self.key(document)
+        self._documents[key] = document
+        self._documents.move_to_end(key)
+        while len(self._documents) > self.maxsize:
+            self._documents.popitem(last=False)
+
+    def discard(self, collection: str, document_id: Any) -> None:
+        self._documents.pop((collection, document_id), None)
+
+    def discard_collection(self, collection: str) -> None:
+        """Forget all documents of a collection, used when a server side
+        write makes them stale
+        """
+        for key in [key for key in self._documents if key[0] == collection]:
+            del self._documents[key]
+
+    def clear(self) -> None:
+        self._documents.clear()
+
+
+def without_identity_map(function, *args, **kwargs):
+    """Call `function` with no active identity map
+    """
+    token = _current.set(None)
+    try:
+        return function(*args, **kwargs)
+    finally:
+        _current.reset(token)
+
+
+def identity_map(maxsize: int = 10000) -> IdentityMap:
+    """Shortcut for `with IdentityMap(maxsize):`
+    """
+    return IdentityMap(maxsize)
@@ -0,0 +1,145 @@
+from typing import Any, Dict, List, Tuple, Union
+
+from pymongo import IndexModel
+
+# options compared to the server ones to know if an index changed
+COMPARED_OPTIONS = ('unique', 'sparse', 'expireAfterSeconds',
+                    'partialFilterExpression')
+
+
+class Index:
+    """An index declared in the `indexes` attribute of a model:
+
+    >>> class User(Document):
+    ...     indexes = [
+    ...         'name',
+    ...         Index('email', unique=True),
+    ...         Index('country', '-created'),
+    ...         Index('created', expire_after=3600),
+    ...         Index('email', name='email_active', unique=True,
+    ...               partial={'active': True}),
+    ...     ]
+
+    keys are field names, prefixed by `-` for a descending order, or
+    `(field, kind)` tuples for special indexes (`'text'`, `'2dsphere'`...),
+    other keywords are given to `create_indexes` as they are.
+    """
+    def __init__(self, *keys: Union[str, Tuple[str, Any]], name: str = None,
+                 unique=False, sparse=False, expire_after: int = None,
+                 partial: dict = None, **options):
+        if not keys:
+            raise ValueError('an index needs at least one key')
+        self.keys: List[Tuple[str, Any]] = [
+            self.key_instruction(key) for key in keys]
+        self.options: Dict[str, Any] = dict(options)
+        if unique:
+            self.options['unique'] = True
+        if sparse:
+            self.options['sparse'] = True
+        if expire_after is not None:
+            self.options['expireAfterSeconds'] = expire_after
+        if partial:
+            self.options['partialFilterExpression'] = partial
+        self.name = name or '_'.join(
+            f'{field}_{direction}' for field, direction in self.keys)
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__}: {self.name}>'
+
+    def __eq__(self, other):
+        if not isinstance(other, Index):
+            return NotImplemented
+        return self.name == other.name and self.keys == other.keys and \
+            self.compared_options() == other.compared_options()
+
+    def __hash__(self):
+        return hash(self.name)
+
+    @staticmethod
+    def key_instruction(key: Union[str, Tuple[str, Any]]) -> Tuple[str, Any]:
+        if not isinstance(key, str):
+            return tuple(key)
+        if key.startswith('-'):
+            return (key[1:], -1)
+        return (key, 1)
+
+    @classmethod
+    def from_declaration(cls, declaration: Union['Index', str, tuple]
+                         ) -> 'Index':
+        """Accept an `Index`, a field name or a tuple of field names
+        """
+        if isinstance(declaration, Index):
+            return declaration
+        if isinstance(declaration, str):
+            return cls(declaration)
+        return cls(*declaration)
+
+    @classmethod
+    def from_server(cls, info: dict) -> 'Index':
+        """Build an index from an entry of `Collection.list_indexes()`
+        """
+        options = {key: info[key] for key in COMPARED_OPTIONS if key in info}
+        index = cls(*info['key'].items(), name=info['name'])
+        index.options = options
+        return index
+
+    def compared_options(self) -> Dict[str, Any]:
+        return {key: self.options[key] for key in COMPARED_OPTIONS
+                if self.options.get(key) not in (None, False)}
+
+    def as_index_model(self) -> IndexModel:
+        return IndexModel(self.keys, name=self.name, **self.options)
+
+
+class IndexReport:
+    """Difference between the indexes declared on a model and the ones of
+    it's collection, returned by `Document.ensure_indexes`:
+    - missing: declared but not on the server (created unless dry run)
+    - changed: same name but other keys or options on the server, they are
+      never dropped automatically
+    - extra: on the server but not declared (`_id_` excluded)
+    - created: names of the created indexes
+    """
+    def __init__(self, collection: str):
+        self.collection = collection
+        self.missing: List[Index] = []
+        self.changed: List[Index] = []
+        self.extra: List[Index] = []
+        self.created: List[str] = []
+
+    def __repr__(self):
+        return (f'<{self.__class__.__name__}: {self.collection} '
+                f'missing={[index.name for index in self.missing]} '
+                f'changed={[index.name for index in self.changed]} '
+                f'extra={[index.name for index in self.extra]}>')
+
+    @property
+    def in_sync(self) -> bool:
+        return not self.missing and not self.changed and not self.extra
+
+
+def sync_indexes(collection, indexes: List[Index],
+                 dry_run=False) -> IndexReport:
+    """Compare `indexes` to the ones of `collection` and create the missing
+    ones unless `dry_run`, see `IndexReport`
+    """
+    report = IndexReport(collection.name)
+    existing = {info['name']: Index.from_server(info)
+                for info in collection.list_indexes()
+                if info['name'] != '_id_'}
+    for index in indexes:
+        name = index.name
+        if name not in existing:
+            # maybe the same keys under another name
+            name = next((name for name, other in existing.items()
+                         if other.keys == index.keys), None)
+        server = existing.pop(name, None)
+        if server is None:
+            report.missing.append(index)
+        elif server != index:
+            report.changed.append(index)
+    report.extra = list(existing.values())
+    if report.missing and not dry_run:
+        report.created = collection.create_indexes(
+            [index.as_index_model() for index in report.missing])
+    return report
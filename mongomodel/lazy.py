@@ -0,0 +1,160 @@
+import struct
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import bson
+from bson import ObjectId
+from bson.codec_options import CodecOptions, DEFAULT_CODEC_OPTIONS
+
+_INT32 = struct.Struct('<i')
+_DOUBLE = struct.Struct('<d')
+_MISSING = object()
+# size of the values of fixed length, by element type
+_FIXED_SIZES = {
+    0x01: 8,   # double
+    0x06: 0,   # undefined
+    0x07: 12,  # ObjectId
+    0x08: 1,   # bool
+    0x09: 8,   # datetime
+    0x0A: 0,   # null
+    0x10: 4,   # int32
+    0x11: 8,   # timestamp
+    0x12: 8,   # int64
+    0x13: 16,  # decimal128
+    0x7F: 0,   # max key
+    0xFF: 0,   # min key
+}
+# elements starting with their size
+_STRINGS = (0x02, 0x0D, 0x0E)  # string, code, symbol
+_SIZED = (0x03, 0x04, 0x0F)  # document, array, code with scope
+
+
+def value_size(data: bytes, element_type: int, position: int) -> int:
+    """Size of the value of type `element_type` starting at `position`
+    """
+    size = _FIXED_SIZES.get(element_type)
+    if size is not None:
+        return size
+    if element_type in _STRINGS:
+        return 4 + _INT32.unpack_from(data, position)[0]
+    if element_type in _SIZED:
+        return _INT32.unpack_from(data, position)[0]
+    if element_type == 0x05:  # binary: size, subtype, data
+        return 5 + _INT32.unpack_from(data, position)[0]
+    if element_type == 0x0B:  # regex: two cstrings
+        end = data.index(b'\x00', data.index(b'\x00', position) + 1)
+        return end + 1 - position
+    if element_type == 0x0C:  # db pointer: string, ObjectId
+        return 16 + _INT32.unpack_from(data, position)[0]
+    raise bson.InvalidBSON(f'unknown element type {element_type:#x}')
+
+
+class RawDocument:
+    """Read the top level values of a BSON document one at a time: the
+    elements are only located (not decoded) until the requested key is found
+    and only this element is decoded.
+    """
+    __slots__ = ('raw', 'codec_options', '_offsets', '_position')
+    # the common scalars are read in place, the others are decoded by bson
+    # (which applies the codec options)
+
+    def __init__(self, raw: bytes, codec_options: CodecOptions = None):
+        self.raw = raw
+        self.codec_options = codec_options or DEFAULT_CODEC_OPTIONS
+        # key -> (start, value start, end) of the elements located so far
+        self._offsets: Dict[str, Tuple[int, int, int]] = {}
+        # where to continue locating the elements, None at the end
+        self._position: Optional[int] = 4
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__}: {len(self.raw)} bytes>'
+
+    def locate(self, key: str) -> Optional[Tuple[int, int, int]]:
+        span = self._offsets.get(key)
+        if span is not None or self._position is None:
+            return span
+        raw = self.raw
+        offsets = self._offsets
+        position = self._position
+        last = len(raw) - 1
+        while position < last:
+            name_end = raw.index(b'\x00', position + 1)
+            name = raw[position + 1:name_end].decode()
+            value = name_end + 1
+            end = value + value_size(raw, raw[position], value)
+            offsets[name] = (position, value, end)
+            position = end
+            if name == key:
+                self._position = position
+                return offsets[name]
+        self._position = None
+        return None
+
+    def keys(self):
+        # no element is named None: locate them all
+        self.locate(None)
+        return self._offsets.keys()
+
+    def __contains__(self, key: str) -> bool:
+        return self.locate(key) is not None
+
+    def decode(self, key: str, default: Any = None) -> Any:
+        """Decode the value of `key` or return `default` if it's not in the
+        document
+        """
+        span = self.locate(key)
+        if span is None:
+            return default
+        start, value, end = span
+        raw = self.raw
+        element_type = raw[start]
+        if element_type == 0x02:
+            return raw[value + 4:end - 1].decode(
+                'utf-8', self.codec_options.unicode_decode_error_handler)
+        if element_type == 0x07:
+            return ObjectId(raw[value:end])
+        if element_type == 0x10:
+            return _INT32.unpack_from(raw, value)[0]
+        if element_type == 0x01:
+            return _DOUBLE.unpack_from(raw, value)[0]
+        if element_type == 0x08:
+            return raw[value] == 1
+        if element_type == 0x0A:
+            return None
+        element = raw[start:end]
+        document = _INT32.pack(len(element) + 5) + element + b'\x00'
+        return bson.decode(document, self.codec_options)[key]
+
+
+class LazyValues(dict):
+    """Values of a document loaded with `QuerySet.lazy()`: a field is decoded
+    from the raw BSON on it's first access then kept like any assigned
+    value, the fields missing from the database get their initial value.
+    keys are only in the dict once decoded or assigned.
+    """
+    __slots__ = ('document', 'initial')
+
+    def __init__(self, document: RawDocument, initial: Mapping[str, Any]):
+        super().__init__()
+        self.document = document
+        self.initial = initial
+
+    def __missing__(self, key: str) -> Any:
+        value = self.document.decode(key, _MISSING)
+        if value is _MISSING:
+            value = self.initial.get(key)
+        self[key] = value
+        return value
+
+    def __reduce__(self):
+        # pickled (or deep copied) fully decoded
+        return dict, (self.decoded(),)
+
+    def copy(self) -> 'LazyValues':
+        values = LazyValues(self.document, self.initial)
+        values.update(self)
+        return values
+
+    def decoded(self) -> dict:
+        """All the values, decoding the remaining ones
+        """
+        return {key: self[key] for key in self.initial}
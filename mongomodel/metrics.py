@@ -0,0 +1,277 @@
+import bisect
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import bson
+from pymongo import monitoring
+
+# upper bounds (ms) of the latency histogram buckets, plus +Inf
+BUCKETS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# command name -> operation
+OPERATIONS = {
+    'find': 'find',
+    'getMore': 'find',
+    'insert': 'insert',
+    'update': 'update',
+    'findAndModify': 'update',
+    'delete': 'delete',
+    'count': 'count',
+    'distinct': 'distinct',
+    'aggregate': 'aggregate',
+}
+
+# the pipeline `count_documents` ends with
+_COUNT_STAGE = {'$group': {'_id': 1, 'n': {'$sum': 1}}}
+
+_sinks: List['MetricsSink'] = []
+
+
+class MetricsSink:
+    """Receive the measures of the commands sent by the models, subclass it
+    and give it to `add_sink` to export them somewhere else
+    """
+    def observe(self, model: str, operation: str, duration_ms: float,
+                documents: int, size: Optional[int], failed=False) -> None:
+        """One command of `model` (the model class name or the collection
+        name), `documents` returned or written, `size` is the reply size in
+        bytes (None unless the listener tracks it)
+        """
+        raise NotImplementedError
+
+    def observe_hydration(self, model: str, documents: int,
+                          duration_ms: float) -> None:
+        """Time spent building `documents` instances while iterating
+        """
+        pass
+
+
+class OperationStats:
+    """Counters of one (model, operation) of `InMemorySink`
+    """
+    __slots__ = ('count', 'failures', 'duration_ms', 'documents', 'bytes',
+                 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.failures = 0
+        self.duration_ms = 0.
+        self.documents = 0
+        self.bytes = 0
+        # amount of commands per bucket, not cumulative, last one is +Inf
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def __repr__(self):
+        return (f'<{self.__class__.__name__}: {self.count} commands '
+                f'{self.mean_ms:.2f}ms {self.documents} documents>')
+
+    @property
+    def mean_ms(self) -> float:
+        return self.duration_ms / self.count if self.count else 0.
+
+
+class InMemorySink(MetricsSink):
+    """Keep counters and latency histograms per (model, operation), plus the
+    hydration time per model, `render` gives them in the Prometheus text
+    format:
+
+    >>> sink = mongomodel.metrics.add_sink(InMemorySink())
+    >>> sink.stats[('User', 'find')]
+    <OperationStats: 12 commands 1.35ms 240 documents>
+    """
+    def __init__(self):
+        self.stats: Dict[Tuple[str, str], OperationStats] = {}
+        # model -> [documents, duration_ms]
+        self.hydration: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, model: str, operation: str, duration_ms: float,
+                documents: int, size: Optional[int], failed=False) -> None:
+        with self._lock:
+            stats = self.stats.get((model, operation))
+            if stats is None:
+                stats = self.stats[(model, operation)] = OperationStats()
+            stats.count += 1
+            stats.failures += failed
+            stats.duration_ms += duration_ms
+            stats.documents += documents
+            stats.bytes += size or 0
+            stats.buckets[bisect.bisect_left(BUCKETS, duration_ms)] += 1
+
+    def observe_hydration(self, model: str, documents: int,
+                          duration_ms: float) -> None:
+        with self._lock:
+            hydration = self.hydration.setdefault(model, [0, 0.])
+            hydration[0] += documents
+            hydration[1] += duration_ms
+
+    def clear(self) -> None:
+        with self._lock:
+            self.stats.clear()
+            self.hydration.clear()
+
+    def render(self, prefix: str = 'mongomodel') -> str:
+        """The counters in the Prometheus text exposition format
+        """
+        lines = [
+            f'# TYPE {prefix}_command_duration_seconds histogram',
+        ]
+        with self._lock:
+            stats = sorted(self.stats.items())
+            hydration = sorted(self.hydration.items())
+        for (model, operation), stat in stats:
+            labels = f'model="{model}",operation="{operation}"'
+            total = 0
+            for bound, amount in zip(BUCKETS + ('+Inf',), stat.buckets):
+                total += amount
+                le = bound if bound == '+Inf' else f'{bound / 1000:g}'
+                lines.append(f'{prefix}_command_duration_seconds_bucket'
+                             f'{{{labels},le="{le}"}} {total}')
+            lines.append(f'{prefix}_command_duration_seconds_sum'
+                         f'{{{labels}}} {stat.duration_ms / 1000:g}')
+            lines.append(f'{prefix}_command_duration_seconds_count'
+                         f'{{{labels}}} {stat.count}')
+        for name, attribute in (('failures', 'failures'),
+                                ('documents', 'documents'),
+                                ('bytes', 'bytes')):
+            lines.append(f'# TYPE {prefix}_command_{name}_total counter')
+            for (model, operation), stat in stats:
+                lines.append(
+                    f'{prefix}_command_{name}_total{{model="{model}",'
+                    f'operation="{operation}"}} {getattr(stat, attribute)}')
+        lines.append(f'# TYPE {prefix}_hydration_seconds_total counter')
+        for model, (documents, duration_ms) in hydration:
+            lines.append(f'{prefix}_hydration_seconds_total'
+                         f'{{model="{model}"}} {duration_ms / 1000:g}')
+        lines.append(f'# TYPE {prefix}_hydrated_documents_total counter')
+        for model, (documents, duration_ms) in hydration:
+            lines.append(f'{prefix}_hydrated_documents_total'
+                         f'{{model="{model}"}} {documents}')
+        return '\n'.join(lines) + '\n'
+
+
+class LoggingSink(MetricsSink):
+    """Log every command on `logger` (`mongomodel.metrics` by default)
+    """
+    def __init__(self, logger: logging.Logger = None,
+                 level: int = logging.DEBUG):
+        self.logger = logger or logging.getLogger('mongomodel.metrics')
+        self.level = level
+
+    def observe(self, model: str, operation: str, duration_ms: float,
+                documents: int, size: Optional[int], failed=False) -> None:
+        self.logger.log(self.level, '%s.%s %.2fms %d documents%s%s', model,
+                        operation, duration_ms, documents,
+                        f' {size} bytes' if size is not None else '',
+                        ' failed' if failed else '')
+
+    def observe_hydration(self, model: str, documents: int,
+                          duration_ms: float) -> None:
+        self.logger.log(self.level, '%s hydration %.2fms %d documents',
+                        model, duration_ms, documents)
+
+
+class MetricsListener(monitoring.CommandListener):
+    """pymongo command listener registered on each `Database.connect`, it
+    gives the commands of the models to the sinks, nothing is done while
+    there is no sink.
+    the reply sizes are only computed with `track_bytes` as it means
+    encoding each reply again.
+    """
+    track_bytes = False
+
+    def __init__(self):
+        # (connection, request id) -> (model, operation)
+        self._pending: Dict[tuple, Tuple[str, str]] = {}
+        self._models: Dict[str, str] = {}
+        self._known_models = None
+
+    @staticmethod
+    def _key(event) -> tuple:
+        return (event.connection_id, event.request_id)
+
+    def model_name(self, collection: str) -> str:
+        """Name of the model using `collection` (the base one when several
+        models share it), or the collection name
+        """
+        from .document import DocumentMeta
+        models = DocumentMeta.models
+        # a model was declared or collected since the names were cached
+        known = (DocumentMeta.declared, len(models))
+        if known != self._known_models:
+            self._models.clear()
+            self._known_models = known
+        name = self._models.get(collection)
+        if name is None:
+            candidates = [model for model in list(models) if
+                          model.objects.get_collection_name() == collection]
+            name = min(candidates, key=lambda model: (
+                len(model.__mro__), model.__name__)).__name__ \
+                if candidates else collection
+            self._models[collection] = name
+        return name
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        if not _sinks:
+            return
+        command_name = event.command_name
+        operation = OPERATIONS.get(command_name)
+        if operation is None:
+            return
+        command = event.command
+        collection = command['collection'] if command_name == 'getMore' \
+            else command.get(command_name)
+        if not isinstance(collection, str):
+            return
+        if operation == 'aggregate' and \
+                command.get('pipeline', [None])[-1] == _COUNT_STAGE:
+            operation = 'count'
+        self._pending[self._key(event)] = (
+            self.model_name(collection), operation)
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._finished(event, False)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finished(event, True)
+
+    def _finished(self, event, failed: bool) -> None:
+        pending = self._pending.pop(self._key(event), None)
+        if pending is None:
+            return
+        model, operation = pending
+        reply = getattr(event, 'reply', None) or {}
+        documents = 0
+        cursor = reply.get('cursor')
+        if cursor:
+            documents = len(cursor.get('firstBatch') or
+                            cursor.get('nextBatch') or ())
+        elif operation != 'count':
+            documents = reply.get('n', 0)
+        size = len(bson.encode(reply)) if self.track_bytes and reply else None
+        duration_ms = event.duration_micros / 1000
+        for sink in _sinks:
+            sink.observe(model, operation, duration_ms, documents, size,
+                         failed)
+
+
+listener = MetricsListener()
+
+
+def sinks() -> List[MetricsSink]:
+    return _sinks
+
+
+def add_sink(sink: MetricsSink) -> MetricsSink:
+    _sinks.append(sink)
+    return sink
+
+
+def remove_sink(sink: MetricsSink) -> None:
+    _sinks.remove(sink)
+
+
+def observe_hydration(model: str, documents: int, duration_ms: float) -> None:
+    for sink in _sinks:
+        sink.observe_hydration(model, documents, duration_ms)
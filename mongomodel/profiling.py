@@ -0,0 +1,210 @@
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Optional
+
+_slow_query_log: Optional['SlowQueryLog'] = None
+
+
+class QueryPlan:
+    """Summary of an `explain` response, as returned by `QuerySet.explain`:
+    - stages: stages of the winning plan, from the top one (`FETCH`,
+      `IXSCAN`, `COLLSCAN`...)
+    - index: name of the index used, None for a collection scan
+    - docs_examined / keys_examined / returned / time_ms: execution
+      statistics, None with the `queryPlanner` verbosity
+    `raw` is the whole server response.
+    """
+    def __init__(self, raw: dict):
+        self.raw = raw
+        planner = raw.get('queryPlanner', {})
+        winning = planner.get('winningPlan', {})
+        # slot based engine nests the plan in `queryPlan`
+        winning = winning.get('queryPlan', winning)
+        self.stages: List[str] = []
+        self.index: Optional[str] = None
+        for stage in self.walk(winning):
+            self.stages.append(stage.get('stage'))
+            if self.index is None and 'indexName' in stage:
+                self.index = stage['indexName']
+        stats = raw.get('executionStats', {})
+        self.docs_examined: Optional[int] = stats.get('totalDocsExamined')
+        self.keys_examined: Optional[int] = stats.get('totalKeysExamined')
+        self.returned: Optional[int] = stats.get('nReturned')
+        self.time_ms: Optional[int] = stats.get('executionTimeMillis')
+
+    def __repr__(self):
+        return (f'<{self.__class__.__name__}: {self.stage} '
+                f'index={self.index} examined={self.docs_examined} '
+                f'returned={self.returned}>')
+
+    @classmethod
+    def walk(cls, stage: dict) -> Iterator[dict]:
+        if not stage:
+            return
+        yield stage
+        if 'inputStage' in stage:
+            yield from cls.walk(stage['inputStage'])
+        for child in stage.get('inputStages', ()):
+            yield from cls.walk(child)
+
+    @property
+    def stage(self) -> Optional[str]:
+        """The winning stage: the first one which is not a `FETCH`,
+        `PROJECTION`... so usually `IXSCAN` or `COLLSCAN`
+        """
+        scans = [stage for stage in self.stages
+                 if stage and stage.endswith('SCAN')]
+        if scans:
+            return scans[0]
+        return self.stages[-1] if self.stages else None
+
+    @property
+    def is_collscan(self) -> bool:
+        return 'COLLSCAN' in self.stages
+
+    def as_dict(self) -> dict:
+        return {
+            'stage': self.stage,
+            'index': self.index,
+            'docs_examined': self.docs_examined,
+            'keys_examined': self.keys_examined,
+            'returned': self.returned,
+            'time_ms': self.time_ms,
+        }
+
+
+class SlowQuery:
+    """A query of `SlowQueryLog`, the plan comes from a `queryPlanner`
+    explain (the query is not run again) so it has no execution statistics
+    """
+    def __init__(self, collection: str, operation: str, query: dict,
+                 duration_ms: float, options: dict = None,
+                 plan: QueryPlan = None):
+        self.collection = collection
+        self.operation = operation
+        self.query = query
+        self.duration_ms = duration_ms
+        self.options = options or {}
+        self.plan = plan
+
+    def __repr__(self):
+        return (f'<{self.__class__.__name__}: {self.collection}.'
+                f'{self.operation} {self.query} {self.duration_ms:.1f}ms>')
+
+
+class SlowQueryLog:
+    """Record the queries taking more than `threshold_ms` (time spent waiting
+    for the server, building the documents is not counted), the last
+    `maxlen` ones are kept in `entries` and each one is logged as a warning
+    on `logger`. with `explain` the plan of the slow finds is fetched to
+    tell which index (or collection scan) they used.
+
+    >>> log = mongomodel.profiling.enable_slow_query_log(threshold_ms=50)
+    >>> User.objects.filter(name='seb').all()
+    >>> log.entries
+    [<SlowQuery: user.find {'name': 'seb'} 73.2ms>]
+    """
+    def __init__(self, threshold_ms: float = 100, explain=True,
+                 logger: logging.Logger = None, maxlen: int = 1000):
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self.logger = logger or logging.getLogger('mongomodel.slow_queries')
+        self.entries: deque = deque(maxlen=maxlen)
+
+    def record(self, queryset, operation: str, duration_ms: float) -> None:
+        if duration_ms < self.threshold_ms:
+            return
+        plan = None
+        # `QuerySet.explain` gives the plan of a find, not of the
+        # aggregation run by a count
+        if self.explain and operation == 'find':
+            try:
+                plan = queryset.explain('queryPlanner')
+            except Exception:
+                self.logger.exception('explain failed')
+        options = {key: value for key, value in (
+            ('sort', queryset._sort), ('skip', queryset._skip),
+            ('limit', queryset._limit), ('projection', queryset._projection)
+        ) if value}
+        entry = SlowQuery(queryset.get_collection_name(), operation,
+                          queryset.query, duration_ms, options, plan)
+        self.entries.append(entry)
+        self.logger.warning(
+            'slow query %s.%s %s %s %.1fms %s', entry.collection,
+            operation, entry.query, options, duration_ms,
+            plan.as_dict() if plan else '')
+
+    @contextmanager
+    def measure(self, queryset, operation: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(queryset, operation,
+                        (time.perf_counter() - start) * 1000)
+
+    def measure_cursor(self, queryset, operation: str,
+                       cursor) -> 'MeasuredCursor':
+        return MeasuredCursor(self, queryset, operation, cursor)
+
+
+class MeasuredCursor:
+    """Iterate over `cursor` timing only the reads, the query is recorded
+    once the cursor is exhausted or closed. an iteration left without
+    closing the cursor is not recorded: nothing (like an explain) is sent
+    while the garbage collector drops it
+    """
+    def __init__(self, log: SlowQueryLog, queryset, operation: str, cursor):
+        self.log = log
+        self.queryset = queryset
+        self.operation = operation
+        self.cursor = cursor
+        self.elapsed = 0.
+        self._iterator = iter(cursor)
+        self._closed = False
+
+    def __iter__(self) -> 'MeasuredCursor':
+        return self
+
+    def __next__(self) -> Any:
+        if self._closed:
+            raise StopIteration
+        start = time.perf_counter()
+        try:
+            item = next(self._iterator)
+        except StopIteration:
+            self.elapsed += time.perf_counter() - start
+            self.close()
+            raise
+        self.elapsed += time.perf_counter() - start
+        return item
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        close = getattr(self.cursor, 'close', None)
+        if close is not None:
+            close()
+        self.log.record(self.queryset, self.operation, self.elapsed * 1000)
+
+
+def slow_query_log() -> Optional[SlowQueryLog]:
+    """Returns the active slow query log, if any
+    """
+    return _slow_query_log
+
+
+def enable_slow_query_log(threshold_ms: float = 100, explain=True,
+                          logger: logging.Logger = None,
+                          maxlen: int = 1000) -> SlowQueryLog:
+    global _slow_query_log
+    _slow_query_log = SlowQueryLog(threshold_ms, explain, logger, maxlen)
+    return _slow_query_log
+
+
+def disable_slow_query_log() -> None:
+    global _slow_query_log
+    _slow_query_log = None
@@ -1,11 +1,45 @@
-from typing import List, Any
-from .keywords import Eq, Neq, In, Nin, Gte, Lte, Gt, Lt, Exists, Regex
+import asyncio
+import base64
+import binascii
+import bson
+import copy
+import time
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import Dict, Iterable, List, Any
+from bson import ObjectId
+from bson.raw_bson import RawBSONDocument
+from pymongo import InsertOne, UpdateOne, DeleteOne
+from pymongo.errors import BulkWriteError
+from pymongo.read_concern import ReadConcern
+from pymongo.read_preferences import make_read_preference, \
+    read_pref_mode_from_name
+from .aggregation import Accumulator, field_path
+from .keywords import Criteria, Eq, Neq, In, Nin, Gte, Lte, Gt, Lt, \
+    Exists, Regex
 from .tools import dict_deep_update, merge_values
-from . import database
+from . import database, get_database, Database, DEFAULT_ALIAS
+from . import identity
+from . import cache as result_cache
+from . import metrics
+from . import profiling
+from .scan import ParallelScan
 from pymongo.collection import Collection
+from pymongo.results import DeleteResult, UpdateResult
 from pymongo.cursor import Cursor
 
 
+# collection handles by (database, name, read preference, read concern),
+# `get_collection` is called by every operation
+_collections: Dict[tuple, tuple] = {}
+# compiled filter arguments by (queryset class, argument, invert), see
+# `QuerySet.compile_filter`, bounded as the arguments can come from requests
+_filter_shapes: Dict[tuple, tuple] = {}
+MAX_FILTER_SHAPES = 4096
+
+
 class MissingModelError(Exception):
     pass
 
@@ -14,6 +48,61 @@ class TooManyResults(Exception):
     pass
 
 
+class BulkResult:
+    """Outcome of a document in `QuerySet.bulk_save`, status is one of:
+    - inserted / updated / deleted
+    - unchanged: nothing to write
+    - invalid: the document did not pass the validation, nothing was sent
+    - failed: the server rejected the operation, see `error`
+    - skipped: not sent because of a previous failure in an ordered bulk
+    """
+    def __init__(self, document, status: str, error: dict = None):
+        self.document = document
+        self.status = status
+        self.error = error
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__}: {self.status} {self.document!r}>'
+
+
+class BulkReport(list):
+    """List of `BulkResult`, in the order of the given documents (deletions
+    last)
+    """
+    def with_status(self, status: str) -> List['Document']:
+        return [result.document for result in self if result.status == status]
+
+    @property
+    def inserted(self) -> List['Document']:
+        return self.with_status('inserted')
+
+    @property
+    def updated(self) -> List['Document']:
+        return self.with_status('updated')
+
+    @property
+    def deleted(self) -> List['Document']:
+        return self.with_status('deleted')
+
+    @property
+    def failed(self) -> List[BulkResult]:
+        return [result for result in self
+                if result.status in ('failed', 'skipped')]
+
+
+class Page(list):
+    """Documents of a page read with `QuerySet.paginate_after`, pass
+    `next_token` to get the following page, it's None on the last one
+    """
+    def __init__(self, documents=(), next_token: str = None):
+        super().__init__(documents)
+        self.next_token = next_token
+
+    @property
+    def has_more(self) -> bool:
+        return self.next_token is not None
+
+
 class QuerysetBase:
     query = {}
     # must be a Model class, not an instance
@@ -30,10 +119,40 @@ class QuerysetBase:
         'exists': Exists,
         'regex': Regex
     }
+    update_operators = {
+        'set': '$set',
+        'unset': '$unset',
+        'set_on_insert': '$setOnInsert',
+        'inc': '$inc',
+        'mul': '$mul',
+        'min': '$min',
+        'max': '$max',
+        'rename': '$rename',
+        'current_date': '$currentDate',
+        'push': '$push',
+        'pull': '$pull',
+        'pull_all': '$pullAll',
+        'add_to_set': '$addToSet',
+        'pop': '$pop',
+    }
     _sort = None
     _skip = None
     _limit = None
+    _batch_size = None
+    _projection = None
+    _cache_ttl = None
+    _cache_backend = None
+    _lazy = False
+    # aggregation stages added after the `$match` and sort/skip/limit ones
+    _stages = ()
+    _group_by = None
+    # max amount of ids per request when writing a sort/skip/limit window
+    write_batch_size = 1000
     _db = database
+    # name of the connection to use instead of `_db`, see `using`
+    _alias = None
+    _read_preference = None
+    _read_concern = None
 
     def __init__(self, model=None, database=None):
         self.model = model
@@ -46,15 +165,91 @@ class QuerysetBase:
     def __repr__(self):
         return f'<{self.__class__.__name__}: {self}>'
 
-    def copy(self) -> 'QuerySet':
-        instance = QuerySet(self.model)
+    def copy(self, queryset_class: type = None) -> 'QuerySet':
+        instance = (queryset_class or type(self))(self.model)
         instance.query = self.query.copy()
         instance._sort = self._sort
         instance._skip = self._skip
         instance._limit = self._limit
+        instance._batch_size = self._batch_size
+        instance._projection = self._projection
+        instance._cache_ttl = self._cache_ttl
+        instance._cache_backend = self._cache_backend
+        instance._lazy = self._lazy
+        instance._stages = self._stages
+        instance._group_by = self._group_by
         instance._db = self._db
+        instance._alias = self._alias
+        instance._read_preference = self._read_preference
+        instance._read_concern = self._read_concern
+        return instance
+
+    def using(self, alias: str) -> 'QuerySet':
+        """Run this queryset on the connection registered as `alias` (see
+        `mongomodel.register_connection`), it is looked up on each use
+        """
+        instance = self.copy()
+        instance._alias = alias
         return instance
 
+    def read_preference(self, preference, tag_sets: List[dict] = None,
+                        max_staleness: int = -1) -> 'QuerySet':
+        """Route the reads of this queryset, `preference` is a pymongo read
+        preference or the name of a mode: primary, primaryPreferred,
+        secondary, secondaryPreferred or nearest.
+        writes always go to the primary.
+        """
+        if isinstance(preference, str):
+            try:
+                mode = read_pref_mode_from_name(preference)
+            except ValueError:
+                raise ValueError(f'unknown read preference: {preference}')
+            preference = make_read_preference(mode, tag_sets, max_staleness)
+        instance = self.copy()
+        instance._read_preference = preference
+        return instance
+
+    def read_concern(self, level) -> 'QuerySet':
+        """Read concern of the reads of this queryset, a level (`local`,
+        `majority`, `snapshot`...) or a pymongo `ReadConcern`
+        """
+        instance = self.copy()
+        instance._read_concern = level if isinstance(level, ReadConcern) \
+            else ReadConcern(level)
+        return instance
+
+    def get_namespace(self) -> str:
+        """Name of the collection qualified by it's connection:
+        `alias/collection`, the bare collection name on the default one.
+        it keys the cached results and the identity map so a collection
+        of the same name on an other connection is not mixed with it
+        """
+        name = self.get_collection_name()
+        db = self.get_database()
+        if db is database:
+            return name
+        alias = self._alias
+        if alias is None:
+            # a `Database` given to the queryset, not a registered one
+            alias = f'#{id(db)}'
+        return f'{alias}/{name}'
+
+    def get_db_alias(self) -> str:
+        """Name of the connection of this queryset, None for a `Database`
+        given to the queryset instead of a registered one
+        """
+        if self._alias is not None:
+            return self._alias
+        return DEFAULT_ALIAS if self._db is database else None
+
+    def get_database(self) -> Database:
+        """Connection of this queryset: the one selected with `using` (or
+        the `db_alias` of the model), the given one otherwise
+        """
+        if self._alias is not None:
+            return get_database(self._alias)
+        return self._db
+
     def sort(self, order):
         instance = self.copy()
         instance._sort = self.sort_instruction(order) if order else None
@@ -70,6 +265,167 @@ class QuerysetBase:
         instance._limit = n
         return instance
 
+    def batch_size(self, n: int):
+        """Amount of documents fetched per round trip while iterating
+        """
+        instance = self.copy()
+        instance._batch_size = n
+        return instance
+
+    def cache(self, ttl: float = 60, backend=None) -> 'QuerySet':
+        """Keep the results of this queryset (documents, `count`, `distinct`
+        and `values_list`) for `ttl` seconds in `backend` (an in process LRU
+        by default), any write made through the models of this collection
+        invalidate them, `cache(None)` disable it again
+        """
+        instance = self.copy()
+        instance._cache_ttl = ttl
+        instance._cache_backend = backend
+        return instance
+
+    def lazy(self, enabled: bool = True) -> 'QuerySet':
+        """Keep the documents as raw BSON, each field being decoded on it's
+        first access: worth it when reading a few fields of large documents,
+        see `Document.from_raw`
+        """
+        instance = self.copy()
+        instance._lazy = enabled
+        return instance
+
+    def only(self, *fields: str) -> 'QuerySet':
+        """Only load the given fields (and `_id`) of the documents
+        """
+        instance = self.copy()
+        instance._projection = {field: True for field in fields}
+        return instance
+
+    def defer(self, *fields: str) -> 'QuerySet':
+        """Load the documents without the given fields
+        """
+        instance = self.copy()
+        projection = dict(self._projection or {})
+        if self._is_inclusive(projection):
+            for field in fields:
+                projection.pop(field, None)
+        else:
+            projection.update({field: False for field in fields})
+        instance._projection = projection
+        return instance
+
+    @staticmethod
+    def _is_inclusive(projection: dict) -> bool:
+        return any(value for key, value in projection.items() if key != '_id')
+
+    def deferred_fields(self) -> frozenset:
+        """Names of the model fields not (or partially) loaded because of the
+        projection set by `only` / `defer`
+        """
+        projection = self._projection
+        if not projection or not self.model:
+            return frozenset()
+        if self._is_inclusive(projection):
+            loaded = {key for key, value in projection.items()
+                      if value and '.' not in key}
+            return frozenset(name for name in self.model._schema.names
+                             if name not in loaded)
+        return frozenset(key.split('.')[0] for key, value in projection.items()
+                         if not value and key != '_id')
+
+    def add_stage(self, stage: dict) -> 'QuerySet':
+        """Append a raw stage to the aggregation pipeline
+        """
+        instance = self.copy()
+        instance._stages = self._stages + (stage,)
+        return instance
+
+    def annotate(self, **expressions) -> 'QuerySet':
+        """Add computed fields to each document (`$addFields`), values are
+        aggregation expressions or accumulators over an array
+        (`annotate(total=Sum('prices'))`)
+        """
+        return self.add_stage({'$addFields': {
+            name: (value.as_mongo_expression()
+                   if isinstance(value, Accumulator) else value)
+            for name, value in expressions.items()}})
+
+    def lookup(self, model, local_field: str, foreign_field: str = '_id',
+               as_field: str = None) -> 'QuerySet':
+        """Server side join (`$lookup`): set in `as_field` the list of the
+        documents of `model` (a model or a collection name) where
+        `foreign_field` equals `local_field`
+        """
+        if not isinstance(model, str):
+            model = model.objects.get_collection_name()
+        return self.add_stage({'$lookup': {
+            'from': model,
+            'localField': local_field,
+            'foreignField': foreign_field,
+            'as': as_field or model,
+        }})
+
+    def unwind(self, field: str, preserve_empty=False) -> 'QuerySet':
+        """Output one document per element of the `field` array
+        """
+        if not preserve_empty:
+            return self.add_stage({'$unwind': field_path(field)})
+        return self.add_stage({'$unwind': {
+            'path': field_path(field), 'preserveNullAndEmptyArrays': True}})
+
+    def group_by(self, *fields: str) -> 'QuerySet':
+        """Group the documents by the given fields for `aggregate`
+        """
+        instance = self.copy()
+        instance._group_by = fields or None
+        return instance
+
+    def pipeline(self, *accumulators: Accumulator,
+                 **named: Accumulator) -> List[dict]:
+        """The aggregation pipeline run by `aggregate`: the `$match` of the
+        query, the sort/skip/limit window, the `only`/`defer` projection, the
+        stages added by `annotate`, `lookup`, `unwind`... and finally the
+        `$group` of the given accumulators (the distinct keys of `group_by`
+        without accumulators)
+        """
+        pipeline = []
+        if self.query:
+            pipeline.append({'$match': self.query})
+        if self._sort:
+            pipeline.append({'$sort': dict(self._sort)})
+        if self._skip:
+            pipeline.append({'$skip': self._skip})
+        if self._limit:
+            pipeline.append({'$limit': self._limit})
+        if self._projection:
+            pipeline.append({'$project': self._projection})
+        pipeline.extend(self._stages)
+        if not accumulators and not named and not self._group_by:
+            return pipeline
+        for accumulator in accumulators:
+            named[accumulator.get_alias()] = accumulator
+        group_by = self._group_by or ()
+        names = [field.replace('.', '_') for field in group_by]
+        if len(group_by) == 1:
+            key = field_path(group_by[0])
+        else:
+            key = {name: field_path(field)
+                   for name, field in zip(names, group_by)} or None
+        group = {'_id': key}
+        group.update({alias: accumulator.as_mongo_expression()
+                      for alias, accumulator in named.items()})
+        pipeline.append({'$group': group})
+        # flatten the group key back to the fields names
+        project = {'_id': False}
+        if len(group_by) == 1:
+            project[names[0]] = '$_id'
+        else:
+            project.update({name: f'$_id.{name}' for name in names})
+        project.update({alias: True for alias in named})
+        pipeline.append({'$project': project})
+        return pipeline
+
+    def _is_scalar_aggregate(self, accumulators, named) -> bool:
+        return not self._group_by and bool(accumulators or named)
+
     def filter(self, **kwargs) -> 'QuerySet':
         return self._inner_filter(False, **kwargs)
 
@@ -78,14 +434,58 @@ class QuerysetBase:
 
     def _inner_filter(self, invert=False, **kwargs) -> 'QuerySet':
         instance = self.copy()
+        query = instance.query
+        queryset_class = type(self)
+        # the conditions shared with `self.query` are copied before a merge
+        owned = set()
         for key, value in kwargs.items():
-            path, value = self.apply_keywords(value, key.split('__'),
-                                              invert=invert)
-            filter_dict = self.dict_path(path, value)
-            dict_deep_update(instance.query, filter_dict,
+            shape = _filter_shapes.get((queryset_class, key, invert))
+            if shape is None:
+                shape = self.compile_filter(key, invert)
+                if len(_filter_shapes) < MAX_FILTER_SHAPES:
+                    _filter_shapes[queryset_class, key, invert] = shape
+            path, command, criteria = shape
+            if command is not None:
+                value = {command: value}
+            elif criteria is not None:
+                value = criteria(value).as_mongo_expression(invert)
+            if path and path[0] not in query:
+                for name in reversed(path[1:]):
+                    value = {name: value}
+                query[path[0]] = value
+                owned.add(path[0])
+                continue
+            if path and path[0] not in owned:
+                query[path[0]] = copy.deepcopy(query[path[0]])
+                owned.add(path[0])
+            dict_deep_update(query, self.dict_path(list(path), value),
                              on_conflict=merge_values)
         return instance
 
+    @classmethod
+    def compile_filter(cls, key: str, invert=False) -> tuple:
+        """Compile the shape of a filter argument (what `apply_keywords`
+        does for each value) into (path, command, criteria): the value is
+        stored under `path` as `{command: value}`, as
+        `criteria(value).as_mongo_expression(invert)` for the keywords
+        overriding the expression or the value (`exists`, `regex`) or as is
+        when both are None.
+        so the command of a keyword must not depend on the value.
+        """
+        path = key.split('__')
+        if invert and path[-1] not in cls.keywords:
+            path.append('eq')
+        for cmd in path:
+            criteria = cls.keywords.get(cmd)
+            if criteria is None:
+                continue
+            if criteria.get_value is Criteria.get_value and \
+                    criteria.as_mongo_expression is \
+                    Criteria.as_mongo_expression:
+                return tuple(path[0:-1]), criteria().command(invert), None
+            return tuple(path[0:-1]), None, criteria
+        return tuple(path), None, None
+
     @staticmethod
     def read_dict_path(data: dict, path: List['str']):
         x = data
@@ -125,9 +525,34 @@ class QuerysetBase:
                 pass
         return path, raw_value
 
+    @classmethod
+    def compile_update(cls, **kwargs) -> dict:
+        """Convert keywords to a mongodb update document, the first part of a
+        keyword is the operator (`set` if omitted) then the path of the field
+        example:
+        QuerySet.compile_update(inc__level=1, name='x', unset__a__b=True)
+        {'$inc': {'level': 1}, '$set': {'name': 'x'}, '$unset': {'a.b': ''}}
+        """
+        update = {}
+        for key, value in kwargs.items():
+            path = key.split('__')
+            operator = cls.update_operators.get(path[0])
+            if operator and len(path) > 1:
+                path = path[1:]
+            else:
+                operator = '$set'
+            if operator == '$unset':
+                value = ''
+            dict_deep_update(update, cls.dict_path(
+                [operator, '.'.join(path)], value))
+        return update
+
     def __iter__(self):
         raise NotImplementedError
 
+    def iterator(self, chunk_size: int = None):
+        raise NotImplementedError
+
     def __add__(self, b: 'QuerySet') -> 'QuerySet':
         instance = self.copy()
         dict_deep_update(instance.query, b.query, on_conflict=merge_values)
@@ -148,6 +573,32 @@ class QuerysetBase:
 
         return [generate_tuple(word) for word in order]
 
+    @staticmethod
+    def keyset_filter(sort: List[tuple], values: List[Any]) -> dict:
+        """Query of the documents placed after `values` (the sort keys of a
+        document) in the `sort` order:
+        [('age', -1), ('_id', 1)], [30, id] gives
+        {'age': {'$lte': 30}, '$or': [{'age': {'$lt': 30}},
+                                       {'age': 30, '_id': {'$gt': id}}]}
+        the inclusive range on the first key lets the server use the
+        bounds of the index.
+        """
+        def after(direction: int) -> str:
+            return '$gt' if direction > 0 else '$lt'
+
+        (first, first_direction), *others = sort
+        if not others:
+            return {first: {after(first_direction): values[0]}}
+        branches = []
+        for index, (key, direction) in enumerate(sort):
+            branch = {sort[i][0]: values[i] for i in range(index)}
+            branch[key] = {after(direction): values[index]}
+            branches.append(branch)
+        return {
+            first: {'$gte' if first_direction > 0 else '$lte': values[0]},
+            '$or': branches,
+        }
+
     def get_collection_name(self) -> str:
         try:
             collection_name = self.model.collection
@@ -188,13 +639,43 @@ class QuerysetBase:
     def distinct(self, key: str, **kwargs):
         raise NotImplementedError
 
+    def in_bulk(self, ids: Iterable[Any], chunk_size: int = 1000
+                ) -> Dict[Any, 'Document']:
+        raise NotImplementedError
+
+    def explain(self, verbosity: str = 'executionStats'
+                ) -> profiling.QueryPlan:
+        raise NotImplementedError
+
+    def aggregate(self, *accumulators: Accumulator, allow_disk_use=False,
+                  batch_size: int = None, **named: Accumulator):
+        raise NotImplementedError
+
     def delete(self):
         raise NotImplementedError
 
+    def update(self, **kwargs):
+        raise NotImplementedError
+
+    def update_one(self, **kwargs):
+        raise NotImplementedError
+
     def drop(self):
         raise NotImplementedError
 
-    def values_list(self, fields: List[str], flat=False, noid=False):
+    def as_dicts(self, **kwargs):
+        raise NotImplementedError
+
+    def values(self, *fields: str, noid=False):
+        raise NotImplementedError
+
+    def values_list(self, fields: List[str], flat=False, noid=False,
+                    lazy=False):
+        raise NotImplementedError
+
+    def bulk_save(self, documents: Iterable['Document'],
+                  delete: Iterable['Document'] = (), ordered=False,
+                  chunk_size: int = 1000, session=None) -> BulkReport:
         raise NotImplementedError
 
 
@@ -215,18 +696,56 @@ class QuerySet(QuerysetBase):
     into `model.manager_class` attribute.
     """
     def __iter__(self, **kwargs):
-        """Iterate over the matching models instances
+        """Iterate over the matching models instances, they are built one at a
+        time while reading the cursor so only the current batch is in memory
         """
         if not self.model:
             raise MissingModelError
-        if self._sort:
-            kwargs['sort'] = self._sort
-        if self._skip:
-            kwargs['offset'] = self._skip
-        if self._limit:
-            kwargs['limit'] = self._limit
-        for instance in self.find(filter=self.query, **kwargs):
-            yield instance
+        from_database = self._hydrator()
+        deferred = self.deferred_fields() or None
+        if self._cache_ttl is not None:
+            # stored encoded so the cached results can't be altered through
+            # the documents built from them
+            items = self._cached('find', lambda: tuple(
+                map(bson.encode, self._measured_cursor(
+                    'find', self._get_cursor(self.find_raw(**kwargs))))),
+                kwargs)
+            if not self._lazy:
+                items = map(bson.decode, items)
+        else:
+            items = self._measured_cursor(
+                'find', self._get_cursor(self.find_raw(**kwargs)))
+        if metrics.sinks():
+            yield from self._measured_hydration(items, deferred)
+            return
+        for item in items:
+            yield from_database(item, deferred)
+
+    def _measured_hydration(self, items, deferred: frozenset = None):
+        """Build the documents reporting the time spent to the metrics
+        sinks
+        """
+        from_database = self._hydrator()
+        clock = time.perf_counter
+        documents = 0
+        elapsed = 0.
+        try:
+            for item in items:
+                start = clock()
+                document = from_database(item, deferred)
+                elapsed += clock() - start
+                documents += 1
+                yield document
+        finally:
+            metrics.observe_hydration(self.model.__name__, documents,
+                                      elapsed * 1000)
+
+    def iterator(self, chunk_size: int = None):
+        """Iterate over the matching models instances fetching `chunk_size`
+        documents per round trip
+        """
+        instance = self.batch_size(chunk_size) if chunk_size else self
+        return instance.__iter__()
 
     def count(self) -> int:
         """Return the amount of matching elements.
@@ -234,7 +753,70 @@ class QuerySet(QuerysetBase):
         """
         if not self.model:
             raise MissingModelError
-        return self.get_collection().count_documents(self.query)
+        return self._cached('count', lambda: self._measured(
+            'count', self.get_collection().count_documents, self.query))
+
+    def _measured(self, operation: str, func, *args, **kwargs):
+        """Call `func` timed by the slow query log, if enabled
+        """
+        log = profiling.slow_query_log()
+        if log is None:
+            return func(*args, **kwargs)
+        with log.measure(self, operation):
+            return func(*args, **kwargs)
+
+    def _measured_cursor(self, operation: str, cursor):
+        log = profiling.slow_query_log()
+        if log is None:
+            return cursor
+        return log.measure_cursor(self, operation, cursor)
+
+    def _hydrator(self):
+        """Returns the function building a document from a raw item of the
+        cursor: `from_database(item, deferred)` or it's lazy counterpart
+        """
+        if not self._lazy:
+            hydrate = self.model.from_database
+        else:
+            hydrate = partial(
+                self.model.from_raw,
+                codec_options=self.get_collection().codec_options)
+        if identity.current() is not None and not self._tracks_identities():
+            return partial(identity.without_identity_map, hydrate)
+        return hydrate
+
+    def _tracks_identities(self) -> bool:
+        """The identity map only holds the documents of the connection of
+        their model (the one they are saved to), not the ones read from an
+        other connection with `using`
+        """
+        return self.model.objects.get_namespace() == self.get_namespace()
+
+    def _cached(self, operation: str, compute, *args):
+        """Returns `compute()`, from the cache set by `QuerySet.cache` if
+        any, the key covers the query, sort/skip/limit, projection and `args`
+        """
+        if self._cache_ttl is None:
+            return compute()
+        backend = self._cache_backend
+        if backend is None:
+            backend = result_cache.get_default_backend()
+        collection = self.get_namespace()
+        key = result_cache.make_key(
+            collection, operation, self.query, self._sort, self._skip,
+            self._limit, self._projection, repr(self._read_preference),
+            repr(self._read_concern), args)
+        found, value = backend.get(key)
+        if not found:
+            value = compute()
+            backend.set(key, value, self._cache_ttl, collection)
+        return value
+
+    def invalidate_cache(self) -> None:
+        """Drop the cached results of this collection, called after each
+        write made through the documents and querysets
+        """
+        result_cache.invalidate(self.get_namespace())
 
     def all(self, **kwargs) -> List['Document']:
         return list(self.__iter__(**kwargs))
@@ -261,13 +843,15 @@ class QuerySet(QuerysetBase):
             cursor = cursor.skip(self._skip)
         if self._limit:
             cursor = cursor.limit(self._limit)
+        if self._batch_size:
+            cursor = cursor.batch_size(self._batch_size)
         return cursor
 
     def first(self, **kwargs):
-        try:
-            return next(self.__iter__(**kwargs))
-        except StopIteration:
-            return None
+        # read up to the end of the cursor: the query is then recorded by
+        # the slow query log
+        documents = list(self.limit(1).__iter__(**kwargs))
+        return documents[0] if documents else None
 
     def find_one(self, **kwargs):
         if self._sort:
@@ -279,46 +863,380 @@ class QuerySet(QuerysetBase):
         return self.get_collection().find_one(self.query, **kwargs)
 
     def find_raw(self, **kwargs) -> Cursor:
-        cursor = self.get_collection().find(filter=self.query, **kwargs)
+        if self._projection:
+            kwargs.setdefault('projection', self._projection)
+        collection = self.get_collection()
+        if self._lazy:
+            collection = collection.with_options(
+                codec_options=collection.codec_options.with_options(
+                    document_class=RawBSONDocument))
+        cursor = collection.find(filter=self.query, **kwargs)
         return cursor
 
     def get(self, **kwargs):
         instance = self.filter(**kwargs) if kwargs else self
-        search = list(instance.find_raw().limit(2))
+        if identity.current() is not None and \
+                list(instance.query) == ['_id'] and \
+                not isinstance(instance.query['_id'], dict) and \
+                instance._tracks_identities():
+            document = self.model._from_identity_map(instance.query['_id'])
+            if document is not None:
+                return document
+        search = list(instance._measured_cursor(
+            'find', instance.find_raw().limit(2)))
         count = len(search)
         if count > 1:
             raise TooManyResults('too many items received')
         if count == 0:
             raise self.model.DoesNotExist(instance.query)
-        model_instance = self.model(**search[0])
+        model_instance = self._hydrator()(
+            search[0], self.deferred_fields() or None)
         return model_instance
 
     def distinct(self, key: str, **kwargs) -> List[Any]:
         if not self.model:
             raise MissingModelError
-        return self.get_collection().distinct(
-            key=key, query=self.query, **kwargs)
+        return list(self._cached('distinct', lambda: self._measured(
+            'distinct', self.get_collection().distinct, key=key,
+            query=self.query, **kwargs), key, kwargs))
 
-    def delete(self):
+    def explain(self, verbosity: str = 'executionStats'
+                ) -> profiling.QueryPlan:
+        """Explain the find this queryset sends (query, sort, skip, limit
+        and projection), verbosity is one of `queryPlanner` (the query is not
+        run), `executionStats` or `allPlansExecution`
+
+        >>> User.objects.filter(name='seb').explain()
+        <QueryPlan: IXSCAN index=name_1 examined=1 returned=1>
+        """
+        if not self.model:
+            raise MissingModelError
+        command = {'find': self.get_collection_name(), 'filter': self.query}
+        if self._sort:
+            command['sort'] = dict(self._sort)
+        if self._skip:
+            command['skip'] = self._skip
+        if self._limit:
+            command['limit'] = self._limit
+        if self._projection:
+            command['projection'] = self._projection
+        kwargs = {}
+        if self._read_preference is not None:
+            kwargs['read_preference'] = self._read_preference
+        return profiling.QueryPlan(self.get_database().db.command(
+            'explain', command, verbosity=verbosity, **kwargs))
+
+    def in_bulk(self, ids: Iterable[Any], chunk_size: int = 1000
+                ) -> Dict[Any, 'Document']:
+        """Returns `{_id: document}` for the matching documents among `ids`,
+        loaded with one `$in` query per `chunk_size` ids, missing ids are not
+        in the result. sort/skip/limit are ignored
+        """
+        if not self.model:
+            raise MissingModelError
+        documents = {}
+        missing = []
+        # documents already in the identity map don't need any request
+        tracked = identity.current() is not None and \
+            self._tracks_identities()
+        for document_id in dict.fromkeys(ids):
+            document = self.model._from_identity_map(document_id) \
+                if tracked else None
+            if document is None:
+                missing.append(document_id)
+            else:
+                documents[document_id] = document
+        from_database = self.model.from_database
+        if identity.current() is not None and not tracked:
+            from_database = partial(identity.without_identity_map,
+                                    from_database)
+        deferred = self.deferred_fields() or None
+        for item in self.raw_in_bulk(missing, chunk_size):
+            documents[item['_id']] = from_database(item, deferred)
+        return documents
+
+    def paginate_after(self, token: str = None, page_size: int = 20
+                       ) -> Page:
+        """Read the page of `page_size` documents following `token` (None
+        for the first page), unlike `skip` the cost of a page does not grow
+        with it's position: the next page is queried from the sort keys of
+        the last document, `_id` is added to the sort to keep it stable.
+
+        >>> page = User.objects.sort(['-created']).paginate_after(None, 50)
+        >>> page = User.objects.sort(['-created']).paginate_after(
+        ...     page.next_token, 50)
+
+        the sort keys should not be missing nor null, skip and limit are
+        ignored and a token is only valid for the same sort.
+        """
+        if not self.model:
+            raise MissingModelError
+        sort = list(self._sort or [])
+        if not any(key == '_id' for key, _ in sort):
+            sort.append(('_id', 1))
+        instance = self.copy()
+        instance._sort = sort
+        instance._skip = None
+        instance._limit = page_size + 1
+        keys = [key for key, _ in sort]
+        projection = instance._projection
+        if projection:
+            # the sort keys are needed to build the next token
+            projection = dict(projection)
+            inclusive = self._is_inclusive(projection)
+            for key in keys:
+                if inclusive:
+                    projection[key] = True
+                else:
+                    projection.pop(key, None)
+            instance._projection = projection
+        if token is not None:
+            keyset = self.keyset_filter(sort, self._decode_token(token, sort))
+            query = self.query
+            if any(key in query for key in keyset):
+                # a merge would keep a single bound of the same operator on
+                # the first sort key (or a single `$or`)
+                instance.query = {'$and': [query, keyset]}
+            else:
+                instance.query = {**query, **keyset}
+        items = list(instance._measured_cursor(
+            'find', instance._get_cursor(instance.find_raw())))
+        next_token = None
+        if len(items) > page_size:
+            del items[page_size:]
+            next_token = self._encode_token(
+                sort, [self._read_value(items[-1], key) for key in keys])
+        hydrate = instance._hydrator()
+        deferred = instance.deferred_fields() or None
+        return Page((hydrate(item, deferred) for item in items), next_token)
+
+    def parallel_scan(self, callback=None, workers: int = 4,
+                      mode: str = 'thread', partitions: int = None,
+                      ordered: bool = False, progress=None,
+                      batch_size: int = 1000):
+        """Read the matching documents with one cursor per `_id` range, the
+        ranges (`partitions`, 4 per worker by default) being read by
+        `workers` threads:
+
+        >>> for user in User.objects.filter(active=True).parallel_scan():
+        ...     reindex(user)
+        >>> User.objects.parallel_scan(reindex, workers=8, mode='process')
+        1000000
+
+        without `callback` the documents are iterated, as they come or in
+        `_id` order when `ordered`, otherwise `callback(document)` is called
+        on each of them (from the worker threads, so `ordered` can't be
+        used) and the amount of documents is returned. in the `process` mode the documents are built and given
+        to the callback (a picklable function) in `workers` processes.
+        `progress(scanned)` is called after each batch of documents, the sort
+        is ignored, skip and limit are not supported
+        """
+        if not self.model:
+            raise MissingModelError
+        scan = ParallelScan(self, callback, workers, mode, partitions,
+                            ordered, progress, batch_size)
+        if callback is None:
+            return iter(scan)
+        return scan.run()
+
+    @classmethod
+    def _read_value(cls, item, key: str) -> Any:
+        try:
+            return cls.read_dict_path(item, key.split('.'))
+        except (KeyError, TypeError):
+            return None
+
+    @staticmethod
+    def _encode_token(sort: List[tuple], values: List[Any]) -> str:
+        raw = bson.encode({'sort': [list(x) for x in sort], 'values': values})
+        return base64.urlsafe_b64encode(raw).decode()
+
+    @staticmethod
+    def _decode_token(token: str, sort: List[tuple]) -> List[Any]:
+        try:
+            data = bson.decode(base64.urlsafe_b64decode(token.encode()))
+        except (binascii.Error, bson.InvalidBSON, ValueError):
+            raise ValueError('invalid pagination token')
+        if [tuple(x) for x in data.get('sort', ())] != list(sort):
+            raise ValueError('the pagination token is for an other sort')
+        return data['values']
+
+    def aggregate(self, *accumulators: Accumulator, allow_disk_use=False,
+                  batch_size: int = None, **named: Accumulator):
+        """Run the aggregation `pipeline` on the server:
+
+        >>> Order.objects.filter(paid=True).group_by('country').aggregate(
+        ...     Sum('price'), Count(), best=Max('price'))
+        <cursor of {'country': 'fr', 'price__sum': 230, 'count': 4, ...}>
+        >>> Order.objects.aggregate(Avg('price'))
+        {'price__avg': 57.5}
+
+        without `group_by` the accumulators give a single dict (their value is
+        None if nothing matches), otherwise and without accumulators the
+        result is a cursor streaming the output documents as dicts.
+        `allow_disk_use` lets the server spill large stages on disk.
+        """
+        if not self.model:
+            raise MissingModelError
+        kwargs = {}
+        if allow_disk_use:
+            kwargs['allowDiskUse'] = True
+        batch_size = batch_size or self._batch_size
+        if batch_size:
+            kwargs['batchSize'] = batch_size
+        cursor = self.get_collection().aggregate(
+            self.pipeline(*accumulators, **named), **kwargs)
+        if not self._is_scalar_aggregate(accumulators, named):
+            return cursor
+        aliases = [accumulator.get_alias() for accumulator in accumulators]
+        aliases.extend(named)
+        result = next(iter(cursor), None) or {}
+        return {alias: result.get(alias) for alias in aliases}
+
+    def raw_in_bulk(self, ids: Iterable[Any], chunk_size: int = 1000):
+        """Yield the raw matching documents among `ids`, fetched by `$in`
+        queries of at most `chunk_size` ids
+        """
+        ids = iter(ids)
+        while True:
+            chunk = list(islice(ids, chunk_size))
+            if not chunk:
+                return
+            query = {'_id': {'$in': chunk}}
+            if self.query:
+                query = {'$and': [self.query, query]}
+            kwargs = {'batch_size': chunk_size}
+            if self._projection:
+                kwargs['projection'] = self._projection
+            yield from self.get_collection().find(query, **kwargs)
+
+    def delete(self) -> DeleteResult:
+        """Remove the matching documents in a single request, with a
+        sort/skip/limit the ids of the window are read from a cursor and
+        removed by batches of `write_batch_size`
+        """
+        if not self.model:
+            raise MissingModelError
+        self._forget_identities()
+        collection = self.get_collection()
+        try:
+            if not self.is_windowed():
+                return collection.delete_many(self.query)
+            deleted = 0
+            for ids in self.window_ids():
+                deleted += collection.delete_many(
+                    {'_id': {'$in': ids}}).deleted_count
+            return DeleteResult({'n': deleted}, True)
+        finally:
+            self.invalidate_cache()
+
+    def is_windowed(self) -> bool:
+        """Tell if a sort/skip/limit restrict the matching documents
+        """
+        return bool(self._sort or self._skip or self._limit)
+
+    def window_ids(self, batch_size: int = None):
+        """Yield the ids of the documents inside the sort/skip/limit window,
+        by lists of at most `batch_size` ids read from a single cursor
+        """
+        batch_size = batch_size or self.write_batch_size
+        cursor = self._get_cursor(self.get_collection().find(
+            self.query, projection={'_id': True}, batch_size=batch_size))
+        cursor = iter(cursor)
+        while True:
+            ids = [item['_id'] for item in islice(cursor, batch_size)]
+            if not ids:
+                return
+            yield ids
+
+    def update(self, session=None, **kwargs) -> UpdateResult:
+        """Update all matching documents on the server side with keywords:
+        `operator__field__path=value` (see `compile_update`)
+
+        >>> User.objects.filter(level__lt=3).update(inc__level=1)
+
+        the response holds `matched_count` and `modified_count`
+        """
         if not self.model:
             raise MissingModelError
+        update = self.compile_update(**kwargs)
+        self._forget_identities()
         collection = self.get_collection()
-        cursor = self._get_cursor(collection.find(self.query))
-        ids = cursor.distinct('_id')
-        return collection.delete_many({'_id': {'$in': ids}})
+        try:
+            if not self.is_windowed():
+                return collection.update_many(self.query, update,
+                                              session=session)
+            matched = modified = 0
+            # all the ids are read before the first write: an update moving
+            # the documents along the index walked by an open cursor could
+            # make it return them again (unlike `delete`)
+            for ids in list(self.window_ids()):
+                response = collection.update_many(
+                    {'_id': {'$in': ids}}, update, session=session)
+                matched += response.matched_count
+                modified += response.modified_count
+            return UpdateResult({'n': matched, 'nModified': modified}, True)
+        finally:
+            self.invalidate_cache()
+
+    def update_one(self, session=None, **kwargs) -> UpdateResult:
+        """Same as `update` but only for the first matching document
+        """
+        if not self.model:
+            raise MissingModelError
+        query = self.query
+        self._forget_identities()
+        if self.is_windowed():
+            query = {'_id': {'$in': next(self.window_ids(1), [])}}
+        try:
+            return self.get_collection().update_one(
+                query, self.compile_update(**kwargs), session=session)
+        finally:
+            self.invalidate_cache()
+
+    def _forget_identities(self) -> None:
+        """Server side writes make the documents of the active identity map
+        stale, drop the ones of this collection
+        """
+        identity_map = identity.current()
+        if identity_map is not None:
+            identity_map.discard_collection(self.get_namespace())
 
     def get_collection(self) -> Collection:
-        return self._db.db[self.get_collection_name()]
+        """Handle of the collection with the read preference and concern of
+        this queryset, the handles are kept per database
+        """
+        db = self.get_database().db
+        name = self.get_collection_name()
+        preference = self._read_preference
+        concern = self._read_concern
+        # read preferences and concerns are not hashable
+        key = (id(db), name, repr(preference), repr(concern))
+        cached = _collections.get(key)
+        if cached is not None and cached[0] is db:
+            return cached[1]
+        collection = db[name]
+        options = {}
+        if preference is not None:
+            options['read_preference'] = preference
+        if concern is not None:
+            options['read_concern'] = concern
+        if options:
+            collection = collection.with_options(**options)
+        _collections[key] = (db, collection)
+        return collection
 
     def drop(self):
         """Drop the whole collection regardless from query/sort/limit or any
         kind of filtering
         """
-        return self.get_collection().drop()
+        try:
+            return self.get_collection().drop()
+        finally:
+            self.invalidate_cache()
 
     def find(self, filter: dict = None, **kwargs) -> List['Document']:
-        cursor = self.find_raw(**kwargs)
-        return [self.model(**item) for item in self._get_cursor(cursor)]
+        return list(self.__iter__(**kwargs))
 
     def create(self, *args, **kwargs):
         """Create a new instance of the model with the given argument and save
@@ -331,18 +1249,305 @@ class QuerySet(QuerysetBase):
         instance.save()
         return instance
 
-    def values_list(self, fields: List[str], flat=False, noid=False):
-        if isinstance(fields, str):
-            fields = (fields,)
+    def as_dicts(self, **kwargs) -> Cursor:
+        """Lazily iterate over the matching documents as plain dicts, without
+        building any `Document`, sort/skip/limit and `only`/`defer` are
+        honored
+        """
+        if self._projection:
+            kwargs.setdefault('projection', self._projection)
+        return self.raw(**kwargs)
+
+    def values(self, *fields: str, noid=False) -> Cursor:
+        """Lazily iterate over the matching documents as dicts holding only
+        the given fields (and `_id` unless `noid`)
+        """
         projection = {f: True for f in fields}
         if noid:
             projection['_id'] = False
+        return self.raw(projection=projection)
+
+    def values_list(self, fields: List[str], flat=False, noid=False,
+                    lazy=False):
+        """List of dicts holding only the given fields, or only the values
+        of the field with `flat=True`, use `lazy=True` to get an iterator
+        instead of a list
+        """
+        if isinstance(fields, str):
+            fields = (fields,)
+        if flat:
+            assert len(fields) == 1, \
+                'You can only have one field using flat=True'
+        if self._cache_ttl is not None and not lazy:
+            values = self._cached('values_list', lambda: tuple(
+                self.copy().cache(None).values_list(fields, flat, noid)),
+                fields, flat, noid)
+            return list(values) if flat else [dict(v) for v in values]
+        cursor = self.values(*fields, noid=noid)
+        if flat:
+            field_name = fields[0]
+            cursor = (value[field_name] for value in cursor)
+        return cursor if lazy else list(cursor)
+
+    def bulk_save(self, documents: Iterable['Document'],
+                  delete: Iterable['Document'] = (), ordered=False,
+                  chunk_size: int = 1000, session=None) -> BulkReport:
+        """Save many documents with `bulk_write` calls of at most `chunk_size`
+        operations: new documents are inserted (and get their `_id`), stored
+        ones send their changes like `Document.save` does and the ones in
+        `delete` are removed.
+        invalid documents are not sent, errors from the server don't raise,
+        everything is reported in the returned `BulkReport`.
+        """
+        if not self.model:
+            raise MissingModelError
+        report = BulkReport()
+        # (result, request, inserted id) of each operation to send
+        operations = []
+        for document in documents:
+            result = BulkResult(document, 'unchanged')
+            report.append(result)
+            if not document.is_valid():
+                result.status = 'invalid'
+            elif not document._id:
+                content = document.to_dict()
+                document.pre_save(content, True)
+                content.setdefault('_id', ObjectId())
+                result.status = 'inserted'
+                operations.append(
+                    (result, InsertOne(content), content['_id']))
+            else:
+                update = document.get_update()
+                if update is not None:
+                    result.status = 'updated'
+                    operations.append((result, UpdateOne(
+                        {'_id': document._id}, update), None))
+        for document in delete:
+            result = BulkResult(document, 'unchanged')
+            report.append(result)
+            if document._id is not None:
+                result.status = 'deleted'
+                operations.append(
+                    (result, DeleteOne({'_id': document._id}), None))
+
+        collection = self.get_collection()
+        failed = False
+        for start in range(0, len(operations), chunk_size):
+            chunk = operations[start:start + chunk_size]
+            if failed:
+                for result, _, _ in chunk:
+                    result.status = 'skipped'
+                continue
+            errors = {}
+            try:
+                collection.bulk_write([request for _, request, _ in chunk],
+                                      ordered=ordered, session=session)
+            except BulkWriteError as error:
+                errors = {write_error['index']: write_error
+                          for write_error in error.details['writeErrors']}
+            first_error = min(errors) if errors else len(chunk)
+            for index, (result, _, inserted_id) in enumerate(chunk):
+                if index in errors:
+                    result.status = 'failed'
+                    result.error = errors[index]
+                elif ordered and index > first_error:
+                    result.status = 'skipped'
+                else:
+                    self._bulk_applied(result, inserted_id)
+            failed = ordered and bool(errors)
+        if operations:
+            self.invalidate_cache()
+        return report
+
+    @staticmethod
+    def _bulk_applied(result: BulkResult, inserted_id=None) -> None:
+        """Update a document once it's bulk operation has been applied
+        """
+        document = result.document
+        if result.status == 'inserted':
+            document._id = inserted_id
+        elif result.status == 'deleted':
+            identity_map = identity.current()
+            if identity_map is not None:
+                identity_map.discard(*identity_map.key(document))
+            document._id = None
+            object.__setattr__(document, '_synced', None)
+            return
+        document.mark_clean()
+
+
+class AsyncQuerySet(QuerysetBase):
+    """asyncio implementation of the QuerySet, available on each model as
+    `Model.aobjects`:
+
+    >>> async for user in User.aobjects.filter(is_admin=True):
+    ...     print(user)
+    >>> await User.aobjects.count()
+
+    the blocking calls of the synchrone `QuerySet` (the one of the model, so
+    `manager_class` is honored) are run in a thread pool shared by all async
+    querysets and bounded to `max_workers` threads, so the event loop is
+    never blocked by pymongo.
+    """
+    max_workers = 8
+    # documents fetched per round trip while iterating without `batch_size`
+    default_batch_size = 100
+    _executor = None
+
+    @classmethod
+    def get_executor(cls) -> ThreadPoolExecutor:
+        if AsyncQuerySet._executor is None:
+            AsyncQuerySet._executor = ThreadPoolExecutor(
+                max_workers=cls.max_workers,
+                thread_name_prefix='mongomodel')
+        return AsyncQuerySet._executor
+
+    @classmethod
+    async def run(cls, func, *args, **kwargs):
+        """Run the blocking `func` in the executor and wait for it
+        """
+        loop = asyncio.get_running_loop()
+        # run with the context of the caller (identity map...)
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            cls.get_executor(), partial(context.run, func, *args, **kwargs))
+
+    def sync(self) -> QuerySet:
+        """Returns the synchrone version of this queryset
+        """
+        if not self.model:
+            raise MissingModelError
+        objects = getattr(self.model, 'objects', None)
+        return self.copy(type(objects) if objects is not None else QuerySet)
+
+    def __iter__(self):
+        raise TypeError('use "async for" to iterate over an AsyncQuerySet')
+
+    def __aiter__(self):
+        return self.iterator()
+
+    async def stream(self, iterable, chunk_size: int = None):
+        """Asynchronously iterate over a blocking iterable (like a cursor),
+        each chunk of items is read in the executor
+        """
+        iterator = iter(iterable)
+        size = chunk_size or self._batch_size or self.default_batch_size
+        while True:
+            chunk = await self.run(list, islice(iterator, size))
+            if not chunk:
+                return
+            for item in chunk:
+                yield item
+
+    def iterator(self, chunk_size: int = None):
+        """Iterate over the matching models instances, each chunk of
+        documents is fetched and built in the executor
+        """
+        return self.stream(self.sync().__iter__(), chunk_size)
+
+    def as_dicts(self, **kwargs):
+        return self.stream(self.sync().as_dicts(**kwargs))
+
+    def values(self, *fields: str, noid=False):
+        return self.stream(self.sync().values(*fields, noid=noid))
+
+    async def count(self) -> int:
+        return await self.run(self.sync().count)
+
+    async def all(self, **kwargs) -> List['Document']:
+        return await self.run(self.sync().all, **kwargs)
+
+    async def find(self, filter: dict = None, **kwargs) -> List['Document']:
+        return await self.run(self.sync().find, filter, **kwargs)
+
+    async def raw_all(self, **kwargs):
+        return await self.run(self.sync().raw_all, **kwargs)
+
+    async def first(self, **kwargs):
+        return await self.run(self.sync().first, **kwargs)
+
+    async def find_one(self, **kwargs):
+        return await self.run(self.sync().find_one, **kwargs)
+
+    async def get(self, **kwargs):
+        return await self.run(self.sync().get, **kwargs)
+
+    async def distinct(self, key: str, **kwargs) -> List[Any]:
+        return await self.run(self.sync().distinct, key, **kwargs)
+
+    async def in_bulk(self, ids: Iterable[Any], chunk_size: int = 1000
+                      ) -> Dict[Any, 'Document']:
+        return await self.run(self.sync().in_bulk, ids, chunk_size)
+
+    async def paginate_after(self, token: str = None, page_size: int = 20
+                             ) -> Page:
+        return await self.run(self.sync().paginate_after, token, page_size)
+
+    def parallel_scan(self, callback=None, workers: int = 4,
+                      mode: str = 'thread', partitions: int = None,
+                      ordered: bool = False, progress=None,
+                      batch_size: int = 1000):
+        """Async generator of the documents without `callback`, otherwise
+        a coroutine of the amount of documents scanned
+        """
+        scan = partial(self.sync().parallel_scan, callback, workers, mode,
+                       partitions, ordered, progress, batch_size)
+        if callback is None:
+            return self._stream_call(scan, batch_size)
+        return self.run(scan)
+
+    async def explain(self, verbosity: str = 'executionStats'
+                      ) -> profiling.QueryPlan:
+        return await self.run(self.sync().explain, verbosity)
+
+    def aggregate(self, *accumulators: Accumulator, allow_disk_use=False,
+                  batch_size: int = None, **named: Accumulator):
+        """Awaitable for a single result, else an async iterator over the
+        output documents (see `QuerySet.aggregate`)
+        """
+        call = partial(self.sync().aggregate, *accumulators,
+                       allow_disk_use=allow_disk_use, batch_size=batch_size,
+                       **named)
+        if self._is_scalar_aggregate(accumulators, named):
+            return self.run(call)
+        return self._stream_call(call, batch_size)
+
+    async def _stream_call(self, func, chunk_size: int = None):
+        """Stream the iterable returned by the blocking `func`
+        """
+        iterable = await self.run(func)
+        async for item in self.stream(iterable, chunk_size):
+            yield item
+
+    async def delete(self):
+        return await self.run(self.sync().delete)
+
+    async def update(self, session=None, **kwargs) -> UpdateResult:
+        return await self.run(self.sync().update, session=session, **kwargs)
+
+    async def update_one(self, session=None, **kwargs) -> UpdateResult:
+        return await self.run(self.sync().update_one, session=session,
+                              **kwargs)
+
+    async def drop(self):
+        return await self.run(self.sync().drop)
+
+    async def create(self, *args, **kwargs):
+        return await self.run(self.sync().create, *args, **kwargs)
+
+    def values_list(self, fields: List[str], flat=False, noid=False,
+                    lazy=False):
+        """Awaitable list, or asynchronous iterator with `lazy=True`
+        """
+        if lazy:
+            return self.stream(self.sync().values_list(
+                fields, flat=flat, noid=noid, lazy=True))
+        return self.run(self.sync().values_list, fields, flat=flat,
+                        noid=noid)
 
-        cursor = self.raw(projection=projection)
-        if not flat:
-            return list(cursor)
-        assert len(fields) == 1, 'You can only have one field using flat=True'
-        field_name = fields[0]
-        return list([
-            value[field_name] for value in cursor
-        ])
+    async def bulk_save(self, documents: Iterable['Document'],
+                        delete: Iterable['Document'] = (), ordered=False,
+                        chunk_size: int = 1000, session=None) -> BulkReport:
+        return await self.run(self.sync().bulk_save, documents, delete,
+                              ordered=ordered, chunk_size=chunk_size,
+                              session=session)
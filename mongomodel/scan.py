@@ -0,0 +1,255 @@
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Iterator, List, Optional
+
+import bson
+from bson import Decimal128, ObjectId, Timestamp
+
+# amount of `_id` sampled per partition to place the split points
+SAMPLES_PER_PARTITION = 16
+_DONE = object()
+_UNBOUNDED = object()
+# the BSON types in the order of the server sort
+TYPES_ORDER = ['minKey', 'null', 'number', 'string', 'object', 'array',
+               'binData', 'objectId', 'bool', 'date', 'timestamp', 'regex',
+               'maxKey']
+
+
+def bson_type(value) -> Optional[str]:
+    """Alias of the BSON type of a `_id` value which can be split in
+    ranges, None for the other ones
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float, Decimal128)):
+        return 'number'
+    if isinstance(value, str):
+        return 'string'
+    if isinstance(value, ObjectId):
+        return 'objectId'
+    if isinstance(value, datetime):
+        return 'date'
+    if isinstance(value, bytes):
+        return 'binData'
+    if isinstance(value, Timestamp):
+        return 'timestamp'
+    return None
+
+
+def split_points(queryset, partitions: int) -> List[Any]:
+    """`_id` values splitting the collection of `queryset` in about
+    `partitions` ranges of the same size, estimated from a `$sample` of the
+    whole collection (without the filter the server picks random documents
+    instead of sorting the matching ones)
+    """
+    if partitions < 2:
+        return []
+    pipeline = [
+        {'$sample': {'size': partitions * SAMPLES_PER_PARTITION}},
+        {'$project': {'_id': 1}},
+    ]
+    try:
+        ids = sorted({item['_id'] for item in
+                      queryset.get_collection().aggregate(pipeline)})
+    except TypeError:
+        # `_id` of mixed or unhashable types: no split
+        return []
+    if not ids or len({bson_type(value) for value in ids}) != 1 or \
+            bson_type(ids[0]) is None:
+        return []
+    step = len(ids) / partitions
+    return sorted({ids[int(step * index)] for index in range(1, partitions)})
+
+
+def partition_queries(query: dict, points: List[Any]) -> List[dict]:
+    """Split `query` in one query per `_id` range between the `points`.
+    a range only matches the `_id` of the type of the points, the other
+    ones are read by a query for the types sorted before and one for the
+    types sorted after (or unknown)
+    """
+    if not points:
+        return [query]
+    index = TYPES_ORDER.index(bson_type(points[0]))
+    conditions = [{'$type': TYPES_ORDER[:index]}]
+    bounds = [_UNBOUNDED, *points, _UNBOUNDED]
+    for low, high in zip(bounds, bounds[1:]):
+        condition = {}
+        if low is not _UNBOUNDED:
+            condition['$gte'] = low
+        if high is not _UNBOUNDED:
+            condition['$lt'] = high
+        conditions.append(condition)
+    conditions.append({'$not': {'$type': TYPES_ORDER[:index + 1]}})
+    if query:
+        return [{'$and': [query, {'_id': condition}]}
+                for condition in conditions]
+    return [{'_id': condition} for condition in conditions]
+
+
+def hydrate_batch(model: type, raws: List[bytes], deferred: frozenset,
+                  codec_options, callback: Callable) -> int:
+    """Build the documents of a batch of raw BSON and pass them to
+    `callback`, runs in the worker processes
+    """
+    for raw in raws:
+        callback(model.from_database(bson.decode(raw, codec_options),
+                                     deferred))
+    return len(raws)
+
+
+class ParallelScan:
+    """Read the documents of a queryset with one cursor per `_id` range,
+    see `QuerySet.parallel_scan`.
+
+    the ranges are read by `workers` threads, in the `process` mode the
+    threads only read the raw BSON and the documents are built (and given to
+    the callback) by a pool of `workers` processes.
+    iterating gives the documents, `run()` gives them to the callback (as
+    they come, `ordered` only applies to the iteration) and returns their
+    amount, `progress(scanned)` is called from the calling
+    thread after each batch.
+    """
+    def __init__(self, queryset, callback: Callable = None, workers: int = 4,
+                 mode: str = 'thread', partitions: int = None,
+                 ordered: bool = False, progress: Callable = None,
+                 batch_size: int = 1000):
+        if mode not in ('thread', 'process'):
+            raise ValueError(f'unknown parallel scan mode: {mode}')
+        if mode == 'process' and callback is None:
+            raise ValueError('the process mode needs a callback')
+        if ordered and callback is not None:
+            # the callback is called by the readers as the batches come
+            raise ValueError('the callback can not be called in order, '
+                             'iterate the ordered scan instead')
+        if queryset._skip or queryset._limit:
+            raise ValueError('skip and limit can not be split')
+        self.queryset = queryset
+        self.callback = callback
+        self.workers = workers
+        self.mode = mode
+        self.partitions = partitions or workers * 4
+        self.ordered = ordered
+        self.progress = progress
+        self.batch_size = batch_size
+        self.scanned = 0
+        self._stop = threading.Event()
+        self._pool = None
+
+    def queries(self) -> List[dict]:
+        points = split_points(self.queryset, self.partitions)
+        return partition_queries(self.queryset.query, points)
+
+    def __iter__(self) -> Iterator['Document']:
+        for documents in self._batches():
+            self._advance(len(documents))
+            yield from documents
+
+    def run(self) -> int:
+        for count in self._batches():
+            self._advance(count)
+        return self.scanned
+
+    def _advance(self, count: int) -> None:
+        self.scanned += count
+        if self.progress:
+            self.progress(self.scanned)
+
+    def _batches(self):
+        """Yield the output of the readers: lists of documents without
+        callback, amount of documents handled by the callback otherwise
+        """
+        queries = self.queries()
+        readers = ThreadPoolExecutor(self.workers)
+        if self.mode == 'process':
+            self._pool = ProcessPoolExecutor(self.workers)
+        self._stop.clear()
+        try:
+            if self.ordered:
+                outputs = [queue.Queue(2) for _ in queries]
+                for query, output in zip(queries, outputs):
+                    readers.submit(self._read, query, output)
+                for output in outputs:
+                    yield from self._drain(output, 1)
+            else:
+                output = queue.Queue(self.workers * 2)
+                for query in queries:
+                    readers.submit(self._read, query, output)
+                yield from self._drain(output, len(queries))
+        finally:
+            self._stop.set()
+            readers.shutdown()
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+    @staticmethod
+    def _drain(output: queue.Queue, readers: int):
+        while readers:
+            item = output.get()
+            if item is _DONE:
+                readers -= 1
+            elif isinstance(item, BaseException):
+                raise item
+            else:
+                yield item
+
+    def _put(self, output: queue.Queue, item) -> bool:
+        # give up once the scan is stopped (error or iteration left early)
+        while not self._stop.is_set():
+            try:
+                output.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _read(self, query: dict, output: queue.Queue) -> None:
+        try:
+            for item in self._read_partition(query):
+                if not self._put(output, item):
+                    return
+            self._put(output, _DONE)
+        except BaseException as error:
+            self._put(output, error)
+
+    def _read_partition(self, query: dict):
+        if self._stop.is_set():
+            return
+        queryset = self.queryset.copy()
+        queryset.query = query
+        queryset._sort = [('_id', 1)] if self.ordered else None
+        queryset._batch_size = self.batch_size
+        if self.mode == 'process':
+            queryset._lazy = True
+        hydrate = queryset._hydrator()
+        deferred = queryset.deferred_fields() or None
+        codec_options = self.queryset.get_collection().codec_options
+        callback = self.callback
+        cursor = queryset._measured_cursor(
+            'find', queryset._get_cursor(queryset.find_raw()))
+        batch = []
+        for item in cursor:
+            batch.append(item)
+            if len(batch) < self.batch_size:
+                continue
+            yield self._handle(batch, hydrate, deferred, codec_options)
+            batch = []
+            if self._stop.is_set():
+                return
+        if batch:
+            yield self._handle(batch, hydrate, deferred, codec_options)
+
+    def _handle(self, batch: list, hydrate, deferred, codec_options):
+        if self.mode == 'process':
+            return self._pool.submit(
+                hydrate_batch, self.queryset.model,
+                [item.raw for item in batch], deferred, codec_options,
+                self.callback).result()
+        documents = [hydrate(item, deferred) for item in batch]
+        if self.callback is None:
+            return documents
+        for document in documents:
+            self.callback(document)
+        return len(documents)
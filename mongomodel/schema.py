@@ -0,0 +1,112 @@
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Tuple
+
+from .field import Field
+
+
+class Schema:
+    """Ordered and immutable description of the fields of a `Document` class,
+    inherited fields included, it is compiled once per class by `DocumentMeta`
+    so instances only have to hold their own values.
+
+    fields are ordered by declaration, parents first, a redeclared field keeps
+    it's inherited position and a subclass can hide an inherited field by
+    overriding it with a non `Field` attribute.
+
+    the values of a compact schema are stored in a list where each field has
+    a fixed index, `keys` gives the key of each field in the values container
+    and `new_values()` returns a fresh container for a new instance.
+
+    `validator(values, bound)` returns the names of the invalid fields of an
+    instance in a single call, it is generated for the class with the checks
+    of the fields inlined (see `Field.compile_validation`), so changing the
+    options of a declared field (`maxlen`...) afterward is not seen by it.
+    """
+    __slots__ = ('fields', 'names', 'required', 'stateful', 'initial',
+                 'compact', 'keys', 'new_values', 'validator')
+
+    def __init__(self, fields: Mapping[str, Field], compact=False):
+        self.fields: Mapping[str, Field] = MappingProxyType(dict(fields))
+        self.names: Tuple[str, ...] = tuple(fields)
+        self.required: Tuple[str, ...] = tuple(
+            name for name, field in fields.items() if field.required)
+        # stateful fields keep their value on a per instance copy
+        # (see `Field.stateful`), they don't have any slot in `initial`
+        self.stateful: Tuple[str, ...] = tuple(
+            name for name, field in fields.items() if field.stateful)
+        self.initial: Mapping[str, object] = MappingProxyType({
+            name: field.value for name, field in fields.items()
+            if not field.stateful
+        })
+        self.compact = compact
+        if compact:
+            self.keys: Mapping[str, object] = MappingProxyType({
+                name: index for index, name in enumerate(self.names)})
+            self.new_values = [
+                self.initial.get(name) for name in self.names].copy
+        else:
+            self.keys = MappingProxyType({name: name for name in self.names})
+            self.new_values = self.initial.copy
+        self.validator = self.compile_validator()
+
+    def __repr__(self):
+        return f'<Schema: {", ".join(self.names)}>'
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.fields
+
+    def __getitem__(self, name: str) -> Field:
+        return self.fields[name]
+
+    def compile_validator(self) -> Callable[[Any, dict], List[str]]:
+        namespace: Dict[str, Any] = {}
+
+        def ref(obj) -> str:
+            name = f'_{len(namespace)}'
+            namespace[name] = obj
+            return name
+
+        lines = ['def validator(values, bound):', '    invalid = []']
+        for name, field in self.fields.items():
+            key = self.keys[name]
+            if field.stateful:
+                lines.append(f'    if not bound[{name!r}].is_valid():')
+            else:
+                expression = field.compile_validation('value', ref)
+                if expression is None:
+                    lines.append(f'    if not {ref(field.is_valid_value)}('
+                                 f'values[{key!r}]):')
+                elif not expression:
+                    continue
+                else:
+                    lines.append(f'    value = values[{key!r}]')
+                    if type(field).resolve is not Field.resolve:
+                        lines.append(
+                            f'    value = {ref(field.resolve)}(value)')
+                    elif field.default is not None:
+                        lines.append('    if value is None:')
+                        lines.append(f'        value = {ref(field.default)}()')
+                    lines.append(f'    if {expression}:')
+            lines.append(f'        invalid.append({name!r})')
+        lines.append('    return invalid')
+        exec('\n'.join(lines), namespace)
+        return namespace['validator']
+
+    @classmethod
+    def from_class(cls, klass: type, compact=False) -> 'Schema':
+        """Collect the fields declared on `klass` and all it's parents
+        """
+        fields: Dict[str, Field] = {}
+        for base in reversed(klass.__mro__):
+            for name, attribute in vars(base).items():
+                if isinstance(attribute, Field):
+                    fields[name] = attribute
+                elif name in fields:
+                    del fields[name]
+        return cls(fields, compact=compact)
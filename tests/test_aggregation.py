@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+from mock import patch
+
+from mongomodel import Document, Field, Sum, Avg, Count, Max, Push
+
+
+class Order(Document):
+    collection = 'order'
+    price = Field()
+    country = Field()
+
+
+class Country(Document):
+    collection = 'country'
+    code = Field()
+
+
+class TestAccumulators:
+    def test_expressions(self):
+        assert Sum('price').as_mongo_expression() == {'$sum': '$price'}
+        assert Push('items.name').get_alias() == 'items_name__push'
+        assert Avg('price', alias='mean').get_alias() == 'mean'
+        assert Count().as_mongo_expression() == {'$sum': 1}
+        assert Count().get_alias() == 'count'
+
+    def test_alias_required(self):
+        with pytest.raises(ValueError):
+            Sum({'$multiply': ['$price', '$qty']}).get_alias()
+
+
+class TestPipeline:
+    def test_match_and_window(self):
+        qs = Order.objects.filter(country='fr').sort(['-price']).skip(5) \
+            .limit(10).only('price')
+        assert qs.pipeline() == [
+            {'$match': {'country': 'fr'}},
+            {'$sort': {'price': -1}},
+            {'$skip': 5},
+            {'$limit': 10},
+            {'$project': {'price': True}},
+        ]
+
+    def test_stages(self):
+        qs = Order.objects.lookup(Country, 'country', 'code') \
+            .unwind('country', preserve_empty=True) \
+            .annotate(total={'$multiply': ['$price', 2]}, sum=Sum('prices'))
+        assert qs.pipeline() == [
+            {'$lookup': {'from': 'country', 'localField': 'country',
+                         'foreignField': 'code', 'as': 'country'}},
+            {'$unwind': {'path': '$country',
+                         'preserveNullAndEmptyArrays': True}},
+            {'$addFields': {'total': {'$multiply': ['$price', 2]},
+                            'sum': {'$sum': '$prices'}}},
+        ]
+
+    def test_group(self):
+        qs = Order.objects.group_by('country')
+        assert qs.pipeline(Sum('price'), best=Max('price')) == [
+            {'$group': {'_id': '$country', 'price__sum': {'$sum': '$price'},
+                        'best': {'$max': '$price'}}},
+            {'$project': {'_id': False, 'country': '$_id',
+                          'price__sum': True, 'best': True}},
+        ]
+        pipeline = Order.objects.group_by('country', 'a.b').pipeline(Count())
+        assert pipeline[0]['$group']['_id'] == \
+            {'country': '$country', 'a_b': '$a.b'}
+        assert pipeline[1]['$project']['a_b'] == '$_id.a_b'
+        # the distinct keys
+        assert Order.objects.group_by('country').pipeline() == [
+            {'$group': {'_id': '$country'}},
+            {'$project': {'_id': False, 'country': '$_id'}},
+        ]
+
+
+class TestAggregate:
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_single_result(self, mock_db):
+        aggregate = mock_db.__getitem__.return_value.aggregate
+        aggregate.return_value = iter([{'price__avg': 12.5, 'count': 2}])
+        result = Order.objects.aggregate(Avg('price'), Count(), best=Max('x'))
+        assert result == {'price__avg': 12.5, 'count': 2, 'best': None}
+        aggregate.return_value = iter([])
+        assert Order.objects.aggregate(Avg('price')) == {'price__avg': None}
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_grouped_stream(self, mock_db):
+        aggregate = mock_db.__getitem__.return_value.aggregate
+        rows = [{'country': 'fr', 'count': 2}]
+        aggregate.return_value = iter(rows)
+        qs = Order.objects.filter(price__gt=1).group_by('country')
+        assert list(qs.aggregate(Count(), allow_disk_use=True,
+                                 batch_size=50)) == rows
+        aggregate.assert_called_once_with(
+            qs.pipeline(Count()), allowDiskUse=True, batchSize=50)
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_async(self, mock_db):
+        aggregate = mock_db.__getitem__.return_value.aggregate
+
+        async def collect():
+            aggregate.return_value = iter([{'count': 3}])
+            single = await Order.aobjects.aggregate(Count())
+            aggregate.return_value = iter([{'_id': 1}, {'_id': 2}])
+            rows = [row async for row in
+                    Order.aobjects.unwind('tags').aggregate()]
+            return single, rows
+
+        assert asyncio.run(collect()) == \
+            ({'count': 3}, [{'_id': 1}, {'_id': 2}])
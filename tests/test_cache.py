@@ -0,0 +1,118 @@
+import time
+
+from bson import ObjectId
+from mock import patch
+
+from mongomodel import Document, Field
+from mongomodel.cache import LRUCache, make_key
+
+
+class Book(Document):
+    collection = 'book'
+    title = Field()
+
+
+class TestLRUCache:
+    def test_get_set(self):
+        backend = LRUCache()
+        assert backend.get('a') == (False, None)
+        backend.set('a', None, 10, 'book')
+        assert backend.get('a') == (True, None)
+
+    def test_ttl(self):
+        backend = LRUCache()
+        backend.set('a', 1, -1, 'book')
+        assert backend.get('a') == (False, None)
+        assert len(backend) == 0
+
+    def test_eviction(self):
+        backend = LRUCache(maxsize=2)
+        backend.set('a', 1, 10, 'book')
+        backend.set('b', 2, 10, 'book')
+        backend.get('a')
+        backend.set('c', 3, 10, 'book')
+        assert backend.get('a') == (True, 1)
+        assert backend.get('b') == (False, None)
+
+    def test_invalidate(self):
+        backend = LRUCache()
+        backend.set('a', 1, 10, 'book')
+        backend.set('b', 2, 10, 'user')
+        backend.invalidate('book')
+        assert backend.get('a') == (False, None)
+        assert backend.get('b') == (True, 2)
+
+    def test_make_key(self):
+        assert make_key({'a': 1, 'b': 2}) == make_key({'b': 2, 'a': 1})
+        assert make_key({'a': 1}) != make_key({'a': 2})
+
+
+class TestQuerySetCache:
+    def setup_method(self):
+        self.backend = LRUCache()
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_documents(self, mock_db):
+        collection = mock_db.__getitem__.return_value
+        collection.find.return_value = [{'_id': 1, 'title': 'dune'}]
+        qs = Book.objects.filter(title='dune').cache(10, self.backend)
+        first = qs.all()
+        first[0].title = 'changed'
+        second = qs.all()
+        assert second[0].title == 'dune'
+        assert first[0] is not second[0]
+        collection.find.assert_called_once()
+        Book.objects.filter(title='other').cache(10, self.backend).all()
+        assert collection.find.call_count == 2
+        Book.objects.filter(title='dune').all()
+        assert collection.find.call_count == 3
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_count_distinct_values_list(self, mock_db):
+        collection = mock_db.__getitem__.return_value
+        collection.count_documents.return_value = 3
+        collection.distinct.return_value = ['dune']
+        collection.find.return_value = [{'_id': 1, 'title': 'dune'}]
+        qs = Book.objects.cache(10, self.backend)
+        for _ in range(2):
+            assert qs.count() == 3
+            assert qs.distinct('title') == ['dune']
+            assert qs.values_list('title', flat=True) == ['dune']
+        collection.count_documents.assert_called_once()
+        collection.distinct.assert_called_once()
+        collection.find.assert_called_once()
+        qs.distinct('title').append('other')
+        assert qs.distinct('title') == ['dune']
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_ttl(self, mock_db):
+        collection = mock_db.__getitem__.return_value
+        collection.count_documents.return_value = 3
+        qs = Book.objects.cache(0.01, self.backend)
+        qs.count()
+        time.sleep(0.02)
+        qs.count()
+        assert collection.count_documents.call_count == 2
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_invalidated_by_writes(self, mock_db):
+        collection = mock_db.__getitem__.return_value
+        collection.count_documents.return_value = 3
+        collection.insert_one.return_value.inserted_id = ObjectId()
+        qs = Book.objects.cache(10, self.backend)
+        writes = [
+            lambda: Book(title='new').save(),
+            lambda: Book(_id=ObjectId()).delete(),
+            lambda: Book.objects.filter(title='a').delete(),
+            lambda: Book.objects.update(set__title='b'),
+            lambda: Book.delete_many([Book(_id=ObjectId())]),
+        ]
+        calls = 0
+        for write in writes:
+            qs.count()
+            qs.count()
+            calls += 1
+            assert collection.count_documents.call_count == calls
+            write()
+        qs.count()
+        assert collection.count_documents.call_count == calls + 1
@@ -0,0 +1,167 @@
+import pytest
+from mock import MagicMock, patch
+from pymongo.read_concern import ReadConcern
+from pymongo.read_preferences import ReadPreference, Secondary
+
+import mongomodel
+from mongomodel import Database, Document, Field, connections, \
+    get_database, identity_map, register_connection
+from mongomodel.cache import LRUCache
+
+
+class TestDatabase:
+    @patch('pymongo.MongoClient')
+    def test_new(self, client):
+        db = mongomodel.database.new(host='mongodb://replica', db='shop')
+        kwargs = client.call_args[1]
+        assert kwargs['host'] == 'mongodb://replica'
+        assert kwargs['connect'] is True
+        assert db.db is getattr(client.return_value, 'shop')
+
+    @patch('pymongo.MongoClient')
+    def test_lazy_by_default(self, client):
+        Database(host='mongodb://replica')
+        assert client.call_args[1]['connect'] is False
+
+
+class TestConnections:
+    def setup_method(self):
+        self.reports = MagicMock()
+        register_connection('reports', self.reports)
+
+    def teardown_method(self):
+        connections.pop('reports', None)
+
+    def test_registry(self):
+        assert get_database() is mongomodel.database
+        assert get_database('reports') is self.reports
+        with pytest.raises(KeyError):
+            get_database('missing')
+
+    @patch('pymongo.MongoClient')
+    def test_register_from_arguments(self, client):
+        database = register_connection('archive', host='mongodb://archive')
+        try:
+            assert get_database('archive') is database
+            assert client.call_args[1]['host'] == 'mongodb://archive'
+        finally:
+            del connections['archive']
+
+    def test_model_alias(self):
+        class Sale(Document):
+            db_alias = 'reports'
+            price = Field()
+
+        collection = self.reports.db.__getitem__.return_value
+        collection.count_documents.return_value = 3
+        assert Sale.objects.get_database() is self.reports
+        assert Sale.aobjects.get_database() is self.reports
+        assert Sale.objects.filter(price=1).count() == 3
+        self.reports.db.__getitem__.assert_called_with('sale')
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_using(self, mock_db):
+        class Order(Document):
+            price = Field()
+
+        assert Order.objects.get_database() is mongomodel.database
+        qs = Order.objects.using('reports')
+        assert qs.filter(price=1).get_database() is self.reports
+        assert qs.using('default').get_database() is mongomodel.database
+        other = MagicMock()
+        Database.update_queryset(other, qs)
+        assert qs.get_database() is other
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_namespaces(self, mock_db):
+        class Order(Document):
+            collection = 'order'
+            price = Field()
+
+        collection = mock_db.__getitem__.return_value
+        collection.count_documents.return_value = 1
+        collection.with_options.return_value \
+            .count_documents.return_value = 3
+        self.reports.db.__getitem__.return_value \
+            .count_documents.return_value = 2
+        backend = LRUCache()
+        assert Order.objects.get_namespace() == 'order'
+        assert Order.objects.using('reports').get_namespace() == \
+            'reports/order'
+        assert Order.objects.cache(60, backend).count() == 1
+        assert Order.objects.using('reports').cache(60, backend).count() == 2
+        # read from a secondary, the result may lag: not shared either
+        assert Order.objects.read_preference('secondary').cache(
+            60, backend).count() == 3
+        assert len(backend) == 3
+        Order.objects.using('reports').invalidate_cache()
+        assert len(backend) == 2
+
+        collection.find.return_value = [{'_id': 1, 'price': 1}]
+        self.reports.db.__getitem__.return_value.find.return_value = [
+            {'_id': 1, 'price': 2}]
+        with identity_map() as identities:
+            order = Order.objects.all()[0]
+            assert order.price == 1
+            # it would be saved to the default connection: not tracked
+            assert Order.objects.using('reports').all()[0].price == 2
+            assert identities.get('order', 1) is order
+            assert ('reports/order', 1) not in identities
+            assert order.price == 1
+
+        class Sale(Document):
+            collection = 'order'
+            db_alias = 'reports'
+            price = Field()
+
+        with identity_map() as identities:
+            assert Sale.objects.all()[0].price == 2
+            assert Order.objects.all()[0].price == 1
+            assert identities.get('reports/order', 1).price == 2
+            assert identities.get('order', 1).price == 1
+
+
+class TestReadOptions:
+    class Order(Document):
+        collection = 'order'
+        price = Field()
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_read_preference(self, mock_db):
+        qs = self.Order.objects.read_preference('secondaryPreferred')
+        assert qs._read_preference == ReadPreference.SECONDARY_PREFERRED
+        collection = qs.get_collection()
+        with_options = mock_db.__getitem__.return_value.with_options
+        with_options.assert_called_once_with(
+            read_preference=ReadPreference.SECONDARY_PREFERRED)
+        assert collection is with_options.return_value
+        tagged = self.Order.objects.read_preference(
+            'secondary', tag_sets=[{'dc': 'paris'}])
+        assert tagged._read_preference == Secondary([{'dc': 'paris'}])
+        with pytest.raises(ValueError):
+            self.Order.objects.read_preference('anywhere')
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_read_concern(self, mock_db):
+        qs = self.Order.objects.read_concern('majority').filter(price=1)
+        qs.get_collection()
+        mock_db.__getitem__.return_value.with_options.assert_called_once_with(
+            read_concern=ReadConcern('majority'))
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_cached_handles(self, mock_db):
+        objects = self.Order.objects
+        assert objects.get_collection() is objects.filter(
+            price=1).get_collection()
+        assert mock_db.__getitem__.call_count == 1
+        secondary = objects.read_preference('secondary')
+        assert secondary.get_collection() is secondary.get_collection()
+        assert secondary.get_collection() is not objects.get_collection()
+        assert mock_db.__getitem__.return_value.with_options.call_count == 1
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_explain(self, mock_db):
+        mock_db.command.return_value = {}
+        self.Order.objects.read_preference('secondary').explain()
+        assert mock_db.command.call_args[1]['read_preference'] == \
+            ReadPreference.SECONDARY
@@ -1,8 +1,10 @@
+import tracemalloc
 import pytest
 from mock import patch, MagicMock
 
 from bson import ObjectId
-from mongomodel import Document, Field
+from mongomodel import Document, CompactDocument, Field, StringField, \
+    EmailField, RegexField, IntegerField, BoolField
 from datetime import datetime
 
 from functools import wraps
@@ -81,17 +83,29 @@ class TestDocument:
     def test_save_old(self, mock_db):
         update: MagicMock = mock_db.__getitem__.return_value.update_one
         doc = Document(_id='test')
+        doc.name = Field(value='named')
         doc.save()
-        update.assert_called_once_with({'_id': 'test'}, {'$set': {}},
+        update.assert_called_once_with({'_id': 'test'},
+                                       {'$set': {'name': 'named'}},
                                        session=None)
         assert doc._id == 'test'
 
     @no_database
     def test_save_invalid(self):
+        checked = []
+
+        class Positive(Field):
+            def validate(self, value):
+                checked.append(value)
+                if value < 0:
+                    raise ValueError(value)
+
         doc = Document(collection='test')
-        doc.is_valid = lambda: False
+        doc.add_field('amount', Positive(value=-1))
         with pytest.raises(Document.DocumentInvalid):
             doc.save()
+        # validated once
+        assert checked == [-1]
 
     @no_database
     def test_delete_unknow(self):
@@ -123,6 +137,30 @@ class TestDocument:
         find_one.assert_called_once_with({'_id': 42}, session=None)
         assert doc.test is True
 
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_refresh_many(self, mock_db):
+        class Book(Document):
+            collection = 'book'
+            name = Field()
+
+        find = mock_db.__getitem__.return_value.find
+        find.side_effect = [[{'_id': 1, 'name': 'a'}],
+                            [{'_id': 2, 'name': 'b'}]]
+        books = [Book(_id=i, name='old') for i in (1, 2, 3)]
+        with pytest.raises(Book.DoesNotExist):
+            Book.refresh_many(books, chunk_size=2)
+        assert find.call_count == 2
+        find.assert_any_call({'_id': {'$in': [1, 2]}}, batch_size=2)
+        assert [book.name for book in books] == ['a', 'b', 'old']
+        assert not books[0].is_dirty
+
+        find.side_effect = None
+        find.return_value = [{'_id': 1, 'name': 'a'}]
+        assert Book.refresh_many(books[::2], raise_missing=False) == \
+            [books[2]]
+        with pytest.raises(ValueError):
+            Book.refresh_many([Book(name='new')])
+
     @no_database
     def test_fields_append(self):
         doc = Document(collection='test')
@@ -319,3 +357,332 @@ class TestDocument:
                 raise Book.DoesNotExist()
             except User.DoesNotExist:
                 pass
+
+    def test_schema_compiled_once(self):
+        class Base(Document):
+            name = Field()
+            age = Field(required=False)
+
+        class Child(Base):
+            email = Field()
+            age = 42
+
+        assert Base._schema.names == ('name', 'age')
+        assert Child._schema.names == ('name', 'email')
+        assert Base._schema.required == ('name',)
+        assert Child._schema['name'] is Base.__dict__['name']
+
+    @no_database
+    def test_instances_share_declared_fields(self):
+        class Book(Document):
+            name = Field(value='untitled')
+
+        a = Book()
+        b = Book(name='dune')
+        assert a.name == 'untitled'
+        assert b.name == 'dune'
+        assert a.raw_attr('name').value == 'untitled'
+        assert a.raw_attr('name') is not Book._schema['name']
+        assert Book._schema['name'].value == 'untitled'
+
+    @no_database
+    def test_add_field_keeps_class_untouched(self):
+        class Book(Document):
+            name = Field()
+
+        book = Book()
+        book.extra = Field(value='x')
+        assert book.fields == ['name', 'extra']
+        assert Book().fields == ['name']
+        with pytest.raises(AttributeError):
+            book.add_field('name', Field())
+
+    @no_database
+    def test_stateful_declared_field(self):
+        class UpperField(Field):
+            def get(self):
+                return self.value.upper() if self.value else self.value
+
+        class Book(Document):
+            name = UpperField()
+
+        a = Book(name='dune')
+        b = Book(name='hyperion')
+        assert UpperField.stateful
+        assert a.name == 'DUNE'
+        assert b.name == 'HYPERION'
+        assert a.to_dict() == {'name': 'DUNE'}
+
+    @no_database
+    def test_del_declared_field(self):
+        class Book(Document):
+            name = Field()
+            pages = Field()
+
+        book = Book(name='dune', pages=412)
+        del book.pages
+        assert book.fields == ['name']
+        assert book.to_dict() == {'name': 'dune'}
+        assert Book().fields == ['name', 'pages']
+
+    @no_database
+    def test_fields_are_descriptors(self):
+        class Book(Document):
+            name = Field(default=lambda: 'untitled')
+
+        book = Book()
+        assert isinstance(Book.name, Field)
+        assert Book.name.name == 'name'
+        assert book.name == 'untitled'
+        book.name = 'dune'
+        assert book._values['name'] == 'dune'
+        assert 'name' not in vars(book)
+        del book.name
+        assert book.fields == []
+        with pytest.raises(AttributeError):
+            del book.name
+
+
+class TestDirtyTracking:
+    class Book(Document):
+        collection = 'book'
+        name = Field()
+        pages = Field(required=False)
+        tags = Field(required=False)
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_clean_document_is_not_sent(self, mock_db):
+        update = mock_db.__getitem__.return_value.update_one
+        book = self.Book.from_database({'_id': 1, 'name': 'dune'})
+        assert book.is_dirty is False
+        assert book.changed_fields == []
+        assert book.save() is None
+        book.name = 'dune'
+        assert book.save() is None
+        update.assert_not_called()
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_only_changed_fields_are_sent(self, mock_db):
+        update = mock_db.__getitem__.return_value.update_one
+        book = self.Book.from_database(
+            {'_id': 1, 'name': 'dune', 'pages': 412, 'tags': ['sf']})
+        book.pages = 500
+        book.tags = None
+        assert book.changed_fields == ['pages', 'tags']
+        book.save()
+        update.assert_called_once_with(
+            {'_id': 1},
+            {'$set': {'pages': 500}, '$unset': {'tags': ''}},
+            session=None)
+        assert book.is_dirty is False
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_removed_field_is_unset(self, mock_db):
+        update = mock_db.__getitem__.return_value.update_one
+        book = self.Book.from_database({'_id': 1, 'name': 'dune', 'pages': 3})
+        del book.pages
+        assert book.is_dirty
+        book.save()
+        update.assert_called_once_with(
+            {'_id': 1}, {'$unset': {'pages': ''}}, session=None)
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_mark_dirty_and_pre_save(self, mock_db):
+        update = mock_db.__getitem__.return_value.update_one
+        received = []
+
+        class Book(self.Book):
+            def pre_save(self, content, is_new=False):
+                received.append(dict(content))
+                content['updated'] = True
+
+        book = Book.from_database({'_id': 1, 'name': 'dune', 'tags': []})
+        book.tags.append('sf')
+        assert book.is_dirty is False
+        book.mark_dirty('tags')
+        book.save()
+        assert received == [{'tags': ['sf']}]
+        update.assert_called_once_with(
+            {'_id': 1}, {'$set': {'tags': ['sf'], 'updated': True}},
+            session=None)
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_insert_then_update(self, mock_db):
+        collection = mock_db.__getitem__.return_value
+        collection.insert_one.return_value.inserted_id = 42
+        book = self.Book(name='dune')
+        assert book.is_dirty
+        book.save()
+        collection.insert_one.assert_called_once_with(
+            {'name': 'dune', 'pages': None, 'tags': None}, session=None)
+        book.pages = 10
+        book.save()
+        collection.update_one.assert_called_once_with(
+            {'_id': 42}, {'$set': {'pages': 10}}, session=None)
+
+
+class TestCompiledValidator:
+    class Account(Document):
+        collection = 'account'
+        name = StringField(maxlen=5)
+        email = EmailField(required=False)
+        code = RegexField(r'^[A-Z]+$', default=lambda: 'ABC')
+        age = IntegerField(required=False)
+        admin = BoolField(value=False)
+        anything = Field()
+        legacy = InvalidField(required=False)
+
+    def test_matches_fields_validation(self):
+        values = [
+            {},
+            {'name': 'john', 'email': 'john@doe.com', 'age': 3,
+             'code': 'XY'},
+            {'name': 'johnny', 'email': 'nope', 'age': True, 'code': 'x1',
+             'admin': 'yes'},
+            {'name': 3, 'email': 4, 'age': '3', 'admin': None},
+        ]
+        for kwargs in values:
+            account = self.Account(**kwargs)
+            expected = [name for name in account._schema.names
+                        if name == 'legacy' or not getattr(
+                            self.Account, name).is_valid_value(
+                                account._values[name])]
+            assert account.invalid_fields() == expected
+        assert self.Account(name='john').is_valid()
+        assert not self.Account(name='johnny').is_valid()
+
+    def test_compact(self):
+        class Point(CompactDocument):
+            x = IntegerField(value=0)
+            y = IntegerField(value=0)
+
+        point = Point(x='a')
+        assert point.invalid_fields() == ['x']
+        point.x = 1
+        assert point.is_valid(raises=True)
+
+    def test_custom_validate_is_called(self):
+        class EvenField(IntegerField):
+            def validate(self, value):
+                super().validate(value)
+                if value % 2:
+                    raise ValueError(value)
+
+        class Number(Document):
+            value = EvenField()
+
+        assert Number(value=2).is_valid()
+        assert Number(value=3).invalid_fields() == ['value']
+
+    @no_database
+    def test_dynamic_fields(self):
+        account = self.Account(name='john')
+        account.extra = StringField(value=3)
+        assert account.invalid_fields() == \
+            ['email', 'age', 'legacy', 'extra']
+        assert not account.is_valid()
+
+    def test_validate_many(self):
+        accounts = [self.Account(name='john'), self.Account(name='johnny'),
+                    self.Account(name='jane')]
+        valid, invalid = self.Account.validate_many(accounts)
+        assert valid == [accounts[0], accounts[2]]
+        assert invalid == [accounts[1]]
+
+
+class TestCompactDocument:
+    @no_database
+    def test_values_layout(self):
+        class Point(CompactDocument):
+            x = Field(value=0)
+            y = Field(value=0)
+
+        class Point3d(Point):
+            z = Field(value=0)
+
+        point = Point3d(x=1, z=3)
+        assert not hasattr(point, '__dict__')
+        assert point._values == [1, 0, 3]
+        assert point.to_dict() == {'x': 1, 'y': 0, 'z': 3}
+        assert Point3d._keys['z'] == 2
+        assert Point(y=2)._values == [0, 2]
+
+    @no_database
+    def test_shared_field(self):
+        class Labelled:
+            label = Field()
+            note = Field()
+
+        class Tag(Labelled, Document):
+            pass
+
+        class CompactTag(Labelled, CompactDocument):
+            size = Field()
+
+        class Sticker(CompactDocument):
+            size = Field()
+            label = Labelled.label
+
+        tag = Tag(label='a')
+        compact = CompactTag(label='b', note='c', size=1)
+        sticker = Sticker(label='d', size=2)
+        assert compact._values == ['b', 'c', 1]
+        assert sticker._values == [2, 'd']
+        assert (tag.label, compact.label, sticker.label) == ('a', 'b', 'd')
+
+    @no_database
+    def test_hidden_field(self):
+        class Person(CompactDocument):
+            name = Field()
+            age = Field()
+            email = Field()
+
+        class Child(Person):
+            age = 42
+
+        child = Child(name='tim', email='tim@x.org')
+        assert child._values == ['tim', 'tim@x.org']
+        assert (child.name, child.age, child.email) == \
+            ('tim', 42, 'tim@x.org')
+        assert Person(name='a', age=3, email='b').email == 'b'
+
+    @no_database
+    def test_extra_attributes(self):
+        class Point(CompactDocument):
+            x = Field()
+
+        point = Point(x=1, color='red')
+        assert point.color == 'red'
+        assert point.to_dict() == {'x': 1}
+        del point.color
+        with pytest.raises(AttributeError):
+            point.color
+        with pytest.raises(AttributeError):
+            point.collection = 'other'
+
+    @no_database
+    def test_dynamic_fields(self):
+        class Point(CompactDocument):
+            x = Field()
+
+        point = Point(x=1)
+        point.label = Field(value='origin')
+        assert point.fields == ['x', 'label']
+        assert point.copy().to_dict() == {'x': 1, 'label': 'origin'}
+
+    @no_database
+    def test_memory_usage(self):
+        fields = {name: Field(value=0) for name in 'abcdefgh'}
+        Row = type('Row', (Document,), dict(fields))
+        fields = {name: Field(value=0) for name in 'abcdefgh'}
+        CompactRow = type('CompactRow', (CompactDocument,), dict(fields))
+
+        def measure(model) -> int:
+            tracemalloc.start()
+            rows = [model(_id=i, a=i) for i in range(1000)]
+            size, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            assert len(rows) == 1000
+            return size
+
+        assert measure(CompactRow) < measure(Row) * 0.7
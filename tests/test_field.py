@@ -27,6 +27,22 @@ class TestField:
         assert field.get() == cpy.get()
         assert field.required == cpy.required
 
+    def test_is_valid_value(self):
+        field = StringField(maxlen=3, default=lambda: 'abc')
+        assert field.is_valid_value(None)
+        assert field.is_valid_value('ab')
+        assert field.is_valid_value('abcd') is False
+        assert field.value is None
+
+    def test_stateful(self):
+        class CustomField(Field):
+            def check(self):
+                raise ValueError(self.value)
+
+        assert Field.stateful is False
+        assert StringField.stateful is False
+        assert CustomField.stateful is True
+
 
 class TestStringField:
     @pytest.mark.parametrize('text', ('This is valid !', '0123456789', ''))
@@ -0,0 +1,89 @@
+import asyncio
+
+from bson import ObjectId
+from mock import patch
+
+from mongomodel import Document, Field, IdentityMap, identity_map
+from mongomodel.identity import current
+
+
+class User(Document):
+    collection = 'user'
+    name = Field()
+
+
+class TestIdentityMap:
+    def test_scope(self):
+        assert current() is None
+        with identity_map() as outer:
+            assert current() is outer
+            with IdentityMap() as inner:
+                assert current() is inner
+            assert current() is outer
+        assert current() is None
+
+    def test_lru_eviction(self):
+        identities = IdentityMap(maxsize=2)
+        users = [User(_id=i) for i in range(3)]
+        for user in users:
+            identities.add(user)
+        assert identities.get('user', 0) is None
+        identities.get('user', 1)
+        identities.add(User(_id=3))
+        assert identities.get('user', 1) is users[1]
+        assert identities.get('user', 2) is None
+        assert len(identities) == 2
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_from_id_and_get(self, mock_db):
+        find_one = mock_db.__getitem__.return_value.find_one
+        user_id = ObjectId()
+        find_one.return_value = {'_id': user_id, 'name': 'seb'}
+        with identity_map():
+            a = User.from_id(user_id)
+            b = User.from_id(user_id)
+            c = User.objects.get(_id=user_id)
+        assert a is b is c
+        find_one.assert_called_once()
+        assert User.from_id(user_id) is not a
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_find_returns_same_instances(self, mock_db):
+        collection = mock_db.__getitem__.return_value
+        user_id = ObjectId()
+        collection.find.return_value = [{'_id': user_id, 'name': 'seb'}]
+        collection.find_one.return_value = {'_id': user_id, 'name': 'seb'}
+        with identity_map():
+            user = User.from_id(user_id)
+            user.name = 'tom'
+            found, = User.objects.all()
+        assert found is user
+        assert found.name == 'tom'
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_save_and_delete(self, mock_db):
+        collection = mock_db.__getitem__.return_value
+        collection.insert_one.return_value.inserted_id = 42
+        with identity_map() as identities:
+            user = User(name='seb')
+            user.save()
+            assert identities.get('user', 42) is user
+            user.delete()
+            assert identities.get('user', 42) is None
+            identities.add(User(_id=1))
+            User.objects.filter(name='x').update(set__name='y')
+            assert len(identities) == 0
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_async_context(self, mock_db):
+        user_id = ObjectId()
+        mock_db.__getitem__.return_value.find_one.return_value = {
+            '_id': user_id}
+
+        async def load():
+            with identity_map():
+                a = await User.afrom_id(user_id)
+                b = await User.afrom_id(user_id)
+                return a is b
+
+        assert asyncio.run(load())
@@ -0,0 +1,92 @@
+import pytest
+from mock import patch
+
+from mongomodel import Document, Field, Index, ensure_all_indexes
+
+
+class Account(Document):
+    collection = 'account'
+    email = Field()
+    indexes = [
+        'email',
+        Index('country', '-created'),
+        Index('created', expire_after=3600, name='ttl'),
+    ]
+
+
+class Admin(Account):
+    indexes = [Index('email', unique=True, name='email_1')]
+
+
+class TestIndex:
+    def test_declaration(self):
+        index = Index('country', '-created', unique=True,
+                      partial={'active': True})
+        assert index.keys == [('country', 1), ('created', -1)]
+        assert index.name == 'country_1_created_-1'
+        assert index.options == {
+            'unique': True, 'partialFilterExpression': {'active': True}}
+        assert Index(('location', '2dsphere')).name == 'location_2dsphere'
+        with pytest.raises(ValueError):
+            Index()
+
+    def test_collected(self):
+        assert [index.name for index in Account._indexes] == \
+            ['email_1', 'country_1_created_-1', 'ttl']
+        assert Admin._indexes[0].options == {'unique': True}
+        assert Document._indexes == ()
+
+    def test_from_server(self):
+        server = Index.from_server({
+            'v': 2, 'key': {'created': 1}, 'name': 'ttl',
+            'expireAfterSeconds': 3600, 'ns': 'test.account'})
+        assert server == Account._indexes[2]
+        assert server != Index('created', expire_after=60, name='ttl')
+
+
+class TestEnsureIndexes:
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_ensure_indexes(self, mock_db):
+        collection = mock_db.__getitem__.return_value
+        collection.name = 'account'
+        collection.list_indexes.return_value = [
+            {'key': {'_id': 1}, 'name': '_id_'},
+            {'key': {'email': 1}, 'name': 'email_1', 'unique': True},
+            {'key': {'old': 1}, 'name': 'old_1'},
+        ]
+        collection.create_indexes.return_value = ['country_1_created_-1',
+                                                  'ttl']
+        report = Account.ensure_indexes(dry_run=True)
+        assert [index.name for index in report.missing] == \
+            ['country_1_created_-1', 'ttl']
+        assert [index.name for index in report.changed] == ['email_1']
+        assert [index.name for index in report.extra] == ['old_1']
+        assert not report.in_sync
+        collection.create_indexes.assert_not_called()
+
+        report = Account.ensure_indexes()
+        models = collection.create_indexes.call_args[0][0]
+        assert [model.document['name'] for model in models] == \
+            ['country_1_created_-1', 'ttl']
+        assert models[1].document['expireAfterSeconds'] == 3600
+        assert report.created == ['country_1_created_-1', 'ttl']
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_renamed_index_is_changed(self, mock_db):
+        collection = mock_db.__getitem__.return_value
+        collection.list_indexes.return_value = [
+            {'key': {'created': 1}, 'name': 'created_1'}]
+        report = Account.ensure_indexes(dry_run=True)
+        assert [index.name for index in report.changed] == ['ttl']
+        assert report.extra == []
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_ensure_all_indexes(self, mock_db):
+        collection = mock_db.__getitem__.return_value
+        collection.name = 'account'
+        collection.list_indexes.return_value = []
+        reports = ensure_all_indexes(dry_run=True)
+        # Account and Admin share their collection
+        report = reports['default', 'account']
+        assert [index.name for index in report.missing] == \
+            ['email_1', 'country_1_created_-1', 'ttl']
@@ -0,0 +1,175 @@
+import pickle
+from datetime import datetime
+
+import bson
+from bson import Binary, Code, Decimal128, Int64, MaxKey, MinKey, ObjectId, \
+    Regex, Timestamp
+from bson.codec_options import DEFAULT_CODEC_OPTIONS
+from bson.raw_bson import RawBSONDocument
+from mock import Mock, patch
+
+from mongomodel import Document, Field
+from mongomodel.field import StringField
+from mongomodel.lazy import LazyValues, RawDocument
+
+
+class Upper(Field):
+    def get(self):
+        return self.value.upper() if self.value else self.value
+
+
+class Article(Document):
+    collection = 'article'
+    title = StringField(maxlen=20)
+    body = Field(required=False)
+    tags = Field(required=False, default=list)
+    author = Upper(required=False)
+
+
+def article(**kwargs):
+    data = {'_id': ObjectId(), 'title': 'dune', 'body': 'x' * 100,
+            'tags': ['sf'], 'author': 'frank'}
+    data.update(kwargs)
+    return data
+
+
+def lazy_collection(*items):
+    collection = Mock()
+    collection.codec_options = DEFAULT_CODEC_OPTIONS
+    collection.with_options.return_value.find.return_value = [
+        RawBSONDocument(bson.encode(item)) for item in items]
+    return collection
+
+
+class TestRawDocument:
+    def test_all_types(self):
+        data = {
+            'double': 1.5, 'string': 'é', 'document': {'a': [1, {'b': 2}]},
+            'array': [1, 'a'], 'binary': Binary(b'abc', 0x80),
+            'id': ObjectId(), 'bool': True, 'date': datetime(2020, 1, 1),
+            'null': None, 'regex': Regex('^a', 'i'), 'code': Code('x'),
+            'scope': Code('x', {'a': 1}), 'int': 1, 'ts': Timestamp(1, 2),
+            'long': Int64(2), 'decimal': Decimal128('1.1'), 'max': MaxKey(),
+            'min': MinKey(),
+        }
+        raw = bson.encode(data)
+        document = RawDocument(raw)
+        expected = bson.decode(raw)
+        for key in reversed(list(data)):
+            assert document.decode(key) == expected[key]
+        assert list(document.keys()) == list(data)
+
+    def test_locate_stops_at_the_key(self):
+        document = RawDocument(bson.encode({'a': 1, 'b': 2, 'c': 3}))
+        assert document.decode('a') == 1
+        assert list(document._offsets) == ['a']
+        assert 'b' in document
+        assert 'x' not in document
+        assert document.decode('x', 'default') == 'default'
+        assert list(document._offsets) == ['a', 'b', 'c']
+
+
+class TestLazyValues:
+    def test_missing_key(self):
+        values = LazyValues(RawDocument(bson.encode({'a': 1})),
+                            {'a': None, 'b': 'initial'})
+        assert 'a' not in values
+        assert values['a'] == 1
+        assert values['b'] == 'initial'
+        assert dict(values) == {'a': 1, 'b': 'initial'}
+
+    def test_copy_and_pickle(self):
+        values = LazyValues(RawDocument(bson.encode({'a': 1, 'b': 2})),
+                            {'a': None, 'b': None})
+        values['a'] = 3
+        copy = values.copy()
+        assert type(copy) is LazyValues
+        assert copy['b'] == 2
+        assert 'b' not in values
+        assert pickle.loads(pickle.dumps(values)) == {'a': 3, 'b': 2}
+
+
+class TestFromRaw:
+    def test_fields(self):
+        data = article(extra=1)
+        document = Article.from_raw(bson.encode(data))
+        assert document._id == data['_id']
+        assert 'title' not in document._values
+        assert document.title == 'dune'
+        assert 'body' not in document._values
+        assert document.author == 'FRANK'
+        assert document.extra == 1
+        assert document.to_dict() == Article.from_database(data).to_dict()
+
+    def test_missing_field(self):
+        data = article()
+        del data['tags']
+        document = Article.from_raw(RawBSONDocument(bson.encode(data)))
+        assert document.tags == []
+
+    def test_changes(self):
+        document = Article.from_raw(bson.encode(article()))
+        assert document.get_update() is None
+        document.title = 'dune'
+        assert document.get_update() is None
+        document.body = 'changed'
+        assert document.get_update() == {'$set': {'body': 'changed'}}
+
+    def test_mark_dirty(self):
+        document = Article.from_raw(bson.encode(article()))
+        document.tags.append('classic')
+        document.mark_dirty('tags')
+        assert document.get_update() == {
+            '$set': {'tags': ['sf', 'classic']}}
+
+    def test_validation(self):
+        document = Article.from_raw(bson.encode(article(title=1)))
+        assert document.invalid_fields() == ['title']
+        assert not document.is_valid()
+
+
+class TestQuerySetLazy:
+    def test_copy(self):
+        qs = Article.objects.lazy()
+        assert qs.filter(title='dune')._lazy
+        assert not qs.lazy(False)._lazy
+        assert not Article.objects._lazy
+
+    @patch('mongomodel.queryset.QuerySet.get_collection')
+    def test_iter(self, mock_collection):
+        data = article()
+        collection = lazy_collection(data)
+        mock_collection.return_value = collection
+        documents = Article.objects.filter(title='dune').lazy().all()
+        options = collection.with_options.call_args[1]['codec_options']
+        assert options.document_class is RawBSONDocument
+        assert type(documents[0]._values) is LazyValues
+        assert documents[0].body == data['body']
+
+    @patch('mongomodel.queryset.QuerySet.get_collection')
+    def test_get(self, mock_collection):
+        data = article()
+        collection = lazy_collection(data)
+        collection.with_options.return_value.find.return_value = Mock(
+            limit=Mock(return_value=[RawBSONDocument(bson.encode(data))]))
+        mock_collection.return_value = collection
+        document = Article.objects.lazy().get(title='dune')
+        assert document._id == data['_id']
+        assert document.title == 'dune'
+
+    @patch('mongomodel.queryset.QuerySet.get_collection')
+    def test_cached(self, mock_collection):
+        mock_collection.return_value = lazy_collection(article())
+        qs = Article.objects.lazy().cache(10)
+        first = qs.all()
+        second = qs.all()
+        assert first[0] is not second[0]
+        assert second[0].title == 'dune'
+        qs.invalidate_cache()
+
+    @patch('mongomodel.queryset.QuerySet.get_collection')
+    def test_not_lazy(self, mock_collection):
+        mock_collection.return_value.find.return_value = [article()]
+        document = Article.objects.all()[0]
+        assert type(document._values) is dict
+        mock_collection.return_value.with_options.assert_not_called()
@@ -0,0 +1,139 @@
+import gc
+import logging
+from types import SimpleNamespace
+
+import pytest
+from mock import patch, MagicMock
+
+import mongomodel
+from mongomodel import Document, Field, metrics
+from mongomodel.metrics import InMemorySink, LoggingSink, MetricsListener
+
+
+class Car(Document):
+    collection = 'cars'
+    name = Field()
+
+
+def started(command_name, command, request_id=1):
+    return SimpleNamespace(command_name=command_name, command=command,
+                           connection_id=('localhost', 27017),
+                           request_id=request_id)
+
+
+def succeeded(command_name, reply, duration_micros=2000, request_id=1):
+    return SimpleNamespace(command_name=command_name, reply=reply,
+                           duration_micros=duration_micros,
+                           connection_id=('localhost', 27017),
+                           request_id=request_id)
+
+
+@pytest.fixture
+def sink():
+    sink = metrics.add_sink(InMemorySink())
+    yield sink
+    metrics.remove_sink(sink)
+
+
+class TestListener:
+    def test_registered_on_connect(self):
+        database = mongomodel.Database()
+        listeners = database.client.options.event_listeners
+        assert metrics.listener in listeners
+
+    def test_nothing_without_sink(self):
+        listener = MetricsListener()
+        listener.started(started('find', {'find': 'cars'}))
+        assert listener._pending == {}
+
+    def test_find(self, sink):
+        listener = MetricsListener()
+        listener.started(started('find', {'find': 'cars', 'filter': {}}))
+        listener.succeeded(succeeded('find', {'cursor': {
+            'firstBatch': [{}, {}], 'id': 0}}))
+        listener.started(started('getMore', {
+            'getMore': 1, 'collection': 'cars'}, request_id=2))
+        listener.succeeded(succeeded('getMore', {'cursor': {
+            'nextBatch': [{}], 'id': 0}}, 8000, request_id=2))
+        stats = sink.stats[('Car', 'find')]
+        assert stats.count == 2
+        assert stats.documents == 3
+        assert stats.duration_ms == 10
+        assert stats.bytes == 0
+        assert stats.buckets[:5] == [0, 1, 0, 1, 0]
+
+    def test_operations(self, sink):
+        listener = MetricsListener()
+        listener.track_bytes = True
+        listener.started(started('aggregate', {'aggregate': 'cars',
+                                 'pipeline': [{'$match': {}}, {'$group': {
+                                     '_id': 1, 'n': {'$sum': 1}}}]}))
+        listener.succeeded(succeeded('aggregate', {'cursor': {
+            'firstBatch': [{'_id': 1, 'n': 12}]}}))
+        listener.started(started('insert', {'insert': 'unknown'}))
+        listener.failed(succeeded('insert', {'n': 0, 'ok': 0}))
+        listener.started(started('ping', {'ping': 1}))
+        assert set(sink.stats) == {('Car', 'count'), ('unknown', 'insert')}
+        assert sink.stats[('unknown', 'insert')].failures == 1
+        assert sink.stats[('Car', 'count')].bytes > 0
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_hydration(self, mock_db, sink):
+        mock_db.__getitem__.return_value.find.return_value = [
+            {'_id': 1, 'name': 'a'}, {'_id': 2, 'name': 'b'}]
+        assert len(Car.objects.all()) == 2
+        assert sink.hydration['Car'][0] == 2
+
+    def test_model_name(self):
+        class Truck(Car):
+            pass
+
+        listener = MetricsListener()
+        assert listener.model_name('cars') == 'Car'
+        assert listener.model_name('trucks') == 'trucks'
+
+        class Van(Document):
+            collection = 'trucks'
+
+        assert listener.model_name('trucks') == 'Van'
+        assert Van in Document.models
+        del Van
+        gc.collect()
+        assert listener.model_name('trucks') == 'trucks'
+
+
+class TestSinks:
+    def test_render(self):
+        sink = InMemorySink()
+        sink.observe('Car', 'find', 3, 10, 100)
+        sink.observe_hydration('Car', 10, 1.5)
+        text = sink.render()
+        assert 'mongomodel_command_duration_seconds_bucket{model="Car",' \
+            'operation="find",le="0.0025"} 0' in text
+        assert 'mongomodel_command_duration_seconds_bucket{model="Car",' \
+            'operation="find",le="+Inf"} 1' in text
+        assert 'mongomodel_command_documents_total{model="Car",' \
+            'operation="find"} 10' in text
+        assert 'mongomodel_hydrated_documents_total{model="Car"} 10' in text
+
+    def test_render_families(self):
+        sink = InMemorySink()
+        sink.observe('Car', 'find', 3, 10, 100)
+        sink.observe('Bus', 'count', 3, 1, 10)
+        sink.observe_hydration('Car', 10, 1.5)
+        sink.observe_hydration('Bus', 2, 1)
+        family = None
+        for line in sink.render().splitlines():
+            if line.startswith('# TYPE '):
+                family = line.split()[2]
+            else:
+                # the samples of a family follow it's TYPE line
+                name = line.split('{')[0]
+                assert name == family or \
+                    name.rsplit('_', 1)[0] == family
+
+    def test_logging(self):
+        logger = MagicMock()
+        LoggingSink(logger, logging.INFO).observe('Car', 'find', 1, 2, None)
+        logger.log.assert_called_once()
+        assert logger.log.call_args[0][0] == logging.INFO
@@ -0,0 +1,125 @@
+import gc
+import logging
+
+from mock import patch, MagicMock
+
+from mongomodel import Document, Field
+from mongomodel.profiling import QueryPlan, enable_slow_query_log, \
+    disable_slow_query_log, slow_query_log
+
+
+class User(Document):
+    collection = 'user'
+    name = Field()
+
+
+IXSCAN_PLAN = {
+    'queryPlanner': {'winningPlan': {
+        'stage': 'LIMIT', 'inputStage': {
+            'stage': 'FETCH', 'inputStage': {
+                'stage': 'IXSCAN', 'indexName': 'name_1'}}}},
+    'executionStats': {'nReturned': 1, 'totalDocsExamined': 1,
+                       'totalKeysExamined': 1, 'executionTimeMillis': 0},
+}
+
+
+class TestQueryPlan:
+    def test_summary(self):
+        plan = QueryPlan(IXSCAN_PLAN)
+        assert plan.stages == ['LIMIT', 'FETCH', 'IXSCAN']
+        assert plan.stage == 'IXSCAN'
+        assert plan.index == 'name_1'
+        assert not plan.is_collscan
+        assert plan.as_dict() == {
+            'stage': 'IXSCAN', 'index': 'name_1', 'docs_examined': 1,
+            'keys_examined': 1, 'returned': 1, 'time_ms': 0}
+
+    def test_collscan(self):
+        plan = QueryPlan({'queryPlanner': {'winningPlan': {'queryPlan': {
+            'stage': 'COLLSCAN'}}}})
+        assert plan.is_collscan
+        assert plan.index is None
+        assert plan.docs_examined is None
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_explain(self, mock_db):
+        mock_db.command.return_value = IXSCAN_PLAN
+        plan = User.objects.filter(name='seb').sort(['-name']).skip(1) \
+            .limit(2).only('name').explain()
+        mock_db.command.assert_called_once_with('explain', {
+            'find': 'user', 'filter': {'name': 'seb'},
+            'sort': {'name': -1}, 'skip': 1, 'limit': 2,
+            'projection': {'name': True}}, verbosity='executionStats')
+        assert plan.index == 'name_1'
+
+
+class TestSlowQueryLog:
+    def teardown_method(self):
+        disable_slow_query_log()
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_disabled(self, mock_db):
+        mock_db.__getitem__.return_value.find.return_value = []
+        User.objects.all()
+        assert slow_query_log() is None
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_records_slow_queries(self, mock_db, caplog):
+        collection = mock_db.__getitem__.return_value
+        collection.find.return_value.limit.return_value = \
+            [{'_id': 1, 'name': 'seb'}]
+        collection.count_documents.return_value = 1
+        mock_db.command.return_value = IXSCAN_PLAN
+        log = enable_slow_query_log(threshold_ms=0)
+        with caplog.at_level(logging.WARNING, 'mongomodel.slow_queries'):
+            User.objects.filter(name='seb').limit(5).all()
+            User.objects.count()
+        find, count = log.entries
+        assert (find.collection, find.operation) == ('user', 'find')
+        assert find.query == {'name': 'seb'}
+        assert find.options == {'limit': 5}
+        assert find.plan.index == 'name_1'
+        mock_db.command.assert_called_once_with(
+            'explain', {'find': 'user', 'filter': {'name': 'seb'},
+                        'limit': 5}, verbosity='queryPlanner')
+        assert count.operation == 'count'
+        assert count.plan is None
+        assert len(caplog.records) == 2
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_partial_iteration(self, mock_db):
+        cursor = MagicMock()
+        cursor.__iter__.return_value = iter([{'_id': 1}, {'_id': 2}])
+        mock_db.__getitem__.return_value.find.return_value = cursor
+        mock_db.command.return_value = IXSCAN_PLAN
+        log = enable_slow_query_log(threshold_ms=0)
+        documents = iter(User.objects)
+        next(documents)
+        del documents
+        gc.collect()
+        # left early: not recorded and no explain
+        assert len(log.entries) == 0
+        mock_db.command.assert_not_called()
+        cursor.limit.return_value.__iter__.return_value = iter([{'_id': 1}])
+        assert User.objects.first()._id == 1
+        assert len(log.entries) == 1
+        assert log.entries[0].options == {'limit': 1}
+        log.entries.clear()
+        measured = log.measure_cursor(User.objects, 'find', [1, 2])
+        assert next(measured) == 1
+        measured.close()
+        assert list(measured) == []
+        assert len(log.entries) == 1
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_threshold(self, mock_db):
+        mock_db.__getitem__.return_value.distinct.return_value = []
+        log = enable_slow_query_log(threshold_ms=1000, explain=False,
+                                    logger=MagicMock())
+        User.objects.distinct('name')
+        assert len(log.entries) == 0
+        log.threshold_ms = 0
+        User.objects.distinct('name')
+        assert log.entries[0].operation == 'distinct'
+        assert log.entries[0].plan is None
+        mock_db.command.assert_not_called()
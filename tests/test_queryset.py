@@ -1,9 +1,15 @@
+import asyncio
 import pytest
 
 from bson import ObjectId
-from mock import patch, Mock, MagicMock
-from mongomodel.queryset import QuerySet, MissingModelError, TooManyResults
+from mock import call, patch, Mock, MagicMock
+from pymongo import InsertOne, UpdateOne, DeleteOne
+from pymongo.errors import BulkWriteError
+from mongomodel.keywords import Exists
+from mongomodel.queryset import QuerySet, AsyncQuerySet, MissingModelError, \
+    TooManyResults
 from mongomodel.document import Document, Field
+from mongomodel.field import StringField
 
 
 class TestQuerySet:
@@ -181,3 +187,456 @@ class TestQuerySet:
         assert seb.name == 'seb'
         assert tom.name == 'tom'
         assert seb._id != tom._id
+
+    @patch('mongomodel.queryset.QuerySet.find_raw')
+    def test_iteration_is_lazy(self, mock_find_raw):
+        cursor = MagicMock()
+        cursor.batch_size.return_value = cursor
+        cursor.__iter__.return_value = iter([{'_id': 1}, {'_id': 2}])
+        mock_find_raw.return_value = cursor
+        model = Mock()
+        qs = QuerySet(model)
+
+        iterator = qs.iterator(chunk_size=10)
+        model.from_database.assert_not_called()
+        next(iterator)
+        model.from_database.assert_called_once_with({'_id': 1}, None)
+        cursor.batch_size.assert_called_once_with(10)
+
+    def test_batch_size(self):
+        qs = QuerySet().batch_size(100)
+        assert qs._batch_size == 100
+        assert qs.filter(a=1)._batch_size == 100
+
+
+class TestBulkSave:
+    class Book(Document):
+        collection = 'book'
+        name = StringField()
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_operations(self, mock_db):
+        bulk_write = mock_db.__getitem__.return_value.bulk_write
+        new = self.Book(name='new')
+        changed = self.Book.from_database({'_id': 1, 'name': 'old'})
+        changed.name = 'changed'
+        unchanged = self.Book.from_database({'_id': 2, 'name': 'same'})
+        removed = self.Book.from_database({'_id': 3, 'name': 'removed'})
+
+        report = self.Book.objects.bulk_save(
+            [new, changed, unchanged], delete=[removed])
+
+        requests = bulk_write.call_args[0][0]
+        assert [type(request) for request in requests] == \
+            [InsertOne, UpdateOne, DeleteOne]
+        assert requests[1] == UpdateOne({'_id': 1},
+                                        {'$set': {'name': 'changed'}})
+        assert isinstance(new._id, ObjectId)
+        assert removed._id is None
+        assert not changed.is_dirty
+        assert [result.status for result in report] == \
+            ['inserted', 'updated', 'unchanged', 'deleted']
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_chunks(self, mock_db):
+        bulk_write = mock_db.__getitem__.return_value.bulk_write
+        books = [self.Book(name=str(i)) for i in range(5)]
+        report = self.Book.objects.bulk_save(books, chunk_size=2)
+        assert bulk_write.call_count == 3
+        assert report.inserted == books
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_errors(self, mock_db):
+        bulk_write = mock_db.__getitem__.return_value.bulk_write
+        bulk_write.side_effect = BulkWriteError({'writeErrors': [
+            {'index': 1, 'code': 11000, 'errmsg': 'duplicate key'}]})
+        books = [self.Book(name=str(i)) for i in range(4)]
+        books.append(self.Book(name=None))
+        report = self.Book.objects.bulk_save(books, ordered=True,
+                                             chunk_size=3)
+        assert [result.status for result in report] == \
+            ['inserted', 'failed', 'skipped', 'skipped', 'invalid']
+        assert report[1].error['code'] == 11000
+        assert books[0]._id is not None
+        assert books[1]._id is None
+        assert bulk_write.call_count == 1
+
+
+class TestAsyncQuerySet:
+    class User(Document):
+        collection = 'user'
+        name = Field()
+
+    def test_model_attribute(self):
+        assert isinstance(self.User.aobjects, AsyncQuerySet)
+        qs = self.User.aobjects.filter(name='seb').sort(['name'])
+        assert isinstance(qs, AsyncQuerySet)
+        sync = qs.sync()
+        assert type(sync) is QuerySet
+        assert sync.query == {'name': 'seb'}
+        assert sync._sort == [('name', 1)]
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_async_iteration(self, mock_db):
+        mock_db.__getitem__.return_value.find.return_value = [
+            {'name': name, '_id': ObjectId()} for name in 'abcde']
+
+        async def collect():
+            return [user.name async for user in
+                    self.User.aobjects.iterator(chunk_size=2)]
+
+        assert asyncio.run(collect()) == list('abcde')
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_count(self, mock_db):
+        mock_db.__getitem__.return_value.count_documents.return_value = 3
+        assert asyncio.run(self.User.aobjects.count()) == 3
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_document_asave(self, mock_db):
+        insert = mock_db.__getitem__.return_value.insert_one
+        insert.return_value.inserted_id = 42
+        user = self.User(name='seb')
+        asyncio.run(user.asave())
+        insert.assert_called_once_with({'name': 'seb'}, session=None)
+        assert user._id == 42
+
+    def test_sync_iteration_raises(self):
+        with pytest.raises(TypeError):
+            iter(self.User.aobjects)
+
+
+class TestUpdate:
+    class User(Document):
+        collection = 'user'
+        name = Field()
+
+    def test_compile_update(self):
+        update = QuerySet.compile_update(
+            inc__level=1, set__name='x', push__tags='a', unset__email=True,
+            age=30, set__address__city='Paris', add_to_set__roles='admin')
+        assert update == {
+            '$inc': {'level': 1},
+            '$set': {'name': 'x', 'age': 30, 'address.city': 'Paris'},
+            '$push': {'tags': 'a'},
+            '$unset': {'email': ''},
+            '$addToSet': {'roles': 'admin'},
+        }
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_update_many(self, mock_db):
+        update_many = mock_db.__getitem__.return_value.update_many
+        update_many.return_value.modified_count = 2
+        response = self.User.objects.filter(level__lt=3).update(inc__level=1)
+        update_many.assert_called_once_with(
+            {'level': {'$lt': 3}}, {'$inc': {'level': 1}}, session=None)
+        assert response.modified_count == 2
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_update_window(self, mock_db):
+        collection = mock_db.__getitem__.return_value
+        cursor = collection.find.return_value
+        cursor.limit.return_value = [{'_id': 1}, {'_id': 2}]
+        self.User.objects.filter(name='x').limit(2).update_one(set__name='y')
+        collection.update_one.assert_called_once_with(
+            {'_id': {'$in': [1]}}, {'$set': {'name': 'y'}}, session=None)
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_update_window_batches(self, mock_db):
+        collection = mock_db.__getitem__.return_value
+        cursor = collection.find.return_value
+        cursor.limit.return_value = [{'_id': i} for i in range(5)]
+        collection.update_many.return_value = Mock(
+            matched_count=2, modified_count=1)
+        qs = self.User.objects.limit(5)
+        qs.write_batch_size = 2
+        response = qs.update(inc__level=1)
+        assert collection.update_many.call_count == 3
+        assert response.matched_count == 6
+        assert response.modified_count == 3
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_update_window_reads_ids_first(self, mock_db):
+        collection = mock_db.__getitem__.return_value
+        events = []
+
+        def ids():
+            for i in range(5):
+                events.append('read')
+                yield {'_id': i}
+
+        collection.find.return_value.sort.return_value = ids()
+
+        def update_many(*args, **kwargs):
+            events.append('write')
+            return Mock(matched_count=1, modified_count=1)
+
+        collection.update_many.side_effect = update_many
+        qs = self.User.objects.sort(['level'])
+        qs.write_batch_size = 2
+        qs.update(inc__level=10)
+        assert events == ['read'] * 5 + ['write'] * 3
+
+
+class TestDelete:
+    class User(Document):
+        collection = 'user'
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_delete_query(self, mock_db):
+        collection = mock_db.__getitem__.return_value
+        self.User.objects.filter(level__lt=3).delete()
+        collection.delete_many.assert_called_once_with({'level': {'$lt': 3}})
+        collection.find.assert_not_called()
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_delete_window(self, mock_db):
+        collection = mock_db.__getitem__.return_value
+        cursor = collection.find.return_value
+        cursor.sort.return_value = cursor
+        cursor.skip.return_value = [{'_id': i} for i in range(5)]
+        collection.delete_many.return_value = Mock(deleted_count=2)
+        qs = self.User.objects.sort(['-date']).skip(10)
+        qs.write_batch_size = 2
+        response = qs.delete()
+        assert collection.find.call_args[1]['batch_size'] == 2
+        assert [call[0][0] for call in collection.delete_many.call_args_list] \
+            == [{'_id': {'$in': [0, 1]}}, {'_id': {'$in': [2, 3]}},
+                {'_id': {'$in': [4]}}]
+        assert response.deleted_count == 6
+
+
+class TestProjection:
+    class User(Document):
+        collection = 'user'
+        name = StringField()
+        email = StringField()
+        bio = StringField()
+
+    def test_only(self):
+        qs = self.User.objects.only('name', 'email')
+        assert qs._projection == {'name': True, 'email': True}
+        assert qs.deferred_fields() == {'bio'}
+        assert qs.defer('email').deferred_fields() == {'bio', 'email'}
+
+    def test_defer(self):
+        qs = self.User.objects.defer('bio').defer('address.city')
+        assert qs._projection == {'bio': False, 'address.city': False}
+        assert qs.deferred_fields() == {'bio', 'address'}
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_partial_document_save(self, mock_db):
+        collection = mock_db.__getitem__.return_value
+        collection.find.return_value = [{'_id': 1, 'name': 'seb'}]
+        user, = self.User.objects.only('name')
+        collection.find.assert_called_once_with(
+            filter={}, projection={'name': True})
+        assert user.deferred_fields == {'email', 'bio'}
+        assert user.is_valid()
+        user.name = 'tom'
+        user.bio = 'hi'
+        user.save()
+        collection.update_one.assert_called_once_with(
+            {'_id': 1}, {'$set': {'name': 'tom', 'bio': 'hi'}}, session=None)
+
+
+class TestValues:
+    class User(Document):
+        collection = 'user'
+        name = Field()
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_as_dicts(self, mock_db):
+        find = mock_db.__getitem__.return_value.find
+        find.return_value.limit.return_value = iter([{'name': 'seb'}])
+        rows = self.User.objects.only('name').limit(1).as_dicts()
+        find.assert_called_once_with({}, projection={'name': True})
+        assert list(rows) == [{'name': 'seb'}]
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_values(self, mock_db):
+        find = mock_db.__getitem__.return_value.find
+        find.return_value = iter([{'name': 'seb'}])
+        rows = self.User.objects.values('name', noid=True)
+        find.assert_called_once_with(
+            {}, projection={'name': True, '_id': False})
+        assert list(rows) == [{'name': 'seb'}]
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_values_list_lazy(self, mock_db):
+        find = mock_db.__getitem__.return_value.find
+        find.return_value = iter([{'name': 'seb'}, {'name': 'tom'}])
+        names = self.User.objects.values_list('name', flat=True, lazy=True)
+        assert not isinstance(names, list)
+        assert list(names) == ['seb', 'tom']
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_async_values_list(self, mock_db):
+        find = mock_db.__getitem__.return_value.find
+
+        async def collect():
+            find.return_value = iter([{'name': 'seb'}, {'name': 'tom'}])
+            names = await self.User.aobjects.values_list('name', flat=True)
+            find.return_value = iter([{'name': 'seb'}, {'name': 'tom'}])
+            lazy = [name async for name in self.User.aobjects.values_list(
+                'name', flat=True, lazy=True)]
+            return names, lazy
+
+        assert asyncio.run(collect()) == (['seb', 'tom'], ['seb', 'tom'])
+
+
+class TestInBulk:
+    class User(Document):
+        collection = 'user'
+        name = Field()
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_in_bulk(self, mock_db):
+        find = mock_db.__getitem__.return_value.find
+        find.side_effect = [[{'_id': 1, 'name': 'a'}, {'_id': 2, 'name': 'b'}],
+                            [{'_id': 3, 'name': 'c'}], []]
+        users = self.User.objects.in_bulk([1, 2, 2, 3, 4], chunk_size=2)
+        assert find.call_count == 2
+        find.assert_any_call({'_id': {'$in': [1, 2]}}, batch_size=2)
+        find.assert_any_call({'_id': {'$in': [3, 4]}}, batch_size=2)
+        assert {k: v.name for k, v in users.items()} == \
+            {1: 'a', 2: 'b', 3: 'c'}
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_in_bulk_filtered(self, mock_db):
+        find = mock_db.__getitem__.return_value.find
+        find.return_value = []
+        self.User.objects.filter(name='a').only('name').in_bulk([1])
+        find.assert_called_once_with(
+            {'$and': [{'name': 'a'}, {'_id': {'$in': [1]}}]},
+            batch_size=1000, projection={'name': True})
+
+
+class TestPaginateAfter:
+    class User(Document):
+        collection = 'user'
+        name = Field()
+        age = Field()
+
+    def test_keyset_filter(self):
+        assert QuerySet.keyset_filter([('_id', 1)], [3]) == \
+            {'_id': {'$gt': 3}}
+        assert QuerySet.keyset_filter([('age', -1), ('_id', 1)], [30, 3]) == {
+            'age': {'$lte': 30},
+            '$or': [{'age': {'$lt': 30}}, {'age': 30, '_id': {'$gt': 3}}],
+        }
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_pages(self, mock_db):
+        find = mock_db.__getitem__.return_value.find
+        cursor = find.return_value.sort.return_value.limit.return_value
+        cursor.__iter__.return_value = iter([
+            {'_id': i, 'name': f'user {i}', 'age': 30} for i in range(3)])
+        qs = self.User.objects.filter(age__gte=18).sort(['-age'])
+        page = qs.paginate_after(None, 2)
+        find.assert_called_once_with(filter={'age': {'$gte': 18}})
+        find.return_value.sort.assert_called_once_with(
+            [('age', -1), ('_id', 1)])
+        find.return_value.sort.return_value.limit.assert_called_once_with(3)
+        assert [user.name for user in page] == ['user 0', 'user 1']
+        assert page.has_more
+
+        cursor.__iter__.return_value = iter([
+            {'_id': 2, 'name': 'user 2', 'age': 30}])
+        last = qs.paginate_after(page.next_token, 2)
+        assert find.call_args == call(filter={'$and': [
+            {'age': {'$gte': 18}},
+            {'age': {'$lte': 30}, '$or': [
+                {'age': {'$lt': 30}}, {'age': 30, '_id': {'$gt': 1}}]},
+        ]})
+        assert [user.name for user in last] == ['user 2']
+        assert last.next_token is None
+        assert not last.has_more
+        assert qs.query == {'age': {'$gte': 18}}
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_existing_or(self, mock_db):
+        find = mock_db.__getitem__.return_value.find
+        qs = self.User.objects.sort(['name'])
+        qs.query = {'$or': [{'age': 1}, {'age': 2}]}
+        token = QuerySet._encode_token([('name', 1), ('_id', 1)], ['a', 1])
+        qs.paginate_after(token, 2)
+        query = find.call_args[1]['filter']
+        assert query['$and'][0] == {'$or': [{'age': 1}, {'age': 2}]}
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_same_operator(self, mock_db):
+        find = mock_db.__getitem__.return_value.find
+        token = QuerySet._encode_token([('_id', 1)], [5])
+        self.User.objects.filter(_id__gt=2).paginate_after(token, 2)
+        assert find.call_args[1]['filter'] == {
+            '$and': [{'_id': {'$gt': 2}}, {'_id': {'$gt': 5}}]}
+        token = QuerySet._encode_token([('_id', -1)], [5])
+        self.User.objects.filter(_id__lt=9).sort(['-_id']).paginate_after(
+            token, 2)
+        assert find.call_args[1]['filter'] == {
+            '$and': [{'_id': {'$lt': 9}}, {'_id': {'$lt': 5}}]}
+        token = QuerySet._encode_token([('age', -1), ('_id', 1)], [30, 1])
+        self.User.objects.filter(age__lte=50).sort(['-age']).paginate_after(
+            token, 2)
+        query = find.call_args[1]['filter']
+        assert query['$and'][1]['age'] == {'$lte': 30}
+
+    @patch('mongomodel.queryset.QuerySet._db.db')
+    def test_projection_keeps_sort_keys(self, mock_db):
+        find = mock_db.__getitem__.return_value.find
+        self.User.objects.only('name').sort(['-age']).paginate_after()
+        assert find.call_args[1]['projection'] == {
+            'name': True, 'age': True, '_id': True}
+
+    def test_invalid_token(self):
+        qs = self.User.objects.sort(['-age'])
+        with pytest.raises(ValueError):
+            qs.paginate_after('not a token')
+        token = QuerySet._encode_token([('_id', 1)], [1])
+        with pytest.raises(ValueError):
+            qs.paginate_after(token)
+
+
+class TestCompiledFilter:
+    KEYS = ['age', 'age__gte', 'age__nested__eq', 'tags__in', 'name__regex',
+            'email__exists', 'address__city', 'age__gt__x']
+
+    def test_same_as_apply_keywords(self):
+        for invert in (False, True):
+            for key in self.KEYS:
+                if invert and key == 'name__regex':
+                    continue
+                path, value = QuerySet.apply_keywords(
+                    'v', key.split('__'), invert=invert)
+                expected = QuerySet.dict_path(path, value)
+                qs = QuerySet()._inner_filter(invert, **{key: 'v'})
+                assert qs.query == expected, (key, invert)
+
+    def test_compile_filter(self):
+        assert QuerySet.compile_filter('age') == (('age',), None, None)
+        assert QuerySet.compile_filter('age__gte') == (('age',), '$gte', None)
+        assert QuerySet.compile_filter('age__gte', invert=True) == \
+            (('age',), '$lt', None)
+        assert QuerySet.compile_filter('age', invert=True) == \
+            (('age',), '$ne', None)
+        assert QuerySet.compile_filter('email__exists') == \
+            (('email',), None, Exists)
+
+    def test_shapes_are_cached(self):
+        with patch.object(QuerySet, 'compile_filter',
+                          wraps=QuerySet.compile_filter) as compile_filter:
+            for age in range(3):
+                qs = QuerySet().filter(cached__age__gte=age)
+            assert compile_filter.call_count == 1
+        assert qs.query == {'cached': {'age': {'$gte': 2}}}
+
+    def test_values_are_not_shared(self):
+        qs = QuerySet().filter(age__gte=18)
+        other = qs.filter(age__lt=65)
+        assert qs.query == {'age': {'$gte': 18}}
+        assert other.query == {'age': {'$gte': 18, '$lt': 65}}
+
+    def test_invert_regex(self):
+        with pytest.raises(NotImplementedError):
+            QuerySet().exclude(name__regex='^a')
@@ -0,0 +1,183 @@
+import asyncio
+import threading
+
+import bson
+import pytest
+from bson.codec_options import DEFAULT_CODEC_OPTIONS
+from bson.raw_bson import RawBSONDocument
+from mock import patch
+
+from mongomodel import AsyncQuerySet, Document, Field
+from mongomodel.scan import ParallelScan, partition_queries, split_points
+
+
+class Item(Document):
+    collection = 'item'
+    n = Field()
+
+
+class FakeCursor(list):
+    def sort(self, order):
+        return FakeCursor(sorted(self, key=lambda item: item['_id']))
+
+    def batch_size(self, n):
+        return self
+
+
+class FakeCollection:
+    """Serves `items` and applies the `_id` range of the partitions
+    """
+    codec_options = DEFAULT_CODEC_OPTIONS
+
+    def __init__(self, items, raw=False):
+        self.items = items
+        self.raw = raw
+        self.filters = []
+
+    def with_options(self, codec_options):
+        return FakeCollection(self.items, raw=True)
+
+    def aggregate(self, pipeline):
+        return [{'_id': item['_id']} for item in self.items[::3]]
+
+    def find(self, filter=None):
+        self.filters.append(filter)
+        conditions = filter.get('$and', [{}, filter])[1].get('_id', {})
+        items = [item for item in reversed(self.items)
+                 if item['_id'] >= conditions.get('$gte', -1) and
+                 item['_id'] < conditions.get('$lt', 1 << 30)]
+        if '$type' in conditions or '$not' in conditions:
+            # the other types than the `_id` (numbers)
+            items = []
+        if self.raw:
+            items = [RawBSONDocument(bson.encode(item)) for item in items]
+        return FakeCursor(items)
+
+
+seen = []
+
+
+def collect(document):
+    seen.append(document.n)
+
+
+def items(amount):
+    return [{'_id': i, 'n': i * 10} for i in range(amount)]
+
+
+class TestPartitions:
+    def test_split_points(self):
+        collection = FakeCollection(items(100))
+        with patch('mongomodel.queryset.QuerySet.get_collection',
+                   return_value=collection):
+            points = split_points(Item.objects, 4)
+        assert len(points) == 3
+        assert points == sorted(points)
+        assert split_points(Item.objects, 1) == []
+
+    def test_split_points_unorderable(self):
+        collection = FakeCollection([{'_id': 'a'}, {'_id': 1}, {'_id': 2},
+                                     {'_id': 3}])
+        with patch('mongomodel.queryset.QuerySet.get_collection',
+                   return_value=collection):
+            assert split_points(Item.objects, 2) == []
+        # sortable in python but not the same BSON type
+        collection = FakeCollection([{'_id': True}, {'_id': 1}, {'_id': 2},
+                                     {'_id': 3}])
+        with patch('mongomodel.queryset.QuerySet.get_collection',
+                   return_value=collection):
+            assert split_points(Item.objects, 2) == []
+
+    def test_partition_queries(self):
+        assert partition_queries({}, []) == [{}]
+        assert partition_queries({'n': 1}, [5, 9]) == [
+            {'$and': [{'n': 1}, {'_id': {'$type': ['minKey', 'null']}}]},
+            {'$and': [{'n': 1}, {'_id': {'$lt': 5}}]},
+            {'$and': [{'n': 1}, {'_id': {'$gte': 5, '$lt': 9}}]},
+            {'$and': [{'n': 1}, {'_id': {'$gte': 9}}]},
+            {'$and': [{'n': 1}, {'_id': {'$not': {
+                '$type': ['minKey', 'null', 'number']}}}]},
+        ]
+        queries = partition_queries({}, ['k'])
+        assert queries[1:3] == [{'_id': {'$lt': 'k'}}, {'_id': {'$gte': 'k'}}]
+        assert queries[0]['_id']['$type'][-1] == 'number'
+        assert queries[-1]['_id']['$not']['$type'][-1] == 'string'
+
+
+@patch('mongomodel.queryset.QuerySet.get_collection')
+class TestParallelScan:
+    def test_iterate(self, mock_collection):
+        collection = FakeCollection(items(100))
+        mock_collection.return_value = collection
+        documents = list(Item.objects.parallel_scan(workers=3, batch_size=7))
+        assert sorted(document.n for document in documents) == \
+            [i * 10 for i in range(100)]
+        assert len(collection.filters) == 14
+
+    def test_ordered(self, mock_collection):
+        mock_collection.return_value = FakeCollection(items(100))
+        documents = Item.objects.parallel_scan(
+            workers=3, ordered=True, batch_size=7)
+        assert [document._id for document in documents] == list(range(100))
+
+    def test_callback_and_progress(self, mock_collection):
+        mock_collection.return_value = FakeCollection(items(50))
+        threads = set()
+        progress = []
+
+        def callback(document):
+            threads.add(threading.current_thread())
+
+        count = Item.objects.parallel_scan(
+            callback, workers=2, progress=progress.append, batch_size=10)
+        assert count == 50
+        assert progress[-1] == 50
+        assert progress == sorted(progress)
+        assert threading.current_thread() not in threads
+
+    def test_process(self, mock_collection):
+        mock_collection.return_value = FakeCollection(items(20))
+        # the callback runs in the worker processes
+        count = Item.objects.parallel_scan(collect, workers=2,
+                                           mode='process', batch_size=5)
+        assert count == 20
+        assert seen == []
+
+    def test_error(self, mock_collection):
+        mock_collection.return_value = FakeCollection(items(50))
+
+        def callback(document):
+            raise KeyError(document.n)
+
+        with pytest.raises(KeyError):
+            Item.objects.parallel_scan(callback, workers=2)
+
+    def test_stop_early(self, mock_collection):
+        mock_collection.return_value = FakeCollection(items(1000))
+        documents = Item.objects.parallel_scan(workers=2, batch_size=10)
+        assert next(documents).n is not None
+        documents.close()
+
+    def test_invalid(self, mock_collection):
+        with pytest.raises(ValueError):
+            ParallelScan(Item.objects, mode='fork')
+        with pytest.raises(ValueError):
+            ParallelScan(Item.objects, mode='process')
+        with pytest.raises(ValueError):
+            ParallelScan(Item.objects.limit(10))
+        with pytest.raises(ValueError):
+            Item.objects.parallel_scan(collect, ordered=True)
+
+    def test_async(self, mock_collection):
+        mock_collection.return_value = FakeCollection(items(30))
+        aobjects = AsyncQuerySet(Item)
+
+        async def scan():
+            documents = [document async for document in
+                         aobjects.parallel_scan(workers=2, ordered=True)]
+            count = await aobjects.parallel_scan(lambda document: None)
+            return documents, count
+
+        documents, count = asyncio.run(scan())
+        assert [document._id for document in documents] == list(range(30))
+        assert count == 30